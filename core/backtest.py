@@ -0,0 +1,433 @@
+"""
+Backtesting Engine
+Replays recorded market and social data through the real trader classes
+"""
+
+import asyncio
+import bisect
+import copy
+import itertools
+import json
+import logging
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.executor import OrderExecutor
+from core.positions import PositionBook, PositionWatcher
+from core.risk import RiskEngine
+from core.scheduler import CycleScheduler
+from traders import TRADER_CLASSES
+from utils import dex
+from utils.config import Config
+from utils.wallet_ranking import WalletRanker
+
+logger = logging.getLogger(__name__)
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock jumps straight to the next timer
+
+    Whenever nothing is ready to run, virtual time advances to the earliest
+    scheduled callback, so `asyncio.sleep`, `wait_for` and the cycle
+    scheduler all complete instantly in wall time while keeping their
+    ordering and relative timing.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._virtual_time = 0.0
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def _run_once(self):
+        if not self._ready and self._scheduled:
+            # Cancelled timers linger in the heap; never jump to one
+            when = min((h.when() for h in self._scheduled if not h.cancelled()), default=None)
+            if when is not None and when > self._virtual_time:
+                self._virtual_time = when
+        super()._run_once()
+
+
+class RecordedData:
+    """Time-indexed events loaded from a JSON lines recording
+
+    Each line is `{"t": <epoch seconds>, "type": <kind>, ...}` where kind is
+    one of `prices`, `volume`, `narratives`, `viral`, `wallet_activity` or
+    `top_wallets`.
+    """
+
+    def __init__(self, events: List[Dict]):
+        events = sorted(events, key=lambda e: e['t'])
+        self.start = events[0]['t'] if events else 0.0
+        self.end = events[-1]['t'] if events else 0.0
+        self._times: Dict[str, List[float]] = {}
+        self._events: Dict[str, List[Dict]] = {}
+        for event in events:
+            self._times.setdefault(event['type'], []).append(event['t'])
+            self._events.setdefault(event['type'], []).append(event)
+
+        # Prices are cumulative: each snapshot only lists changed mints
+        self._prices: List[Dict[str, float]] = []
+        current: Dict[str, float] = {}
+        for event in self._events.get('prices', []):
+            current = {**current, **event['prices']}
+            self._prices.append(current)
+
+    @classmethod
+    def load(cls, path: str) -> 'RecordedData':
+        with open(path) as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def latest(self, kind: str, now: float) -> Optional[Dict]:
+        """Most recent event of `kind` at or before `now`"""
+        index = bisect.bisect_right(self._times.get(kind, []), now) - 1
+        return self._events[kind][index] if index >= 0 else None
+
+    def between(self, kind: str, after: float, until: float) -> List[Dict]:
+        """Events of `kind` with after < t <= until"""
+        times = self._times.get(kind, [])
+        lo = bisect.bisect_right(times, after)
+        hi = bisect.bisect_right(times, until)
+        return self._events.get(kind, [])[lo:hi]
+
+    def prices(self, now: float) -> Dict[str, float]:
+        index = bisect.bisect_right(self._times.get('prices', []), now) - 1
+        return self._prices[index] if index >= 0 else {}
+
+
+class SimulatedBroker:
+    """Fills swaps at recorded prices and keeps per-trader books"""
+
+    def __init__(
+        self,
+        data: RecordedData,
+        clock,
+        wallets: Dict[str, str],
+        starting_balance_sol: float = 100.0,
+        fee_bps: float = 30.0,
+        slippage_bps: float = 50.0
+    ):
+        self.data = data
+        self.clock = clock
+        self.wallets = wallets
+        self.fee = fee_bps / 10_000
+        self.slippage = slippage_bps / 10_000
+        self.starting_balance_sol = starting_balance_sol
+
+        self.books = {
+            name: {'cash': starting_balance_sol, 'positions': {}, 'fills': 0, 'realized_pnl': 0.0}
+            for name in wallets.values()
+        }
+        self.cost_basis: Dict[Tuple[str, str], float] = {}
+        self.fills: List[Dict] = []
+
+    async def execute_swap(
+        self,
+        client,
+        wallet: str,
+        token_mint: str,
+        amount_sol: float,
+        side: str,
+        token_amount: Optional[float] = None
+    ) -> Dict:
+        """Drop-in replacement for utils.dex.execute_swap"""
+        trader = self.wallets.get(wallet)
+        price = self.data.prices(self.clock()).get(token_mint)
+        if trader is None or not price:
+            return {'success': False, 'error': 'No price for mint', 'tx': None}
+
+        book = self.books[trader]
+        held = book['positions'].get(token_mint, 0.0)
+        key = (trader, token_mint)
+
+        if side == 'buy':
+            amount_sol = min(amount_sol, book['cash'])
+            if amount_sol <= 0:
+                return {'success': False, 'error': 'Insufficient balance', 'tx': None}
+            tokens = amount_sol * (1 - self.fee) / (price * (1 + self.slippage))
+            book['cash'] -= amount_sol
+            book['positions'][token_mint] = held + tokens
+            self.cost_basis[key] = self.cost_basis.get(key, 0.0) + amount_sol
+        else:
+            tokens = min(held, token_amount if token_amount is not None else amount_sol / price)
+            if tokens <= 0:
+                return {'success': False, 'error': 'No position', 'tx': None}
+            proceeds = tokens * price * (1 - self.slippage) * (1 - self.fee)
+            basis = self.cost_basis.get(key, 0.0) * tokens / held
+            self.cost_basis[key] = self.cost_basis.get(key, 0.0) - basis
+            book['cash'] += proceeds
+            book['positions'][token_mint] = held - tokens
+            book['realized_pnl'] += proceeds - basis
+
+        book['fills'] += 1
+        fill = {
+            't': self.clock(),
+            'trader': trader,
+            'mint': token_mint,
+            'side': side,
+            'tokens': tokens,
+            'price': price
+        }
+        self.fills.append(fill)
+        return {
+            'success': True,
+            'error': None,
+            'tx': f"sim-{len(self.fills)}",
+            'sent_at': fill['t'],
+            'fill': fill
+        }
+
+    def report(self) -> Dict[str, Dict]:
+        """Mark every book to the last recorded prices"""
+        prices = self.data.prices(self.data.end)
+        report = {}
+        for name, book in self.books.items():
+            value = book['cash'] + sum(
+                qty * prices.get(mint, 0.0) for mint, qty in book['positions'].items()
+            )
+            report[name] = {
+                'fills': book['fills'],
+                'realized_pnl_sol': book['realized_pnl'],
+                'pnl_sol': value - self.starting_balance_sol,
+                'return_pct': (value / self.starting_balance_sol - 1) * 100,
+                'open_positions': sum(1 for qty in book['positions'].values() if qty > 0)
+            }
+        return report
+
+
+class _NullWalletFeed:
+    """Stands in for the WebSocket wallet feed during a replay"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class _ReplayWalletRanker(WalletRanker):
+    """Ranks nothing during a replay; top wallets come from the recording"""
+
+    @classmethod
+    def from_config(cls, config: Config, clock=time.time) -> 'WalletRanker':
+        return cls(clock=clock)
+
+
+@contextmanager
+def _patched(targets: Sequence[Tuple[Any, str, Any]]) -> Iterator[None]:
+    originals = [(obj, name, getattr(obj, name)) for obj, name, _ in targets]
+    for obj, name, value in targets:
+        setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        for obj, name, value in originals:
+            setattr(obj, name, value)
+
+
+async def _replay(data: RecordedData, config: Config, trader_names: List[str]) -> Dict:
+    import importlib
+
+    loop = asyncio.get_running_loop()
+    origin = loop.time()
+
+    def clock() -> float:
+        return data.start + (loop.time() - origin)
+
+    wallets = {config.get_trader_wallet(name): name for name in trader_names}
+    broker = SimulatedBroker(
+        data,
+        clock,
+        wallets,
+        starting_balance_sol=config.get_setting('backtest', 'starting_balance_sol', 100.0),
+        fee_bps=config.get_setting('backtest', 'fee_bps', 30.0),
+        slippage_bps=config.get_setting('backtest', 'slippage_bps', 50.0)
+    )
+
+    modules = {name: importlib.import_module(TRADER_CLASSES[name][0]) for name in trader_names}
+    last_seen: Dict[str, float] = {}
+
+    def since_last(key: str, kind: str) -> List[Dict]:
+        now = clock()
+        events = data.between(kind, last_seen.get(key, data.start - 1), now)
+        last_seen[key] = now
+        return events
+
+    async def get_volume_data(client, timeframe_minutes: int = 15) -> List[Dict]:
+        event = data.latest('volume', clock())
+        return event['tokens'] if event else []
+
+    async def get_trending_narratives(platforms: List[str]) -> List[Dict]:
+        return [n for e in since_last('narratives', 'narratives') for n in e['narratives']]
+
+    async def analyze_narrative_strength(narrative: Dict) -> float:
+        return narrative.get('strength', 0.0)
+
+    async def analyze_narratives(narratives: List[Dict]) -> List[float]:
+        return [n.get('strength', 0.0) for n in narratives]
+
+    async def scan_tiktok_viral(threshold_views: int, hours_ago: int, min_engagement: float) -> List[Dict]:
+        return [
+            p for e in since_last('viral', 'viral') for p in e['posts']
+            if p.get('views', 0) >= threshold_views
+        ]
+
+    async def extract_token_mentions(content: Dict) -> List[Dict]:
+        return content.get('tokens', [])
+
+    async def get_top_wallets(count: int, min_roi: float, ranker=None) -> List[Dict]:
+        event = data.latest('top_wallets', clock())
+        wallets = event['wallets'] if event else []
+        return [w for w in wallets if w.get('roi', 0) >= min_roi][:count]
+
+    async def monitor_wallet_activity(client, wallet_addresses: List[str], engine=None) -> List[Dict]:
+        monitored = set(wallet_addresses)
+        return [
+            a for e in since_last('wallet_activity', 'wallet_activity')
+            for a in e['activities'] if a['wallet'] in monitored
+        ]
+
+    replacements = {
+        'get_volume_data': get_volume_data,
+        'get_trending_narratives': get_trending_narratives,
+        'analyze_narrative_strength': analyze_narrative_strength,
+        'analyze_narratives': analyze_narratives,
+        'scan_tiktok_viral': scan_tiktok_viral,
+        'extract_token_mentions': extract_token_mentions,
+        'get_top_wallets': get_top_wallets,
+        'monitor_wallet_activity': monitor_wallet_activity,
+        'WalletSubscriptionEngine': _NullWalletFeed,
+        'WalletRanker': _ReplayWalletRanker,
+    }
+    targets = [(dex, 'execute_swap', broker.execute_swap)]
+    for module in modules.values():
+        for name, value in replacements.items():
+            if hasattr(module, name):
+                targets.append((module, name, value))
+
+    with _patched(targets):
+        scheduler = CycleScheduler()
+        executor = OrderExecutor.from_config(config)
+        positions = PositionBook.from_config(config)
+        executor.positions = positions
+        risk = RiskEngine.from_config(config, clock=clock)
+        executor.risk = risk
+        traders = []
+        for name in trader_names:
+            module_name, class_name = TRADER_CLASSES[name]
+            trader = getattr(modules[name], class_name)(config)
+            trader.scheduler = scheduler
+            trader.executor = executor
+            trader.positions = positions
+            trader.clock = clock
+            risk.set_capital(trader.name, broker.starting_balance_sol)
+            traders.append(trader)
+
+        async def recorded_prices(mints: List[str]) -> Dict[str, float]:
+            prices = data.prices(clock())
+            return {mint: prices[mint] for mint in mints if mint in prices}
+
+        by_name = {trader.name: trader for trader in traders}
+
+        def on_closed(exit: Dict, pnl: float):
+            proceeds = exit['quantity'] * exit['price']
+            risk.record_close(exit['trader'], exit['mint'], pnl, proceeds)
+            by_name[exit['trader']].record_trade(pnl > 0, pnl, exit['mint'], 'sell', proceeds)
+
+        watcher = PositionWatcher(
+            positions,
+            executor,
+            recorded_prices,
+            interval_seconds=config.get_setting('risk_management', 'price_poll_seconds', 2.0),
+            on_closed=on_closed
+        )
+
+        await watcher.start()
+        tasks = [asyncio.create_task(trader.run()) for trader in traders]
+        await asyncio.sleep(data.end - data.start)
+        for trader in traders:
+            trader.running = False
+            trader.request_wakeup()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await watcher.stop()
+
+    books = broker.report()
+    return {
+        'traders': {
+            trader.name: {
+                **books[name],
+                **scheduler.stats_for(trader.name),
+                'closed_trades': trader.stats['trades']
+            }
+            for name, trader in zip(trader_names, traders)
+        },
+        'orders': dict(executor.stats),
+        'simulated_seconds': data.end - data.start
+    }
+
+
+def run_backtest(
+    data_path: str,
+    config_path: str = 'config.yaml',
+    overrides: Optional[Dict[str, Any]] = None,
+    trader_names: Optional[List[str]] = None
+) -> Dict:
+    """Replay one recording on a virtual clock and return a PnL report"""
+    config = Config(config_path)
+    overrides = dict(overrides or {})
+    trader_names = trader_names or [n for n in TRADER_CLASSES if config.is_enabled(n)]
+
+    # Keep replayed volume history away from the live store
+    history_dir = tempfile.mkdtemp(prefix='elena-backtest-')
+    config.override({'volume_trader.history_path': history_dir, **overrides})
+
+    data = RecordedData.load(data_path)
+    loop = VirtualClockLoop()
+    started = time.perf_counter()
+    try:
+        report = loop.run_until_complete(_replay(data, config, trader_names))
+    finally:
+        loop.close()
+        shutil.rmtree(history_dir, ignore_errors=True)
+
+    wall = time.perf_counter() - started
+    cycles = sum(t['cycles'] for t in report['traders'].values())
+    report.update({
+        'params': overrides,
+        'pnl_sol': sum(t['pnl_sol'] for t in report['traders'].values()),
+        'wall_seconds': wall,
+        'cycles': cycles,
+        'cycles_per_second': cycles / wall if wall else 0.0
+    })
+    return report
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of `trader.key` -> values"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def run_sweep(
+    data_path: str,
+    grid: Dict[str, Sequence[Any]],
+    config_path: str = 'config.yaml',
+    trader_names: Optional[List[str]] = None,
+    workers: Optional[int] = None
+) -> List[Dict]:
+    """Run one backtest per parameter combination in a process pool"""
+    combos = expand_grid(grid)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_backtest, data_path, config_path, combo, copy.copy(trader_names))
+            for combo in combos
+        ]
+        return [future.result() for future in futures]
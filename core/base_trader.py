@@ -5,13 +5,18 @@ Abstract base class for all trading strategies
 
 import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 from datetime import datetime
 
-from solana.rpc.async_api import AsyncClient
 from solders.keypair import Keypair
 
+from core.executor import OrderExecutor, OrderIntent
+from core.positions import PositionBook
+from core.risk import RiskEngine
+from core.rpc import RpcGateway
+from core.scheduler import CycleScheduler
 from utils.config import Config
 
 
@@ -25,8 +30,37 @@ class BaseTrader(ABC):
         self.running = False
         self.logger = logging.getLogger(f"elena.{name}")
         
-        # Solana client
-        self.client = AsyncClient(config.get('SOLANA_RPC_URL'))
+        # Solana client - replaced by the manager's shared gateway via attach_rpc
+        self.client = RpcGateway.from_config(config)
+        self._owns_client = True
+        
+        # Cycle scheduling - replaced by the manager's shared scheduler
+        self.scheduler = CycleScheduler()
+        self._wakeup = asyncio.Event()
+        
+        # Wall clock in epoch seconds; the backtester swaps in simulated time
+        self.clock = time.time
+        
+        # Order execution - replaced by the manager's shared executor
+        self.executor = OrderExecutor.from_config(config, client=self.client)
+        
+        # Open positions and risk limits - replaced by the manager's shared ones
+        self.positions = PositionBook.from_config(config)
+        self.executor.positions = self.positions
+        self.executor.risk = RiskEngine.from_config(config)
+        
+        # Durable trade journal (core.journal) - attached by the manager
+        self.journal = None
+        
+        # On-demand cycle profiler (core.profiling) - attached by the manager
+        self.profiler = None
+        
+        # Prometheus metrics (core.metrics) - attached by the manager
+        self.metrics = None
+        
+        # Strategy settings, re-read when the config snapshot changes
+        self.config_version = config.version
+        self.load_settings()
         
         # Trading stats
         self.stats = {
@@ -44,18 +78,93 @@ class BaseTrader(ABC):
         self.logger.info(f"🟢 {self.name} started")
         
         try:
-            while self.running:
-                await self.trade_cycle()
-                await asyncio.sleep(self.get_sleep_interval())
+            await self.scheduler.run_trader(self)
         except Exception as e:
             self.logger.error(f"Error in trading loop: {e}", exc_info=True)
         finally:
             await self.stop()
             
+    def attach_rpc(self, rpc: RpcGateway):
+        """Use a shared RPC gateway instead of a private one"""
+        self.client = rpc
+        self.executor.client = rpc
+        self._owns_client = False
+        
+    def submit_order(
+        self,
+        token_mint: str,
+        amount_sol: float,
+        side: str = 'buy',
+        symbol: Optional[str] = None,
+        timestamps: Optional[Dict[str, float]] = None,
+        budget_seconds: Optional[float] = None
+    ) -> asyncio.Future:
+        """Submit a swap to the executor; await the future for its result
+
+        `timestamps` gets a 'submitted' stamp once the transaction is sent;
+        past `budget_seconds` an intent still waiting is dropped unsent.
+        """
+        return self.executor.submit(OrderIntent(
+            trader=self.name,
+            wallet=self.wallet,
+            token_mint=token_mint,
+            amount_sol=amount_sol,
+            side=side,
+            symbol=symbol,
+            timestamps=timestamps,
+            budget_seconds=budget_seconds
+        ))
+        
+    def load_settings(self):
+        """Read strategy settings from config - override in subclasses"""
+        pass
+        
+    def sync_config(self) -> bool:
+        """Re-read settings if config was reloaded since the last cycle"""
+        if self.config.version == self.config_version:
+            return False
+        self.config_version = self.config.version
+        self.load_settings()
+        self.logger.info(f"🔄 {self.name} picked up config version {self.config_version}")
+        return True
+        
+    def request_wakeup(self):
+        """Run the next cycle now instead of waiting for its deadline"""
+        self._wakeup.set()
+        
+    async def wait_for_wakeup(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds; return True if woken early"""
+        try:
+            if timeout > 0:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            woken = self._wakeup.is_set()
+        except asyncio.TimeoutError:
+            woken = False
+        self._wakeup.clear()
+        return woken
+        
+    async def run_cycle(self, cycle_id: int):
+        """Run one trade cycle, sampled when a profile was requested"""
+        profiler = self.profiler
+        if profiler is not None and profiler.wants(self.name):
+            with profiler.cycle(self, cycle_id):
+                await self.trade_cycle()
+        else:
+            await self.trade_cycle()
+        
+    def profile(self, cycles: Optional[int] = None):
+        """Sample-profile this trader's next `cycles` cycles"""
+        if self.profiler is None:
+            self.logger.warning(f"No profiler attached to {self.name}")
+            return
+        self.profiler.request(self.name, cycles)
+        
     async def stop(self):
         """Stop the trader"""
         self.running = False
-        await self.client.close()
+        self._wakeup.set()
+        if self._owns_client:
+            await self.client.close()
         self.logger.info(f"🔴 {self.name} stopped")
         
     @abstractmethod
@@ -81,14 +190,28 @@ class BaseTrader(ABC):
             'losses': self.stats['losses'],
             'pnl_sol': self.stats['total_pnl_sol'],
             'uptime_seconds': uptime,
-            'wallet': self.wallet
+            'wallet': self.wallet,
+            'schedule': dict(self.scheduler.stats_for(self.name))
         }
     
-    def record_trade(self, success: bool, pnl: float):
-        """Record trade result"""
+    def record_trade(
+        self,
+        success: bool,
+        pnl: float,
+        token_mint: Optional[str] = None,
+        side: Optional[str] = None,
+        amount_sol: Optional[float] = None,
+        tx_signature: Optional[str] = None
+    ):
+        """Record trade result, and journal it when a journal is attached"""
         self.stats['trades'] += 1
         if success:
             self.stats['wins'] += 1
         else:
             self.stats['losses'] += 1
         self.stats['total_pnl_sol'] += pnl
+        
+        if self.journal is not None:
+            self.journal.record_trade(
+                self.name, pnl, success, token_mint, side, amount_sol, tx_signature
+            )
@@ -0,0 +1,237 @@
+"""
+Order Executor
+Runs order intents from all traders with bounded parallelism per wallet
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from utils import dex
+from utils.config import Config
+from utils.logger import log_fields
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OrderIntent:
+    """A swap a trader wants executed"""
+    trader: str
+    wallet: str
+    token_mint: str
+    amount_sol: float
+    side: str = 'buy'
+    symbol: Optional[str] = None
+    submitted_at: float = 0.0
+    # Sells of a held position name the token quantity instead of the SOL out
+    token_amount: Optional[float] = None
+    # Stamped with 'submitted' when the transaction is actually sent
+    timestamps: Optional[Dict[str, float]] = None
+    # Seconds after submission past which the intent is dropped unsent
+    budget_seconds: Optional[float] = None
+
+    @property
+    def dedup_key(self) -> Tuple:
+        # Buys are unique per mint across traders; sells only per wallet
+        if self.side == 'buy':
+            return ('buy', self.token_mint)
+        return ('sell', self.wallet, self.token_mint)
+
+
+class OrderExecutor:
+    """Shared executor for swaps submitted by every trader
+
+    `submit()` returns a future resolving to the `execute_swap` result
+    dict. Up to `per_wallet_concurrency` swaps run at once per wallet.
+    A second intent on the same mint within `dedup_window_seconds` is
+    merged into the first when it comes from the same trader, and
+    rejected when another trader already ordered it. An intent still
+    waiting for its wallet past its `budget_seconds` is dropped unsent.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        per_wallet_concurrency: int = 3,
+        dedup_window_seconds: float = 30.0
+    ):
+        self.client = client
+        self.per_wallet_concurrency = per_wallet_concurrency
+        self.dedup_window_seconds = dedup_window_seconds
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._recent: Dict[Tuple, Tuple[OrderIntent, asyncio.Future]] = {}
+        self.in_flight = 0
+
+        # Every finished swap is written here when set (core.journal)
+        self.journal = None
+
+        # Successful buys open positions here when set (core.positions)
+        self.positions = None
+
+        # Buys reserve capacity here before they are sent (core.risk)
+        self.risk = None
+
+        # Submit-to-result latency is reported here when set (core.metrics)
+        self.metrics = None
+
+        self.stats = {
+            'submitted': 0,
+            'merged': 0,
+            'rejected': 0,
+            'risk_rejected': 0,
+            'stale': 0,
+            'executed': 0,
+            'untracked': 0,
+            'failed': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config, client=None) -> 'OrderExecutor':
+        """Build an executor from the `executor` section of config.yaml"""
+        return cls(
+            client=client,
+            per_wallet_concurrency=config.get_setting('executor', 'per_wallet_concurrency', 3),
+            dedup_window_seconds=config.get_setting('executor', 'dedup_window_seconds', 30.0)
+        )
+
+    def submit(self, intent: OrderIntent) -> asyncio.Future:
+        """Queue an order intent and return a future for its result"""
+        self.stats['submitted'] += 1
+        loop = asyncio.get_running_loop()
+        intent.submitted_at = loop.time()
+        self._expire(intent.submitted_at)
+
+        recent = self._recent.get(intent.dedup_key)
+        if recent is not None and recent[1].done() and not _succeeded(recent[1]):
+            # A failed or cancelled order does not block a retry
+            recent = None
+
+        if recent is not None:
+            first, future = recent
+            if first.trader == intent.trader:
+                self.stats['merged'] += 1
+                return future
+
+            self.stats['rejected'] += 1
+            logger.info(
+                f"⛔ {intent.trader} {intent.side} {intent.token_mint[:8]}... rejected: "
+                f"already ordered by {first.trader}"
+            )
+            rejected = loop.create_future()
+            rejected.set_result({
+                'success': False,
+                'error': f"Duplicate of {first.trader} order",
+                'tx': None,
+                'duplicate': True
+            })
+            return rejected
+
+        reservation = None
+        if self.risk is not None and intent.side == 'buy':
+            reservation = self.risk.reserve(intent.trader, intent.token_mint, intent.amount_sol)
+            if reservation is None:
+                self.stats['risk_rejected'] += 1
+                rejected = loop.create_future()
+                rejected.set_result({
+                    'success': False,
+                    'error': 'Risk limit reached',
+                    'tx': None,
+                    'risk_rejected': True
+                })
+                return rejected
+            intent.amount_sol = reservation.amount_sol
+
+        future = asyncio.ensure_future(self._execute(intent, reservation))
+        self._recent[intent.dedup_key] = (intent, future)
+        return future
+
+    def _expire(self, now: float):
+        cutoff = now - self.dedup_window_seconds
+        for key, (intent, _) in list(self._recent.items()):
+            if intent.submitted_at < cutoff:
+                del self._recent[key]
+
+    async def _execute(self, intent: OrderIntent, reservation=None) -> Dict:
+        semaphore = self._semaphores.setdefault(
+            intent.wallet, asyncio.Semaphore(self.per_wallet_concurrency)
+        )
+        self.in_flight += 1
+        try:
+            with log_fields(mint=intent.token_mint):
+                async with semaphore:
+                    if self._past_budget(intent):
+                        self.stats['stale'] += 1
+                        logger.info(
+                            f"⌛ {intent.trader} {intent.side} {intent.token_mint[:8]}... dropped: "
+                            f"past its {intent.budget_seconds:.1f}s budget"
+                        )
+                        result = {'success': False, 'error': 'Past latency budget', 'tx': None, 'stale': True}
+                    else:
+                        # Only exits of a held quantity pass it on
+                        extra = {'token_amount': intent.token_amount} if intent.token_amount is not None else {}
+                        result = await dex.execute_swap(
+                            client=self.client,
+                            wallet=intent.wallet,
+                            token_mint=intent.token_mint,
+                            amount_sol=intent.amount_sol,
+                            side=intent.side,
+                            **extra
+                        )
+        except Exception as e:
+            logger.error(f"Swap for {intent.trader} failed: {e}", exc_info=True)
+            result = {'success': False, 'error': str(e), 'tx': None}
+        finally:
+            self.in_flight -= 1
+
+        if intent.timestamps is not None and result.get('sent_at') is not None:
+            intent.timestamps['submitted'] = result['sent_at']
+
+        filled = bool(result.get('success'))
+        if filled:
+            self.stats['executed'] += 1
+            if self.positions is not None and intent.side == 'buy':
+                if self.positions.record_buy(intent, result) is None:
+                    # The SOL is spent either way; keep the exposure and leave
+                    # the fill (journaled with its tx) to be reconciled
+                    self.stats['untracked'] += 1
+                    logger.warning(
+                        f"⚠️  Buy of {intent.token_mint[:8]}... ({result.get('tx')}) has no known fill, "
+                        f"position not tracked"
+                    )
+        elif not result.get('stale'):
+            self.stats['failed'] += 1
+
+        if reservation is not None:
+            if filled:
+                self.risk.commit(reservation)
+            else:
+                self.risk.release(reservation)
+
+        latency = asyncio.get_running_loop().time() - intent.submitted_at
+        if self.metrics is not None and 'confirm_seconds' in result:
+            # Only swaps that reached the chain have a submit-to-confirm time
+            self.metrics.swap(intent.trader, intent.side, bool(result.get('success'))).observe(
+                result['confirm_seconds']
+            )
+
+        if self.journal is not None and not result.get('stale'):
+            self.journal.record_fill(
+                intent.trader, intent.wallet, intent.token_mint, intent.side,
+                intent.amount_sol, result, latency * 1000
+            )
+        return result
+
+    def _past_budget(self, intent: OrderIntent) -> bool:
+        if intent.budget_seconds is None:
+            return False
+        return asyncio.get_running_loop().time() - intent.submitted_at > intent.budget_seconds
+
+
+def _succeeded(future: asyncio.Future) -> bool:
+    """A finished order future resolved to a successful result"""
+    if future.cancelled() or future.exception() is not None:
+        return False
+    return bool(future.result().get('success'))
@@ -0,0 +1,287 @@
+"""
+Trade Journal
+Durable, append-only record of trades, fills and cycles in SQLite
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import make_url
+
+from core.positions import fill_from_result
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    trader TEXT NOT NULL,
+    token_mint TEXT,
+    side TEXT,
+    amount_sol REAL,
+    pnl_sol REAL NOT NULL,
+    success INTEGER NOT NULL,
+    tx_signature TEXT,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_trader_time ON trades (trader, timestamp);
+
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY,
+    trader TEXT NOT NULL,
+    wallet TEXT NOT NULL,
+    token_mint TEXT NOT NULL,
+    side TEXT NOT NULL,
+    amount_sol REAL NOT NULL,
+    success INTEGER NOT NULL,
+    tx_signature TEXT,
+    error TEXT,
+    latency_ms REAL,
+    timestamp REAL NOT NULL,
+    tokens REAL,
+    price REAL
+);
+CREATE INDEX IF NOT EXISTS idx_fills_trader_time ON fills (trader, timestamp);
+CREATE INDEX IF NOT EXISTS idx_fills_mint ON fills (token_mint);
+
+CREATE TABLE IF NOT EXISTS cycles (
+    id INTEGER PRIMARY KEY,
+    trader TEXT NOT NULL,
+    duration_seconds REAL NOT NULL,
+    lateness_seconds REAL NOT NULL,
+    woken INTEGER NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cycles_trader_time ON cycles (trader, timestamp);
+"""
+
+INSERTS = {
+    'trades': "INSERT INTO trades (trader, token_mint, side, amount_sol, pnl_sol, success, "
+              "tx_signature, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    'fills': "INSERT INTO fills (trader, wallet, token_mint, side, amount_sol, success, "
+             "tx_signature, error, latency_ms, timestamp, tokens, price) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'cycles': "INSERT INTO cycles (trader, duration_seconds, lateness_seconds, woken, timestamp) "
+              "VALUES (?, ?, ?, ?, ?)",
+}
+
+# Columns added after the first release, created on journals that predate them
+MIGRATIONS = {
+    'fills': (('tokens', 'REAL'), ('price', 'REAL')),
+}
+
+
+def sqlite_path(database_url: str) -> str:
+    """Database file for a `sqlite:///path` URL"""
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite':
+        raise ValueError(f"Trade journal needs a sqlite URL, got {database_url}")
+    return url.database or ':memory:'
+
+
+class TradeJournal:
+    """Append-only SQLite journal written from a background thread
+
+    `record_*` calls only put a row tuple on a queue, so they are safe to
+    call from the event loop. The writer thread drains the queue in groups
+    of up to `batch_size` rows and commits each group in one transaction;
+    the database runs in WAL mode so readers never wait on the writer.
+    """
+
+    def __init__(self, path: str = 'elena.db', batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            'queued': 0,
+            'written': 0,
+            'commits': 0,
+            'errors': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'TradeJournal':
+        """Build a journal from DATABASE_URL and the `journal` section of config.yaml"""
+        return cls(
+            path=sqlite_path(config.get('DATABASE_URL', 'sqlite:///elena.db')),
+            batch_size=config.get_setting('journal', 'batch_size', 500)
+        )
+
+    def start(self):
+        """Create the schema and start the writer thread"""
+        if self._thread is not None:
+            return
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+            for table, columns in MIGRATIONS.items():
+                existing = {row[1] for row in db.execute(f"PRAGMA table_info({table})")}
+                for name, kind in columns:
+                    if name not in existing:
+                        db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+        self._thread = threading.Thread(target=self._writer, name='trade-journal', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Write everything still queued and stop the writer thread"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every row queued so far is committed"""
+        if self._thread is None:
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def backlog(self) -> int:
+        """Rows queued but not yet written"""
+        return self._queue.qsize()
+
+    def record_trade(
+        self,
+        trader: str,
+        pnl_sol: float,
+        success: bool,
+        token_mint: Optional[str] = None,
+        side: Optional[str] = None,
+        amount_sol: Optional[float] = None,
+        tx_signature: Optional[str] = None
+    ):
+        self._put('trades', (
+            trader, token_mint, side, amount_sol, pnl_sol, int(success), tx_signature, time.time()
+        ))
+
+    def record_fill(
+        self,
+        trader: str,
+        wallet: str,
+        token_mint: str,
+        side: str,
+        amount_sol: float,
+        result: Dict,
+        latency_ms: Optional[float] = None
+    ):
+        # Buys keep their fill so open positions can be rebuilt after a crash
+        fill = fill_from_result(amount_sol, result) if side == 'buy' and result.get('success') else None
+        tokens, price = fill if fill else (None, None)
+        self._put('fills', (
+            trader, wallet, token_mint, side, amount_sol, int(bool(result.get('success'))),
+            result.get('tx'), result.get('error'), latency_ms, time.time(), tokens, price
+        ))
+
+    def record_cycle(self, trader: str, duration_seconds: float, lateness_seconds: float, woken: bool):
+        self._put('cycles', (trader, duration_seconds, lateness_seconds, int(woken), time.time()))
+
+    def pnl(
+        self,
+        trader: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> Dict[str, Dict]:
+        """Per-trader trade count, wins, losses and PnL between two epoch times"""
+        query = (
+            "SELECT trader, COUNT(*), SUM(success), COALESCE(SUM(pnl_sol), 0) "
+            "FROM trades WHERE timestamp >= ? AND timestamp < ?"
+        )
+        params: List = [since if since is not None else 0.0, until if until is not None else float('inf')]
+        if trader is not None:
+            query += " AND trader = ?"
+            params.append(trader)
+        query += " GROUP BY trader"
+
+        with self._connect() as db:
+            rows = db.execute(query, params).fetchall()
+        return {
+            name: {'trades': count, 'wins': wins, 'losses': count - wins, 'pnl_sol': pnl}
+            for name, count, wins, pnl in rows
+        }
+
+    def open_positions(self, traders: Optional[List[str]] = None) -> List[Dict]:
+        """Positions bought and not yet sold, from successful fills
+
+        Every successful buy of a (trader, mint) after its last successful
+        sell adds to the position; the entry price is their average.
+        """
+        query = (
+            "SELECT trader, MAX(wallet), token_mint, SUM(tokens), SUM(tokens * price) "
+            "FROM fills AS buy WHERE success = 1 AND side = 'buy' AND tokens > 0 "
+            "AND id > COALESCE((SELECT MAX(id) FROM fills AS sell WHERE sell.success = 1 "
+            "AND sell.side = 'sell' AND sell.trader = buy.trader "
+            "AND sell.token_mint = buy.token_mint), 0)"
+        )
+        params: List = []
+        if traders is not None:
+            query += f" AND trader IN ({', '.join('?' * len(traders))})"
+            params.extend(traders)
+        query += " GROUP BY trader, token_mint"
+
+        with self._connect() as db:
+            rows = db.execute(query, params).fetchall()
+        return [
+            {'trader': trader, 'wallet': wallet, 'mint': mint, 'quantity': tokens, 'price': cost / tokens}
+            for trader, wallet, mint, tokens, cost in rows
+        ]
+
+    def _put(self, table: str, row: Tuple):
+        self.stats['queued'] += 1
+        self._queue.put((table, row))
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _writer(self):
+        db = self._connect()
+        running = True
+        while running:
+            item = self._queue.get()
+            batch: Dict[str, List[Tuple]] = {}
+            waiters: List[threading.Event] = []
+            count = 0
+
+            # Take whatever else is already queued, up to one batch
+            while True:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    table, row = item
+                    batch.setdefault(table, []).append(row)
+                    count += 1
+                if count >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    with db:
+                        for table, rows in batch.items():
+                            db.executemany(INSERTS[table], rows)
+                    self.stats['written'] += count
+                    self.stats['commits'] += 1
+                except sqlite3.Error as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"❌ Journal write of {count} rows failed: {e}")
+
+            for waiter in waiters:
+                waiter.set()
+
+        db.close()
@@ -0,0 +1,128 @@
+"""
+Latency
+Priority queue with a staleness budget, and latency spans for hot paths
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (span name, start timestamp, end timestamp)
+COPY_SPANS = (
+    ('detect_to_submit', 'detected', 'submitted'),
+    ('source_to_submit', 'source', 'submitted'),
+    ('decode_to_submit', 'decoded', 'submitted'),
+    ('queue_wait', 'queued', 'dequeued'),
+)
+
+
+class BudgetQueue:
+    """Highest-priority-first queue that drops items past their budget
+
+    Each item carries the time its opportunity was born; `get()` skips
+    anything older than `budget_seconds` by then instead of acting on it
+    late. Past `max_items` the lowest-priority item is dropped, so a
+    burst never pushes out the best opportunities.
+    """
+
+    def __init__(
+        self,
+        budget_seconds: float = 5.0,
+        max_items: int = 1000,
+        clock: Callable[[], float] = time.time
+    ):
+        self.budget_seconds = budget_seconds
+        self.max_items = max_items
+        self.clock = clock
+
+        # (-priority, sequence, born at, item); the sequence keeps ties FIFO
+        self._heap: List[Tuple[float, int, float, Any]] = []
+        self._sequence = itertools.count()
+        self._ready = asyncio.Event()
+
+        self.stats = {
+            'queued': 0,
+            'served': 0,
+            'stale': 0,
+            'overflow': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def put(self, item: Any, priority: float, born_at: float) -> bool:
+        """Queue `item`; False if it is already past its budget"""
+        if self.clock() - born_at > self.budget_seconds:
+            self.stats['stale'] += 1
+            return False
+        heapq.heappush(self._heap, (-priority, next(self._sequence), born_at, item))
+        self.stats['queued'] += 1
+        if len(self._heap) > self.max_items:
+            # Rare, so a linear search for the worst entry is fine
+            self._heap.remove(max(self._heap, key=lambda entry: entry[:2]))
+            heapq.heapify(self._heap)
+            self.stats['overflow'] += 1
+        self._ready.set()
+        return True
+
+    async def get(self) -> Any:
+        """Wait for the best item still within its budget"""
+        while True:
+            while self._heap:
+                _, _, born_at, item = heapq.heappop(self._heap)
+                if self.clock() - born_at > self.budget_seconds:
+                    self.stats['stale'] += 1
+                    continue
+                self.stats['served'] += 1
+                return item
+            self._ready.clear()
+            await self._ready.wait()
+
+
+class LatencyTracker:
+    """Keeps the last `window` durations of each span for percentiles
+
+    A span is the time between two named timestamps recorded along a
+    path; records missing either timestamp are skipped for that span.
+    """
+
+    def __init__(self, spans: Sequence[Tuple[str, str, str]] = COPY_SPANS, window: int = 10_000):
+        self.spans = spans
+        self.samples: Dict[str, Deque[float]] = {name: deque(maxlen=window) for name, _, _ in spans}
+
+        # Span durations are also observed here when set: observe(span, seconds)
+        self.observer: Optional[Callable[[str, float], None]] = None
+
+    def record(self, timestamps: Dict[str, float]):
+        for name, start, end in self.spans:
+            if timestamps.get(start) is None or timestamps.get(end) is None:
+                continue
+            seconds = timestamps[end] - timestamps[start]
+            self.samples[name].append(seconds)
+            if self.observer is not None:
+                self.observer(name, seconds)
+
+    def percentile(self, span: str, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of a span in seconds, None without samples"""
+        samples = sorted(self.samples[span])
+        if not samples:
+            return None
+        rank = max(0, math.ceil(pct / 100 * len(samples)) - 1)
+        return samples[rank]
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {
+            name: {
+                'count': len(samples),
+                'p50': self.percentile(name, 50),
+                'p99': self.percentile(name, 99)
+            }
+            for name, samples in self.samples.items()
+        }
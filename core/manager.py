@@ -5,10 +5,26 @@ Orchestrates all trading modes and manages system lifecycle
 
 import asyncio
 import logging
-from typing import List
+import signal
+import sqlite3
+from typing import List, Optional
 from datetime import datetime
 
 from core.base_trader import BaseTrader
+from core.executor import OrderExecutor
+from core.journal import TradeJournal
+from core.metrics import Metrics
+from core.positions import PositionBook, PositionWatcher
+from core.profiling import CycleProfiler
+from core.risk import RiskEngine, SharedRiskState
+from core.rpc import RpcGateway
+from core.scheduler import CycleScheduler
+from core.status import StatusPublisher
+from core.supervisor import Supervisor
+from traders import trader_key
+from utils import dex, mentions, sentiment
+from utils.balances import snapshot_wallets
+from utils.transactions import TransactionPipeline
 from utils.config import Config
 
 logger = logging.getLogger(__name__)
@@ -17,34 +33,170 @@ logger = logging.getLogger(__name__)
 class TradingManager:
     """Manages all active traders and system operations"""
     
-    def __init__(self, traders: List[BaseTrader], config: Config):
+    def __init__(
+        self,
+        traders: List[BaseTrader],
+        config: Config,
+        risk_state: Optional[SharedRiskState] = None,
+        risk_slot: int = 0
+    ):
         self.traders = traders
         self.config = config
         self.running = False
         self.tasks = []
         
+        # A risk_state means this manager runs inside a supervised worker
+        self.risk_state = risk_state
+        self.supervisor = None
+        if risk_state is None and config.get_setting('supervisor', 'enabled', False):
+            self.supervisor = Supervisor.from_config(config, [trader_key(trader) for trader in traders])
+        
+        # Services shared by every trader: RPC gateway, cycle scheduler,
+        # order executor, trade journal, position book and risk engine
+        self.rpc = RpcGateway.from_config(config)
+        self.journal = TradeJournal.from_config(config)
+        self.scheduler = CycleScheduler.from_config(config)
+        self.scheduler.journal = self.journal
+        self.executor = OrderExecutor.from_config(config, client=self.rpc)
+        self.executor.journal = self.journal
+        self.positions = PositionBook.from_config(config)
+        self.executor.positions = self.positions
+        self.risk = RiskEngine.from_config(config, shared=risk_state, slot=risk_slot)
+        self.executor.risk = self.risk
+        self.watcher = PositionWatcher(
+            self.positions,
+            self.executor,
+            dex.get_token_prices,
+            interval_seconds=config.get_setting('risk_management', 'price_poll_seconds', 2.0),
+            on_closed=self._on_position_closed
+        )
+        dex.quote_cache = dex.QuoteCache.from_config(config)
+        mentions.mention_index = mentions.MentionExtractor.from_config(config)
+        sentiment.narrative_scorer = sentiment.NarrativeScorer.from_config(config)
+        dex.tx_pipeline = TransactionPipeline.from_config(
+            config, self.rpc, on_slot=dex.quote_cache.on_slot
+        )
+        # Prometheus metrics, fed by the shared services
+        self.metrics = Metrics.from_config(config)
+        self.rpc.metrics = self.metrics
+        self.scheduler.metrics = self.metrics
+        self.executor.metrics = self.metrics
+        self.metrics.track_queue('orders_in_flight', lambda: self.executor.in_flight)
+        self.metrics.track_queue('journal', self.journal.backlog)
+        self.metrics.track_queue('wallet_activity', lambda: sum(
+            trader.feed.queue.qsize() for trader in self.traders if getattr(trader, 'feed', None)
+        ))
+        self.metrics.track_queue('copy_fast_path', lambda: sum(
+            len(trader.copy_queue) for trader in self.traders if getattr(trader, 'copy_queue', None)
+        ))
+        self.metrics.track_positions(lambda: len(self.positions))
+        
+        # On-demand cycle profiling (SIGUSR1, status socket or config reload)
+        self.profiler = CycleProfiler.from_config(config)
+        
+        # Live status for scripts/monitor.py, control commands for scripts/profile.py
+        self.status = StatusPublisher.from_config(config, self.get_status)
+        self.status.on_command = self.handle_command
+        
+        # Hot reload: traders re-read their settings on their next cycle
+        config.on_reload(self.positions.apply_config)
+        config.on_reload(self.risk.apply_config)
+        config.on_reload(self.profiler.apply_config)
+        
+        for trader in self.traders:
+            trader.attach_rpc(self.rpc)
+            trader.scheduler = self.scheduler
+            trader.executor = self.executor
+            trader.journal = self.journal
+            trader.positions = self.positions
+            trader.profiler = self.profiler
+            trader.metrics = self.metrics
+            self.profiler.traders.add(trader.name)
+        
     async def run(self):
         """Start all traders"""
         self.running = True
         logger.info("🟢 Trading Manager started")
         
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self.profile)
+        except (NotImplementedError, RuntimeError):
+            pass
+        
+        if self.supervisor:
+            await self._run_supervised()
+            return
+        
+        self.journal.start()
+        self._restore_positions()
+        if self.config.get_setting('metrics', 'enabled', False):
+            # Supervised workers each serve on the port after the previous one
+            port = self.metrics.port
+            if self.risk_state is not None:
+                port += self.risk.slot
+            self.metrics.serve(port=port)
+        
+        # Blockhash and fee prefetching for the swap hot path
+        await dex.tx_pipeline.start()
+        
+        # Price ticks for stop-loss / take-profit exits
+        await self.watcher.start()
+        
+        if self.risk_state is None:
+            await self._start_status()
+        
+        # Percentage position sizing needs the wallet balances up front
+        try:
+            await self._refresh_capital()
+        except Exception as e:
+            logger.warning(f"Initial balance snapshot failed: {e}")
+        
         # Start each trader in parallel
         self.tasks = [
             asyncio.create_task(trader.run())
             for trader in self.traders
         ]
         
-        # Add monitoring task
+        # Add monitoring and config watching tasks
         self.tasks.append(asyncio.create_task(self._monitor()))
+        self.tasks.append(asyncio.create_task(self.config.watch(
+            self.config.get_setting('elena', 'config_reload_seconds', 2.0)
+        )))
+        # Listings learned by another process (e.g. VolumeTrader's worker)
+        self.tasks.append(asyncio.create_task(mentions.mention_index.watch(
+            self.config.get_setting('mentions', 'reload_seconds', 30.0)
+        )))
         
         # Wait for all tasks
         await asyncio.gather(*self.tasks, return_exceptions=True)
         
+    async def _run_supervised(self):
+        """Run each trader in its own worker process"""
+        logger.info(f"🧩 Supervisor mode: {len(self.supervisor.workers)} worker process(es)")
+        await self._start_status()
+        self.tasks = [asyncio.create_task(self.supervisor.run())]
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        
+    async def _start_status(self):
+        try:
+            await self.status.start()
+        except OSError as e:
+            logger.warning(f"Status socket unavailable: {e}")
+        
     async def shutdown(self):
         """Gracefully shutdown all traders"""
         logger.info("🔴 Shutting down Trading Manager...")
         self.running = False
         
+        if self.supervisor:
+            # Workers shut their own traders and services down
+            await self.supervisor.shutdown()
+            for task in self.tasks:
+                task.cancel()
+            await self.status.stop()
+            logger.info("✅ Shutdown complete")
+            return
+        
         # Stop all traders
         for trader in self.traders:
             await trader.stop()
@@ -54,8 +206,91 @@ class TradingManager:
             if not task.done():
                 task.cancel()
         
+        await self.status.stop()
+        await self.watcher.stop()
+        await dex.tx_pipeline.stop()
+        await dex.quote_cache.close()
+        await sentiment.narrative_scorer.close()
+        await self.rpc.close()
+        
+        # Writes the remaining queued rows before returning
+        self.journal.close()
+        
         logger.info("✅ Shutdown complete")
         
+    def profile(self, trader: Optional[str] = None, cycles: Optional[int] = None) -> bool:
+        """Profile the next cycles of one trader (by name) or of all of them"""
+        if self.supervisor:
+            self.supervisor.broadcast(('profile', trader, cycles))
+            return True
+        if trader is not None and trader not in self.profiler.traders:
+            return False
+        self.profiler.request(trader, cycles)
+        return True
+        
+    async def handle_command(self, command: dict) -> dict:
+        """Control commands sent over the status socket"""
+        if command.get('cmd') == 'profile':
+            if self.profile(command.get('trader'), command.get('cycles')):
+                return {'ok': True}
+            return {'ok': False, 'error': f"unknown trader {command.get('trader')}"}
+        return {'ok': False, 'error': f"unknown command {command.get('cmd')}"}
+        
+    def _restore_positions(self):
+        """Track positions a previous run (or crashed worker) bought but never sold"""
+        try:
+            held = self.journal.open_positions([trader.name for trader in self.traders])
+        except sqlite3.Error as e:
+            logger.warning(f"Open positions not restored from the journal: {e}")
+            return
+        if self.risk_state is not None:
+            # Replace the counts a crashed predecessor in this slot left behind
+            self.risk_state.clear(self.risk.slot)
+        for position in held:
+            self.positions.open(
+                position['trader'], position['wallet'], position['mint'],
+                position['quantity'], position['price']
+            )
+            self.risk.adopt(position['trader'], position['mint'])
+        if held:
+            logger.info(f"♻️  Restored {len(held)} open position(s) from the journal")
+        
+    def _on_position_closed(self, exit: dict, pnl: float):
+        """Credit a settled exit to the trader that opened it"""
+        self.risk.record_close(exit['trader'], exit['mint'], pnl, exit['quantity'] * exit['price'])
+        for trader in self.traders:
+            if trader.name == exit['trader']:
+                trader.record_trade(
+                    pnl > 0, pnl, exit['mint'], 'sell', exit['quantity'] * exit['price']
+                )
+        
+    async def get_status(self) -> dict:
+        """Status of every trader plus the shared services"""
+        if self.supervisor:
+            return {
+                'time': datetime.now().isoformat(timespec='seconds'),
+                **self.supervisor.get_status()
+            }
+        return {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'traders': {trader.name: await trader.get_status() for trader in self.traders},
+            'positions': self.positions.positions(),
+            'risk': self.risk.get_status(),
+            'orders': {**self.executor.stats, 'in_flight': self.executor.in_flight},
+            'rpc': dict(self.rpc.stats),
+            'journal_backlog': self.journal.backlog()
+        }
+        
+    async def _refresh_capital(self) -> dict:
+        """Snapshot wallet balances and size risk limits from them"""
+        wallets = [trader.wallet for trader in self.traders]
+        snapshot = await snapshot_wallets(self.rpc, wallets)
+        for trader in self.traders:
+            wallet = snapshot.get(trader.wallet)
+            if wallet and not wallet['error']:
+                self.risk.set_capital(trader.name, wallet['sol'])
+        return snapshot
+        
     async def _monitor(self):
         """Monitor system health and trader status"""
         while self.running:
@@ -67,6 +302,15 @@ class TradingManager:
                 for trader in self.traders:
                     status = await trader.get_status()
                     logger.info(f"  - {trader.name}: {status}")
+                logger.info(f"  - Risk: {self.risk.get_status()}")
+                
+                # One batched snapshot for all trading wallets
+                snapshot = await self._refresh_capital()
+                for address, wallet in snapshot.items():
+                    logger.info(
+                        f"  - {address[:8]}...: {wallet['sol']:.4f} SOL, "
+                        f"{len(wallet['tokens'])} token accounts"
+                    )
                     
             except Exception as e:
                 logger.error(f"Error in monitoring: {e}")
@@ -0,0 +1,136 @@
+"""
+Metrics
+Prometheus metrics for cycles, RPC calls, swaps, copy latency, queues and positions
+"""
+
+import logging
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Metrics:
+    """Metric families plus cached, pre-bound label children
+
+    Hot paths fetch their children once through `cycle()`, `rpc()` and
+    `swap()` and then only call `observe`/`inc` on them, so no label
+    lookup happens per event. Queue depths and open positions are gauges
+    read through callbacks at scrape time and cost nothing in between.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[CollectorRegistry] = None,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        host: str = '127.0.0.1',
+        port: int = 9108
+    ):
+        self.registry = registry or CollectorRegistry()
+        self.host = host
+        self.port = port
+
+        self.cycle_seconds = Histogram(
+            'elena_trade_cycle_seconds', 'Duration of trade_cycle',
+            ['trader'], buckets=buckets, registry=self.registry
+        )
+        self.cycle_overruns = Counter(
+            'elena_cycle_overruns', 'Cycles that ran past their next deadline',
+            ['trader'], registry=self.registry
+        )
+        self.rpc_seconds = Histogram(
+            'elena_rpc_call_seconds', 'JSON-RPC wire call latency',
+            ['method'], buckets=buckets, registry=self.registry
+        )
+        self.rpc_errors = Counter(
+            'elena_rpc_errors', 'Failed JSON-RPC calls',
+            ['method'], registry=self.registry
+        )
+        self.swap_seconds = Histogram(
+            'elena_swap_seconds', 'Transaction send to confirmation latency',
+            ['trader', 'side', 'outcome'], buckets=buckets, registry=self.registry
+        )
+        self.copy_latency_seconds = Histogram(
+            'elena_copy_latency_seconds', 'Copy-trade fast path spans, e.g. detect to submit',
+            ['trader', 'span'], buckets=buckets, registry=self.registry
+        )
+        self.queue_depth = Gauge(
+            'elena_queue_depth', 'Items waiting in internal queues',
+            ['queue'], registry=self.registry
+        )
+        self.open_positions = Gauge(
+            'elena_open_positions', 'Positions held across all traders',
+            registry=self.registry
+        )
+
+        self._cycles: Dict[str, Tuple] = {}
+        self._rpc: Dict[str, Tuple] = {}
+        self._swaps: Dict[Tuple[str, str, str], object] = {}
+        self._copy_spans: Dict[Tuple[str, str], object] = {}
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'Metrics':
+        """Build metrics from the `metrics` section of config.yaml"""
+        return cls(
+            buckets=tuple(config.get_setting('metrics', 'latency_buckets', LATENCY_BUCKETS)),
+            host=config.get_setting('metrics', 'host', '127.0.0.1'),
+            port=config.get_setting('metrics', 'port', 9108)
+        )
+
+    def cycle(self, trader: str) -> Tuple:
+        """(duration histogram, overrun counter) children for a trader"""
+        children = self._cycles.get(trader)
+        if children is None:
+            children = (self.cycle_seconds.labels(trader), self.cycle_overruns.labels(trader))
+            self._cycles[trader] = children
+        return children
+
+    def rpc(self, method: str) -> Tuple:
+        """(latency histogram, error counter) children for an RPC method"""
+        children = self._rpc.get(method)
+        if children is None:
+            children = (self.rpc_seconds.labels(method), self.rpc_errors.labels(method))
+            self._rpc[method] = children
+        return children
+
+    def swap(self, trader: str, side: str, success: bool):
+        """Latency histogram child for a trader's swaps"""
+        key = (trader, side, 'success' if success else 'failure')
+        child = self._swaps.get(key)
+        if child is None:
+            child = self.swap_seconds.labels(*key)
+            self._swaps[key] = child
+        return child
+
+    def copy_span(self, trader: str, span: str):
+        """Latency histogram child for one span of a trader's copy fast path"""
+        key = (trader, span)
+        child = self._copy_spans.get(key)
+        if child is None:
+            child = self.copy_latency_seconds.labels(*key)
+            self._copy_spans[key] = child
+        return child
+
+    def track_queue(self, name: str, depth: Callable[[], float]):
+        """Report `depth()` as the queue's size at scrape time"""
+        self.queue_depth.labels(name).set_function(depth)
+
+    def track_positions(self, count: Callable[[], float]):
+        self.open_positions.set_function(count)
+
+    def serve(self, port: Optional[int] = None, host: Optional[str] = None) -> bool:
+        """Serve /metrics from a background thread; False if the port is taken"""
+        port = self.port if port is None else port
+        host = self.host if host is None else host
+        try:
+            start_http_server(port, addr=host, registry=self.registry)
+        except OSError as e:
+            logger.warning(f"⚠️  Metrics not served on {host}:{port}: {e}")
+            return False
+        logger.info(f"📈 Metrics on http://{host}:{port}/metrics")
+        return True
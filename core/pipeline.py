@@ -0,0 +1,86 @@
+"""
+Stage Pipeline
+Runs items through async stages joined by bounded queues
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """One step of a pipeline
+
+    `handler(item)` returns the item for the next stage, or None to drop
+    it. With `fan_out` it returns a list and each element moves on.
+    """
+    name: str
+    handler: Callable[[Any], Awaitable[Any]]
+    workers: int = 1
+    fan_out: bool = False
+
+
+class StagePipeline:
+    """Chain of async stages, each with its own pool of workers
+
+    Stages are connected by queues of at most `queue_size` items, so a
+    slow stage holds back the ones before it instead of piling up work in
+    memory, and every stage processes up to `workers` items at once. A
+    `run()` drains the pipeline stage by stage: once a stage's input
+    queue is empty and its workers are idle, every output it produced is
+    already queued for the next stage.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 100):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats: Dict[str, Dict[str, int]] = {
+            stage.name: {'processed': 0, 'dropped': 0, 'errors': 0} for stage in stages
+        }
+
+    async def run(self, items: Iterable) -> List:
+        """Push `items` through every stage; return what the last stage emitted"""
+        queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        results: List = []
+        workers = [
+            asyncio.create_task(self._work(stage, queues[index], queues[index + 1:index + 2], results))
+            for index, stage in enumerate(self.stages)
+            for _ in range(max(1, stage.workers))
+        ]
+        try:
+            for item in items:
+                await queues[0].put(item)
+            for queue in queues:
+                await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return results
+
+    async def _work(self, stage: Stage, inbox: asyncio.Queue, outbox: List[asyncio.Queue], results: List):
+        stats = self.stats[stage.name]
+        while True:
+            item = await inbox.get()
+            try:
+                output = await stage.handler(item)
+            except Exception as e:
+                stats['errors'] += 1
+                logger.warning(f"Pipeline stage {stage.name} failed: {e}")
+                inbox.task_done()
+                continue
+
+            stats['processed'] += 1
+            outputs = (output or []) if stage.fan_out else ([] if output is None else [output])
+            if not outputs:
+                stats['dropped'] += 1
+            for value in outputs:
+                if outbox:
+                    await outbox[0].put(value)
+                else:
+                    results.append(value)
+            inbox.task_done()
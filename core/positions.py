@@ -0,0 +1,369 @@
+"""
+Position Book
+Shared open positions with vectorized stop-loss / take-profit exits
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.executor import OrderIntent
+from utils.config import Config
+from utils.dex import LAMPORTS_PER_SOL
+
+logger = logging.getLogger(__name__)
+
+FREE, OPEN, EXITING = 0, 1, 2
+
+
+def fill_from_result(amount_sol: float, result: Dict) -> Optional[Tuple[float, float]]:
+    """(quantity, price in SOL per unit) of a successful buy, if known
+
+    Live swaps report the route quote (token base units out for the SOL
+    in); simulated swaps report the fill directly.
+    """
+    fill = result.get('fill')
+    if fill:
+        return fill['tokens'], fill['price']
+    quote = result.get('quote')
+    if quote and int(quote.get('outAmount') or 0) > 0:
+        quantity = int(quote['outAmount'])
+        return quantity, amount_sol / quantity
+    return None
+
+
+def exit_price_from_result(quantity: float, result: Dict) -> Optional[float]:
+    """Price in SOL per unit a sell of `quantity` actually got, if known
+
+    Live sells quote the lamports out for the tokens in; simulated swaps
+    report the fill directly.
+    """
+    fill = result.get('fill')
+    if fill:
+        return fill['price']
+    quote = result.get('quote')
+    if quote and quantity > 0 and quote.get('outAmount') is not None:
+        return int(quote['outAmount']) / LAMPORTS_PER_SOL / quantity
+    return None
+
+
+class PositionBook:
+    """Open positions of every trader in NumPy columns
+
+    Each (trader, mint) holding owns a row. A price update writes the new
+    prices into the rows of the affected mints and evaluates stop-loss,
+    take-profit and trailing-stop rules for the whole book in one masked
+    pass; rows that trigger move to EXITING until their sell is settled.
+    """
+
+    def __init__(
+        self,
+        stop_loss: float = 0.15,
+        take_profit: float = 0.50,
+        trailing_stop: float = 0.0,
+        capacity: int = 256
+    ):
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trailing_stop = trailing_stop
+
+        self.index: Dict[Tuple[str, str], int] = {}
+        self.mint_rows: Dict[str, List[int]] = {}
+        self.keys: List[Optional[Tuple[str, str]]] = []
+        self.wallets: List[str] = []
+        self.symbols: List[Optional[str]] = []
+        self.reasons: List[Optional[str]] = []
+        self._free: List[int] = []
+        self.size = 0
+
+        self.state = np.zeros(capacity, dtype=np.int8)
+        self.exit_requested = np.zeros(capacity, dtype=bool)
+        self.quantity = np.zeros(capacity, dtype=np.float64)
+        self.entry_price = np.zeros(capacity, dtype=np.float64)
+        self.last_price = np.zeros(capacity, dtype=np.float64)
+        self.peak_price = np.zeros(capacity, dtype=np.float64)
+        self.opened_at = np.zeros(capacity, dtype=np.float64)
+
+        self.stats = {
+            'opened': 0,
+            'closed': 0,
+            'exits_triggered': 0,
+            'realized_pnl_sol': 0.0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'PositionBook':
+        """Build a book from the `risk_management` section of config.yaml"""
+        return cls(
+            stop_loss=config.get_setting('risk_management', 'global_stop_loss', 0.15),
+            take_profit=config.get_setting('risk_management', 'global_take_profit', 0.50),
+            trailing_stop=config.get_setting('risk_management', 'trailing_stop', 0.0)
+        )
+
+    def apply_config(self, config: Config):
+        """Take new exit thresholds after a config reload"""
+        self.stop_loss = config.get_setting('risk_management', 'global_stop_loss', self.stop_loss)
+        self.take_profit = config.get_setting('risk_management', 'global_take_profit', self.take_profit)
+        self.trailing_stop = config.get_setting('risk_management', 'trailing_stop', self.trailing_stop)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.state[:self.size] != FREE))
+
+    def open(
+        self,
+        trader: str,
+        wallet: str,
+        mint: str,
+        quantity: float,
+        price: float,
+        symbol: Optional[str] = None,
+        now: Optional[float] = None
+    ) -> int:
+        """Add a fill to the (trader, mint) position, averaging the entry price"""
+        key = (trader, mint)
+        row = self.index.get(key)
+        if row is None:
+            row = self._add(key, wallet, symbol)
+            self.opened_at[row] = now if now is not None else time.time()
+            self.state[row] = OPEN
+            self.stats['opened'] += 1
+
+        held = self.quantity[row]
+        total = held + quantity
+        self.entry_price[row] = (held * self.entry_price[row] + quantity * price) / total
+        self.quantity[row] = total
+        self.last_price[row] = price
+        self.peak_price[row] = max(self.peak_price[row], price)
+        return row
+
+    def record_buy(self, intent: OrderIntent, result: Dict) -> Optional[int]:
+        """Open or add to a position from a successful executor buy"""
+        fill = fill_from_result(intent.amount_sol, result)
+        if fill is None:
+            return None
+        quantity, price = fill
+        return self.open(intent.trader, intent.wallet, intent.token_mint, quantity, price, intent.symbol)
+
+    def request_exit(self, trader: str, mint: str, reason: str) -> bool:
+        """Flag a position to exit on the next price update"""
+        row = self.index.get((trader, mint))
+        if row is None or self.state[row] != OPEN:
+            return False
+        self.exit_requested[row] = True
+        self.reasons[row] = reason
+        return True
+
+    def on_prices(self, prices: Dict[str, float]) -> List[Dict]:
+        """Apply a price tick and return the positions that must exit"""
+        rows: List[int] = []
+        values: List[float] = []
+        for mint, price in prices.items():
+            mint_rows = self.mint_rows.get(mint)
+            if mint_rows and price > 0:
+                rows.extend(mint_rows)
+                values.extend([price] * len(mint_rows))
+        if rows:
+            rows_arr = np.asarray(rows, dtype=np.int64)
+            self.last_price[rows_arr] = values
+            self.peak_price[rows_arr] = np.maximum(self.peak_price[rows_arr], values)
+
+        n = self.size
+        last = self.last_price[:n]
+        entry = self.entry_price[:n]
+        peak = self.peak_price[:n]
+        priced = (self.state[:n] == OPEN) & (last > 0) & (entry > 0)
+        change = np.divide(last, entry, out=np.ones(n), where=entry > 0) - 1
+
+        requested = priced & self.exit_requested[:n]
+        stop = priced & (change <= -self.stop_loss)
+        take = priced & (change >= self.take_profit)
+        trail = np.zeros(n, dtype=bool)
+        if self.trailing_stop > 0:
+            trail = priced & (peak > entry) & (last <= peak * (1 - self.trailing_stop))
+
+        exits = []
+        for row in np.flatnonzero(requested | stop | take | trail):
+            if requested[row]:
+                reason = self.reasons[row]
+            elif stop[row]:
+                reason = 'stop_loss'
+            elif take[row]:
+                reason = 'take_profit'
+            else:
+                reason = 'trailing_stop'
+            self.state[row] = EXITING
+            exits.append(self._record(row, reason, float(change[row])))
+
+        self.stats['exits_triggered'] += len(exits)
+        return exits
+
+    def close(self, row: int, price: float) -> float:
+        """Settle an exited position and return its realized PnL in SOL"""
+        pnl = float(self.quantity[row] * (price - self.entry_price[row]))
+        key = self.keys[row]
+        del self.index[key]
+        self.mint_rows[key[1]].remove(row)
+        if not self.mint_rows[key[1]]:
+            del self.mint_rows[key[1]]
+
+        self.keys[row] = None
+        self.reasons[row] = None
+        self.state[row] = FREE
+        self.exit_requested[row] = False
+        for column in (self.quantity, self.entry_price, self.last_price, self.peak_price):
+            column[row] = 0.0
+        self._free.append(row)
+
+        self.stats['closed'] += 1
+        self.stats['realized_pnl_sol'] += pnl
+        return pnl
+
+    def reopen(self, row: int):
+        """Return a position whose exit failed to the open set"""
+        if self.state[row] == EXITING:
+            self.state[row] = OPEN
+
+    def holds(self, trader: str, mint: str) -> bool:
+        """Whether the trader has an open or exiting position in `mint`"""
+        return (trader, mint) in self.index
+
+    def open_mints(self) -> List[str]:
+        return list(self.mint_rows)
+
+    def positions(self, trader: Optional[str] = None) -> List[Dict]:
+        """Open and exiting positions, optionally for one trader"""
+        rows = np.flatnonzero(self.state[:self.size] != FREE)
+        return [
+            self._record(row, self.reasons[row], float(self.last_price[row] / self.entry_price[row] - 1))
+            for row in rows
+            if trader is None or self.keys[row][0] == trader
+        ]
+
+    def _record(self, row: int, reason: Optional[str], change: float) -> Dict:
+        trader, mint = self.keys[row]
+        return {
+            'row': int(row),
+            'trader': trader,
+            'wallet': self.wallets[row],
+            'mint': mint,
+            'symbol': self.symbols[row],
+            'quantity': float(self.quantity[row]),
+            'entry_price': float(self.entry_price[row]),
+            'price': float(self.last_price[row]),
+            'return_pct': change * 100,
+            'reason': reason
+        }
+
+    def _add(self, key: Tuple[str, str], wallet: str, symbol: Optional[str]) -> int:
+        if self._free:
+            row = self._free.pop()
+            self.keys[row] = key
+            self.wallets[row] = wallet
+            self.symbols[row] = symbol
+        else:
+            if self.size == len(self.state):
+                self._grow()
+            row = self.size
+            self.keys.append(key)
+            self.wallets.append(wallet)
+            self.symbols.append(symbol)
+            self.reasons.append(None)
+            self.size += 1
+        self.index[key] = row
+        self.mint_rows.setdefault(key[1], []).append(row)
+        return row
+
+    def _grow(self):
+        capacity = len(self.state) * 2
+        for name in ('state', 'exit_requested', 'quantity', 'entry_price',
+                     'last_price', 'peak_price', 'opened_at'):
+            old = getattr(self, name)
+            column = np.zeros(capacity, dtype=old.dtype)
+            column[:self.size] = old[:self.size]
+            setattr(self, name, column)
+
+
+class PositionWatcher:
+    """Feeds price ticks to the book and sells whatever it flags
+
+    `price_source(mints)` is awaited every `interval_seconds` and returns
+    prices in SOL per unit for the mints it could price. `on_closed(exit,
+    pnl)` is called after each settled exit.
+    """
+
+    def __init__(
+        self,
+        book: PositionBook,
+        executor,
+        price_source: Callable,
+        interval_seconds: float = 2.0,
+        on_closed: Optional[Callable] = None
+    ):
+        self.book = book
+        self.executor = executor
+        self.price_source = price_source
+        self.interval_seconds = interval_seconds
+        self.on_closed = on_closed
+        self._task: Optional[asyncio.Task] = None
+        self._exits: set = set()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.gather(*self._exits, return_exceptions=True)
+
+    async def tick(self) -> List[Dict]:
+        """Price every open mint once and start the triggered exits"""
+        mints = self.book.open_mints()
+        prices = await self.price_source(mints) if mints else {}
+        exits = self.book.on_prices(prices)
+        for exit in exits:
+            task = asyncio.ensure_future(self._exit(exit))
+            self._exits.add(task)
+            task.add_done_callback(self._exits.discard)
+        return exits
+
+    async def _exit(self, exit: Dict):
+        logger.info(
+            f"🚪 {exit['trader']} exiting {exit['symbol'] or exit['mint'][:8]} "
+            f"({exit['reason']}, {exit['return_pct']:+.1f}%)"
+        )
+        # Sell everything held for whatever SOL it fetches now; asking for
+        # the tick's SOL value would need more tokens once the price fell
+        result = await self.executor.submit(OrderIntent(
+            trader=exit['trader'],
+            wallet=exit['wallet'],
+            token_mint=exit['mint'],
+            amount_sol=exit['quantity'] * exit['price'],
+            side='sell',
+            symbol=exit['symbol'],
+            token_amount=exit['quantity']
+        ))
+        if not result.get('success'):
+            logger.warning(f"❌ Exit for {exit['mint'][:8]}... failed: {result.get('error')}")
+            self.book.reopen(exit['row'])
+            return
+
+        price = exit_price_from_result(exit['quantity'], result)
+        if price is None:
+            logger.warning(f"⚠️  Exit of {exit['mint'][:8]}... has no known fill, booked at the tick price")
+            price = exit['price']
+        pnl = self.book.close(exit['row'], price)
+        if self.on_closed:
+            self.on_closed(exit, pnl)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.warning(f"Position price update failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
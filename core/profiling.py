@@ -0,0 +1,225 @@
+"""
+Cycle Profiler
+Samples the stacks of selected trade cycles and writes flame graph and pstats files
+"""
+
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# (filename, first line, function name), the key pstats uses
+FuncKey = Tuple[str, int, str]
+
+
+class _Session:
+    """Samples collected for one trader's requested cycles"""
+
+    def __init__(self, trader: str, cycles: int):
+        self.trader = trader
+        self.cycles_left = cycles
+        self.cycle_ids: List[int] = []
+        self.samples: Counter = Counter()
+        self.idle_samples = 0
+        # Set while one of this trader's cycles runs
+        self.root = None
+        self.thread_id: Optional[int] = None
+        self.cycle_id: Optional[int] = None
+
+
+class _SampledStats:
+    """pstats loader for sample counts; call counts are sample counts"""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class CycleProfiler:
+    """On-demand sampling profiler for `trade_cycle`
+
+    `request()` arms the next `cycles` cycles of one trader, or of every
+    registered trader. While an armed cycle runs, a background thread
+    samples the event loop thread's stack every `interval_seconds` and
+    keeps the samples whose stack passes through that trader's
+    `trade_cycle`; samples taken while the cycle is parked on I/O count
+    as idle. Once the cycles are done, a collapsed-stack file (one root
+    frame per cycle id, ready for flamegraph.pl or speedscope) and a
+    pstats file are written to `output_dir`.
+
+    When nothing is armed the only cost per cycle is the `wants()` lookup
+    and no sampler thread exists.
+    """
+
+    def __init__(self, output_dir: str = 'profiles', interval_seconds: float = 0.005, default_cycles: int = 10):
+        self.output_dir = output_dir
+        self.interval_seconds = interval_seconds
+        self.default_cycles = default_cycles
+
+        # Names that a request for every trader expands to
+        self.traders: Set[str] = set()
+        # Trader -> cycles requested but not started yet
+        self.requested: Dict[str, int] = {}
+        self.sessions: Dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_config_request = None
+
+        self.stats = {
+            'requests': 0,
+            'profiled_cycles': 0,
+            'samples': 0,
+            'files_written': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'CycleProfiler':
+        """Build a profiler from the `profiling` section of config.yaml"""
+        profiler = cls(
+            output_dir=config.get_setting('profiling', 'output_dir', 'profiles'),
+            interval_seconds=config.get_setting('profiling', 'sample_interval_ms', 5) / 1000,
+            default_cycles=config.get_setting('profiling', 'cycles', 10)
+        )
+        # Only a changed request number arms it, so a restart does not
+        profiler._last_config_request = config.get_setting('profiling', 'request', 0)
+        return profiler
+
+    def apply_config(self, config: Config):
+        """Arm on reload when `profiling.request` changes"""
+        request = config.get_setting('profiling', 'request', 0)
+        if request == self._last_config_request:
+            return
+        self._last_config_request = request
+        if request:
+            self.request(
+                config.get_setting('profiling', 'trader', None) or None,
+                config.get_setting('profiling', 'cycles', self.default_cycles)
+            )
+
+    def request(self, trader: Optional[str] = None, cycles: Optional[int] = None):
+        """Profile the next `cycles` cycles of `trader`, or of every trader"""
+        cycles = cycles or self.default_cycles
+        for name in [trader] if trader else sorted(self.traders):
+            self.requested[name] = cycles
+        self.stats['requests'] += 1
+        logger.info(f"🔬 Profiling next {cycles} cycle(s) of {trader or 'every trader'}")
+
+    def wants(self, trader: str) -> bool:
+        return trader in self.requested or trader in self.sessions
+
+    @contextmanager
+    def cycle(self, trader, cycle_id: int):
+        """Sample the stack while `trader.trade_cycle` runs inside the block"""
+        session = self.sessions.get(trader.name)
+        if session is None:
+            session = _Session(trader.name, self.requested.pop(trader.name))
+            self.sessions[trader.name] = session
+
+        with self._lock:
+            session.root = type(trader).trade_cycle.__code__
+            session.thread_id = threading.get_ident()
+            session.cycle_id = cycle_id
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample_loop, name='cycle-profiler', daemon=True)
+                self._thread.start()
+        try:
+            yield
+        finally:
+            with self._lock:
+                session.root = None
+            session.cycle_ids.append(cycle_id)
+            session.cycles_left -= 1
+            self.stats['profiled_cycles'] += 1
+            if session.cycles_left <= 0:
+                self._finish(session)
+
+    def _finish(self, session: _Session):
+        with self._lock:
+            del self.sessions[session.trader]
+        try:
+            paths = self.write(session)
+            logger.info(f"🔬 Profile of {session.trader} written to {', '.join(paths)}")
+        except OSError as e:
+            logger.error(f"❌ Could not write profile of {session.trader}: {e}")
+
+    def write(self, session: _Session) -> List[str]:
+        """Write the collapsed stacks and pstats of a finished session"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        ids = session.cycle_ids
+        stem = os.path.join(
+            self.output_dir, f"{session.trader}-{int(time.time())}-cycles{ids[0]}-{ids[-1]}"
+        )
+        with open(stem + '.collapsed', 'w') as f:
+            for (cycle_id, stack), count in sorted(session.samples.items(), key=lambda s: s[0][0]):
+                frames = ';'.join(f"{name} ({os.path.basename(file)}:{line})" for file, line, name in stack)
+                f.write(f"{session.trader}:cycle-{cycle_id};{frames} {count}\n")
+
+        stats = pstats.Stats(_SampledStats(self._pstats(session)))
+        stats.dump_stats(stem + '.pstats')
+        self.stats['files_written'] += 2
+        return [stem + '.collapsed', stem + '.pstats']
+
+    def _pstats(self, session: _Session) -> Dict:
+        """pstats table from samples: times are sample counts times the interval"""
+        table: Dict[FuncKey, list] = {}
+        callers: Dict[FuncKey, Dict[FuncKey, list]] = {}
+        for (_, stack), count in session.samples.items():
+            seconds = count * self.interval_seconds
+            seen = set()
+            for depth, func in enumerate(stack):
+                entry = table.setdefault(func, [0, 0, 0.0, 0.0])
+                entry[0] += count
+                entry[1] += count
+                if func not in seen:
+                    entry[3] += seconds
+                    seen.add(func)
+                if depth == len(stack) - 1:
+                    entry[2] += seconds
+                if depth:
+                    edge = callers.setdefault(func, {}).setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                    edge[0] += count
+                    edge[1] += count
+                    edge[3] += seconds
+                    if depth == len(stack) - 1:
+                        edge[2] += seconds
+        return {
+            func: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.get(func, {}).items()})
+            for func, (cc, nc, tt, ct) in table.items()
+        }
+
+    def _sample_loop(self):
+        # Exits once no session is left, so an idle profiler has no thread
+        while True:
+            time.sleep(self.interval_seconds)
+            frames = sys._current_frames()
+            with self._lock:
+                if not self.sessions:
+                    self._thread = None
+                    return
+                for session in self.sessions.values():
+                    if session.root is not None:
+                        self._sample(session, frames.get(session.thread_id))
+
+    def _sample(self, session: _Session, frame):
+        stack: List[FuncKey] = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            if code is session.root:
+                stack.reverse()
+                session.samples[(session.cycle_id, tuple(stack))] += 1
+                self.stats['samples'] += 1
+                return
+            frame = frame.f_back
+        session.idle_samples += 1
@@ -0,0 +1,280 @@
+"""
+Risk Engine
+Global pre-trade limits shared by every trader
+"""
+
+import itertools
+import logging
+import multiprocessing
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Reservation:
+    """Capacity held for one buy between submit and fill"""
+    id: int
+    trader: str
+    token_mint: str
+    amount_sol: float
+
+
+class SharedRiskState:
+    """Risk counters in shared memory, for traders running in separate processes
+
+    Layout is `[day, daily_pnl_sol, positions_0, pending_0, positions_1, ...]`
+    with one (positions, pending) pair per worker slot, so the supervisor
+    can give back a crashed worker's capacity. Callers hold `lock` around
+    every read-modify-write.
+    """
+
+    def __init__(self, slots: int, context=None):
+        context = context or multiprocessing.get_context()
+        self.slots = slots
+        self.values = context.Array('d', 2 + 2 * slots)
+
+    @property
+    def lock(self):
+        return self.values.get_lock()
+
+    def in_use(self) -> int:
+        """Open positions plus pending reservations across every slot"""
+        return int(sum(self.values[2:]))
+
+    def add(self, slot: int, positions: int = 0, pending: int = 0):
+        self.values[2 + 2 * slot] += positions
+        self.values[3 + 2 * slot] += pending
+
+    def clear(self, slot: int, positions: bool = True) -> Tuple[int, int]:
+        """Zero a slot's counters (or only its pending ones) and return what they held"""
+        with self.lock:
+            held = (int(self.values[2 + 2 * slot]), int(self.values[3 + 2 * slot]))
+            if positions:
+                self.values[2 + 2 * slot] = 0
+            self.values[3 + 2 * slot] = 0
+        return held
+
+    def get_status(self) -> Dict:
+        with self.lock:
+            values = self.values[:]
+        return {
+            'open_positions': int(sum(values[2::2])),
+            'pending': int(sum(values[3::2])),
+            'daily_pnl_sol': values[1]
+        }
+
+
+class RiskEngine:
+    """Atomic pre-trade reservations against global risk limits
+
+    Every method is synchronous and O(1), so a check-and-reserve can never
+    be interleaved with another trader's on the event loop and no lock is
+    needed. A buy reserves a position slot before it is sent; the
+    reservation is committed into an open position on fill or released on
+    failure. Realized PnL is accumulated per UTC day and new buys stop
+    once the day's loss reaches `daily_loss_limit_sol`.
+
+    With a `shared` state the position count and daily PnL are global
+    across worker processes; this engine then books its own changes in
+    `slot` under the shared lock.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_positions: int = 5,
+        max_position_size_pct: float = 0.20,
+        daily_loss_limit_sol: float = 5.0,
+        max_position_size_sol: float = 10.0,
+        clock=time.time,
+        shared: Optional[SharedRiskState] = None,
+        slot: int = 0
+    ):
+        self.max_concurrent_positions = max_concurrent_positions
+        self.max_position_size_pct = max_position_size_pct
+        self.daily_loss_limit_sol = daily_loss_limit_sol
+        self.max_position_size_sol = max_position_size_sol
+        self.clock = clock
+        self.shared = shared
+        self.slot = slot
+
+        self.capital: Dict[str, float] = {}
+        self.pending: Dict[int, Reservation] = {}
+        self.open_positions: Set[Tuple[str, str]] = set()
+        self._ids = itertools.count(1)
+
+        self._day = self._today()
+        self._daily_pnl_sol = 0.0
+
+        self.stats = {
+            'reserved': 0,
+            'committed': 0,
+            'released': 0,
+            'rejected_positions': 0,
+            'rejected_daily_loss': 0,
+            'rejected_size': 0
+        }
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Config,
+        clock=time.time,
+        shared: Optional[SharedRiskState] = None,
+        slot: int = 0
+    ) -> 'RiskEngine':
+        """Build a risk engine from the `risk_management` section of config.yaml"""
+        return cls(
+            max_concurrent_positions=config.get_setting('risk_management', 'max_concurrent_positions', 5),
+            max_position_size_pct=config.get_setting('risk_management', 'max_position_size_pct', 0.20),
+            daily_loss_limit_sol=config.get_setting('risk_management', 'daily_loss_limit_sol', 5.0),
+            max_position_size_sol=float(config.get('MAX_POSITION_SIZE_SOL', '10')),
+            clock=clock,
+            shared=shared,
+            slot=slot
+        )
+
+    def apply_config(self, config: Config):
+        """Take new limits after a config reload; open positions are kept"""
+        self.max_concurrent_positions = config.get_setting(
+            'risk_management', 'max_concurrent_positions', self.max_concurrent_positions
+        )
+        self.max_position_size_pct = config.get_setting(
+            'risk_management', 'max_position_size_pct', self.max_position_size_pct
+        )
+        self.daily_loss_limit_sol = config.get_setting(
+            'risk_management', 'daily_loss_limit_sol', self.daily_loss_limit_sol
+        )
+        self.max_position_size_sol = config.snapshot.max_position_size_sol
+
+    @property
+    def daily_pnl_sol(self) -> float:
+        if self.shared is not None:
+            return self.shared.values[1]
+        return self._daily_pnl_sol
+
+    @daily_pnl_sol.setter
+    def daily_pnl_sol(self, value: float):
+        if self.shared is not None:
+            self.shared.values[1] = value
+        else:
+            self._daily_pnl_sol = value
+
+    def set_capital(self, trader: str, sol: float):
+        """Trading capital of a trader's wallet, for percentage sizing"""
+        self.capital[trader] = sol
+
+    def reserve(self, trader: str, token_mint: str, amount_sol: float) -> Optional[Reservation]:
+        """Reserve a position slot and a size for a buy, or None if over a limit
+
+        The granted `amount_sol` may be smaller than requested.
+        """
+        with self._locked():
+            self._roll_day()
+            if -self.daily_pnl_sol >= self.daily_loss_limit_sol:
+                self.stats['rejected_daily_loss'] += 1
+                return None
+
+            adds_position = (trader, token_mint) not in self.open_positions
+            if adds_position and self._in_use() >= self.max_concurrent_positions:
+                self.stats['rejected_positions'] += 1
+                return None
+
+            size = min(amount_sol, self.max_position_size_sol)
+            capital = self.capital.get(trader)
+            if capital is not None:
+                size = min(size, capital * self.max_position_size_pct)
+            if size <= 0:
+                self.stats['rejected_size'] += 1
+                return None
+
+            if self.shared is not None:
+                self.shared.add(self.slot, pending=1)
+
+        reservation = Reservation(next(self._ids), trader, token_mint, size)
+        self.pending[reservation.id] = reservation
+        self.stats['reserved'] += 1
+        return reservation
+
+    def commit(self, reservation: Reservation):
+        """Turn a filled reservation into an open position"""
+        if self.pending.pop(reservation.id, None) is None:
+            return
+        key = (reservation.trader, reservation.token_mint)
+        if self.shared is not None:
+            with self.shared.lock:
+                self.shared.add(self.slot, positions=int(key not in self.open_positions), pending=-1)
+        self.open_positions.add(key)
+        capital = self.capital.get(reservation.trader)
+        if capital is not None:
+            self.capital[reservation.trader] = capital - reservation.amount_sol
+        self.stats['committed'] += 1
+
+    def adopt(self, trader: str, token_mint: str):
+        """Count a position opened before this engine started, e.g. after a restart"""
+        key = (trader, token_mint)
+        with self._locked():
+            if key in self.open_positions:
+                return
+            self.open_positions.add(key)
+            if self.shared is not None:
+                self.shared.add(self.slot, positions=1)
+
+    def release(self, reservation: Reservation):
+        """Give back the capacity of a buy that did not fill"""
+        if self.pending.pop(reservation.id, None) is not None:
+            if self.shared is not None:
+                with self.shared.lock:
+                    self.shared.add(self.slot, pending=-1)
+            self.stats['released'] += 1
+
+    def record_close(self, trader: str, token_mint: str, pnl_sol: float, proceeds_sol: float = 0.0):
+        """Free a closed position's slot and add its PnL to today's total"""
+        with self._locked():
+            self._roll_day()
+            if (trader, token_mint) in self.open_positions:
+                self.open_positions.discard((trader, token_mint))
+                if self.shared is not None:
+                    self.shared.add(self.slot, positions=-1)
+            self.daily_pnl_sol += pnl_sol
+        if trader in self.capital:
+            self.capital[trader] += proceeds_sol
+        if -self.daily_pnl_sol >= self.daily_loss_limit_sol:
+            logger.warning(
+                f"🛑 Daily loss limit reached ({self.daily_pnl_sol:.2f} SOL), new buys halted"
+            )
+
+    def get_status(self) -> Dict:
+        return {
+            'open_positions': len(self.open_positions),
+            'pending': len(self.pending),
+            'daily_pnl_sol': self.daily_pnl_sol,
+            'halted': -self.daily_pnl_sol >= self.daily_loss_limit_sol,
+            **self.stats
+        }
+
+    def _today(self) -> int:
+        return int(self.clock() // 86400)
+
+    def _locked(self):
+        return self.shared.lock if self.shared is not None else nullcontext()
+
+    def _in_use(self) -> int:
+        if self.shared is not None:
+            return self.shared.in_use()
+        return len(self.open_positions) + len(self.pending)
+
+    def _roll_day(self):
+        today = self._today()
+        if self.shared is not None:
+            if self.shared.values[0] != today:
+                self.shared.values[0] = today
+                self.shared.values[1] = 0.0
+        elif today != self._day:
+            self._day = today
+            self._daily_pnl_sol = 0.0
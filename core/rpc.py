@@ -0,0 +1,218 @@
+"""
+RPC Gateway
+Shared, connection-pooled Solana JSON-RPC client used by all traders
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Methods with side effects are never merged with other in-flight calls
+NON_COALESCED_METHODS = {'sendTransaction', 'requestAirdrop'}
+
+
+class RpcError(Exception):
+    """Error object returned by the RPC node"""
+
+    def __init__(self, method: str, error: Dict):
+        self.method = method
+        self.code = error.get('code')
+        self.error = error
+        super().__init__(f"{method} failed: {error.get('message', error)}")
+
+
+class RpcGateway:
+    """Process-wide JSON-RPC gateway with keep-alive and request coalescing
+
+    One gateway is owned by the TradingManager and shared by every trader.
+    Concurrency towards the endpoint is capped, connections are kept alive
+    and identical read requests that are already in flight are merged into
+    a single wire call.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_concurrency: int = 8,
+        keepalive_timeout: float = 30.0,
+        request_timeout: float = 10.0
+    ):
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._ids = itertools.count(1)
+
+        # Latency and errors per method are reported here when set (core.metrics)
+        self.metrics = None
+
+        self.stats = {
+            'calls': 0,
+            'wire_calls': 0,
+            'coalesced': 0,
+            'errors': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'RpcGateway':
+        """Build a gateway from the `rpc` section of config.yaml"""
+        return cls(
+            url=config.get('SOLANA_RPC_URL', 'https://api.mainnet-beta.solana.com'),
+            max_concurrency=config.get_setting('rpc', 'max_concurrency', 8),
+            keepalive_timeout=config.get_setting('rpc', 'keepalive_timeout', 30.0),
+            request_timeout=config.get_setting('rpc', 'request_timeout', 10.0)
+        )
+
+    async def call(self, method: str, params: Optional[List] = None) -> Any:
+        """Call an RPC method, sharing the result with identical in-flight calls"""
+        self.stats['calls'] += 1
+        params = params or []
+
+        if method in NON_COALESCED_METHODS:
+            return await self._request(method, params)
+
+        key = method + json.dumps(params, sort_keys=True, separators=(',', ':'))
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+        else:
+            task = asyncio.ensure_future(self._request(method, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+
+        # Shield so one cancelled caller does not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def batch(self, calls: Sequence[Tuple[str, List]]) -> List[Any]:
+        """Send several calls as one JSON-RPC batch request
+
+        Results are returned in call order. A call that fails on the node
+        yields an RpcError in its slot instead of failing the whole batch;
+        a batch the node rejects as a whole raises RpcError.
+        """
+        if not calls:
+            return []
+        self.stats['calls'] += len(calls)
+
+        payload = []
+        for method, params in calls:
+            payload.append({
+                'jsonrpc': '2.0',
+                'id': next(self._ids),
+                'method': method,
+                'params': params or []
+            })
+
+        started = time.perf_counter()
+        try:
+            data = await self._post(payload)
+            if not isinstance(data, list):
+                # A batch rejected as a whole (e.g. over the node's size limit) gets one error
+                error = data.get('error') if isinstance(data, dict) else None
+                raise RpcError('batch', error or {'message': f"unexpected response: {data!r:.100}"})
+        except Exception:
+            self.stats['errors'] += 1
+            self._observe('batch', started, failed=True)
+            raise
+        self._observe('batch', started)
+
+        by_id = {item.get('id'): item for item in data}
+        results = []
+        for request in payload:
+            item = by_id.get(request['id'], {'error': {'message': 'missing response'}})
+            if 'error' in item:
+                self.stats['errors'] += 1
+                results.append(RpcError(request['method'], item['error']))
+            else:
+                results.append(item['result'])
+        return results
+
+    async def get_balance(self, pubkey: str, commitment: str = 'confirmed') -> int:
+        """Return the SOL balance of an account in lamports"""
+        result = await self.call('getBalance', [str(pubkey), {'commitment': commitment}])
+        return result['value']
+
+    async def get_latest_blockhash(self, commitment: str = 'confirmed') -> Dict:
+        """Return the latest blockhash and its last valid block height"""
+        result = await self.call('getLatestBlockhash', [{'commitment': commitment}])
+        return result['value']
+
+    async def get_slot(self, commitment: str = 'confirmed') -> int:
+        """Return the current slot"""
+        return await self.call('getSlot', [{'commitment': commitment}])
+
+    async def close(self):
+        """Close the underlying connection pool"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.max_concurrency,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+        return self._session
+
+    async def _post(self, payload: Any) -> Any:
+        """Send one HTTP request to the endpoint within the concurrency cap"""
+        session = self._get_session()
+        async with self._semaphore:
+            self.stats['wire_calls'] += 1
+            async with session.post(self.url, json=payload) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+    async def _request(self, method: str, params: List) -> Any:
+        payload = {
+            'jsonrpc': '2.0',
+            'id': next(self._ids),
+            'method': method,
+            'params': params
+        }
+        started = time.perf_counter()
+        try:
+            data = await self._post(payload)
+        except Exception:
+            self.stats['errors'] += 1
+            self._observe(method, started, failed=True)
+            raise
+
+        failed = 'error' in data
+        self._observe(method, started, failed)
+        if failed:
+            self.stats['errors'] += 1
+            raise RpcError(method, data['error'])
+        return data['result']
+
+    def _observe(self, method: str, started: float, failed: bool = False):
+        if self.metrics is None:
+            return
+        latency, errors = self.metrics.rpc(method)
+        latency.observe(time.perf_counter() - started)
+        if failed:
+            errors.inc()
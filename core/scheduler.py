@@ -0,0 +1,111 @@
+"""
+Cycle Scheduler
+Runs trader cycles on fixed deadlines with drift correction and wake-ups
+"""
+
+import asyncio
+import logging
+import math
+import random
+from typing import Any, Dict
+
+from utils.config import Config
+from utils.logger import log_fields
+
+logger = logging.getLogger(__name__)
+
+
+class CycleScheduler:
+    """Central deadline scheduler for trader cycles
+
+    Deadlines are laid on a fixed grid (start + k * interval), so the real
+    period no longer grows with cycle time. When a cycle runs past its next
+    deadline the missed slots are skipped and reported as an overrun instead
+    of being run back to back. A trader can be woken before its deadline by
+    calling `request_wakeup()`; the grid is not shifted by such cycles.
+    """
+
+    def __init__(self, jitter_pct: float = 0.0):
+        self.jitter_pct = jitter_pct
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+        # Every cycle is written here when set (core.journal)
+        self.journal = None
+
+        # Cycle durations and overruns are reported here when set (core.metrics)
+        self.metrics = None
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'CycleScheduler':
+        """Build a scheduler from the `scheduler` section of config.yaml"""
+        return cls(jitter_pct=config.get_setting('scheduler', 'jitter_pct', 0.0))
+
+    def stats_for(self, name: str) -> Dict[str, Any]:
+        """Return the schedule stats for a trader"""
+        return self.stats.setdefault(name, {
+            'cycles': 0,
+            'wakeups': 0,
+            'overruns': 0,
+            'skipped_slots': 0,
+            'last_cycle_seconds': 0.0,
+            'last_lateness_seconds': 0.0
+        })
+
+    async def run_trader(self, trader):
+        """Run `trader.trade_cycle` on its deadline grid until it stops"""
+        loop = asyncio.get_running_loop()
+        stats = self.stats_for(trader.name)
+        next_deadline = loop.time()
+        cycle_seconds = overruns = None
+
+        while trader.running:
+            interval = trader.get_sleep_interval()
+            jitter = random.uniform(0, self.jitter_pct * interval) if self.jitter_pct else 0.0
+            target = next_deadline + jitter
+
+            woken = await trader.wait_for_wakeup(target - loop.time())
+            if not trader.running:
+                break
+
+            started = loop.time()
+            if woken:
+                stats['wakeups'] += 1
+            else:
+                stats['last_lateness_seconds'] = max(0.0, started - target)
+
+            trader.sync_config()
+            with log_fields(trader=trader.name, cycle_id=stats['cycles'] + 1):
+                await trader.run_cycle(stats['cycles'] + 1)
+
+            finished = loop.time()
+            stats['cycles'] += 1
+            stats['last_cycle_seconds'] = finished - started
+            if self.metrics is not None:
+                if cycle_seconds is None:
+                    cycle_seconds, overruns = self.metrics.cycle(trader.name)
+                cycle_seconds.observe(finished - started)
+            if self.journal is not None:
+                self.journal.record_cycle(
+                    trader.name, finished - started,
+                    0.0 if woken else stats['last_lateness_seconds'], woken
+                )
+
+            if woken and finished < next_deadline:
+                # Early cycle: keep the regular deadline
+                continue
+
+            if not woken:
+                next_deadline += interval
+
+            if finished >= next_deadline:
+                missed = math.floor((finished - next_deadline) / interval) + 1
+                next_deadline += missed * interval
+                if not woken:
+                    stats['overruns'] += 1
+                    stats['skipped_slots'] += missed
+                    if overruns is not None:
+                        overruns.inc()
+                    logger.warning(
+                        f"⏱️  {trader.name} cycle took {finished - started:.2f}s "
+                        f"(interval {interval}s), skipped {missed} slot(s)"
+                    )
@@ -0,0 +1,130 @@
+"""
+Status Publisher
+Streams status snapshots of the running bot to local monitors
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class StatusPublisher:
+    """Publishes newline-delimited JSON snapshots over a Unix socket
+
+    A snapshot is built and serialized once per interval, and only while
+    at least one monitor is connected, then the same bytes are written to
+    every subscriber. A subscriber whose socket buffer is still full from
+    earlier frames skips frames instead of growing memory or slowing the
+    loop down.
+
+    Clients may also send one JSON command per line; it is passed to
+    `on_command` and the result is written back as `{"reply": ...}`.
+    """
+
+    def __init__(
+        self,
+        snapshot: Callable[[], Awaitable[Dict]],
+        socket_path: str = 'elena.sock',
+        interval_seconds: float = 1.0,
+        max_buffer_bytes: int = 256 * 1024
+    ):
+        self.snapshot = snapshot
+        self.socket_path = socket_path
+        self.interval_seconds = interval_seconds
+        self.max_buffer_bytes = max_buffer_bytes
+
+        # Control commands (e.g. scripts/profile.py) are handled here when set
+        self.on_command: Optional[Callable[[Dict], Awaitable[Dict]]] = None
+
+        self.subscribers: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            'published': 0,
+            'dropped_frames': 0,
+            'commands': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config, snapshot: Callable[[], Awaitable[Dict]]) -> 'StatusPublisher':
+        """Build a publisher from the `status` section of config.yaml"""
+        return cls(
+            snapshot,
+            socket_path=config.get_setting('status', 'socket_path', 'elena.sock'),
+            interval_seconds=config.get_setting('status', 'interval_seconds', 1.0)
+        )
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._on_connect, path=self.socket_path)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"📡 Status published on {self.socket_path}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for writer in list(self.subscribers):
+            writer.close()
+        self.subscribers.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def publish(self):
+        """Send one snapshot to every subscriber"""
+        if not self.subscribers:
+            return
+        payload = (json.dumps(await self.snapshot(), default=str) + '\n').encode()
+        for writer in list(self.subscribers):
+            if writer.is_closing():
+                self.subscribers.discard(writer)
+            elif writer.transport.get_write_buffer_size() > self.max_buffer_bytes:
+                self.stats['dropped_frames'] += 1
+            else:
+                writer.write(payload)
+        self.stats['published'] += 1
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.subscribers.add(writer)
+        try:
+            # Monitors never send anything; EOF means they went away
+            while line := await reader.readline():
+                writer.write((json.dumps({'reply': await self._command(line)}, default=str) + '\n').encode())
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+    async def _command(self, line: bytes) -> Dict:
+        self.stats['commands'] += 1
+        try:
+            command = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': 'invalid JSON'}
+        if self.on_command is None:
+            return {'ok': False, 'error': 'commands not supported'}
+        try:
+            return await self.on_command(command)
+        except Exception as e:
+            logger.warning(f"Status command {command} failed: {e}")
+            return {'ok': False, 'error': str(e)}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.warning(f"Status publish failed: {e}")
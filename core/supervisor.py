@@ -0,0 +1,301 @@
+"""
+Trader Supervisor
+Runs each trader in its own worker process and restarts it when it dies
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Callable, Dict, List, Mapping, Optional
+
+from core.risk import SharedRiskState
+from traders import load_trader
+from utils.config import Config
+from utils.logger import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(
+    key: str,
+    slot: int,
+    config_path: str,
+    overrides: Mapping,
+    risk_state: SharedRiskState,
+    conn: Connection,
+    status_interval_seconds: float
+):
+    """Worker process entry point: one trader on its own event loop"""
+    # Ctrl+C reaches the whole process group; the supervisor decides when we stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    setup_logging()
+    asyncio.run(_worker(key, slot, config_path, overrides, risk_state, conn, status_interval_seconds))
+
+
+async def _worker(
+    key: str,
+    slot: int,
+    config_path: str,
+    overrides: Mapping,
+    risk_state: SharedRiskState,
+    conn: Connection,
+    status_interval_seconds: float
+):
+    from core.manager import TradingManager
+
+    config = Config(config_path)
+    if overrides:
+        config.override(dict(overrides))
+    manager = TradingManager([load_trader(key, config)], config, risk_state=risk_state, risk_slot=slot)
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+
+    def on_command():
+        try:
+            command = conn.recv()
+        except (EOFError, OSError):
+            # The supervisor went away
+            command = 'stop'
+        if command == 'stop':
+            loop.remove_reader(conn.fileno())
+            stop.set()
+        elif command[0] == 'profile':
+            _, trader, cycles = command
+            manager.profile(trader, cycles)
+
+    loop.add_reader(conn.fileno(), on_command)
+    run = asyncio.create_task(manager.run())
+    try:
+        while not stop.is_set() and not run.done():
+            try:
+                conn.send(('status', await manager.get_status()))
+            except OSError:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), status_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if not stop.is_set():
+            loop.remove_reader(conn.fileno())
+        await manager.shutdown()
+        await asyncio.gather(run, return_exceptions=True)
+        conn.close()
+
+
+@dataclass
+class Worker:
+    """Supervisor-side handle of one trader's process"""
+    key: str
+    slot: int
+    process: Optional[multiprocessing.process.BaseProcess] = None
+    conn: Optional[Connection] = None
+    status: Optional[Dict] = None
+    started_at: float = 0.0
+    restart_at: Optional[float] = None
+    backoff_seconds: float = 0.0
+    restarts: int = 0
+
+
+class Supervisor:
+    """Runs every trader in a spawned worker process
+
+    Each worker builds its own trader, shared services and event loop, so
+    a slow or crashing strategy cannot stall the others. A worker that
+    exits is restarted after a backoff that doubles on consecutive crashes
+    and resets once a worker stays up for `max_restart_backoff_seconds`.
+    Workers push their status over a pipe; risk limits are enforced
+    across processes through a `SharedRiskState`.
+    """
+
+    def __init__(
+        self,
+        trader_keys: List[str],
+        config: Config,
+        restart_backoff_seconds: float = 1.0,
+        max_restart_backoff_seconds: float = 60.0,
+        status_interval_seconds: float = 1.0,
+        stop_timeout_seconds: float = 10.0,
+        poll_seconds: float = 0.2,
+        target: Callable = run_worker
+    ):
+        self.config = config
+        self.restart_backoff_seconds = restart_backoff_seconds
+        self.max_restart_backoff_seconds = max_restart_backoff_seconds
+        self.status_interval_seconds = status_interval_seconds
+        self.stop_timeout_seconds = stop_timeout_seconds
+        self.poll_seconds = poll_seconds
+        self.target = target
+
+        # spawn: workers must not inherit the parent's loop, sessions or threads
+        self.context = multiprocessing.get_context('spawn')
+        self.risk_state = SharedRiskState(len(trader_keys), self.context)
+        self.workers = [Worker(key, slot) for slot, key in enumerate(trader_keys)]
+        self.running = False
+
+        self.stats = {
+            'started': 0,
+            'exits': 0,
+            'restarts': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config, trader_keys: List[str]) -> 'Supervisor':
+        """Build a supervisor from the `supervisor` section of config.yaml"""
+        return cls(
+            trader_keys,
+            config,
+            restart_backoff_seconds=config.get_setting('supervisor', 'restart_backoff_seconds', 1.0),
+            max_restart_backoff_seconds=config.get_setting('supervisor', 'max_restart_backoff_seconds', 60.0),
+            status_interval_seconds=config.get_setting('supervisor', 'status_interval_seconds', 1.0),
+            stop_timeout_seconds=config.get_setting('supervisor', 'stop_timeout_seconds', 10.0)
+        )
+
+    async def run(self):
+        """Start every worker and keep them alive until `shutdown()`"""
+        self.running = True
+        for worker in self.workers:
+            self._start(worker)
+        while self.running:
+            self.poll()
+            await asyncio.sleep(self.poll_seconds)
+
+    def poll(self):
+        """Collect status messages, notice exits and restart due workers"""
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.conn is not None:
+                self._drain(worker)
+            if worker.process is not None and not worker.process.is_alive():
+                self._on_exit(worker, now)
+            if self.running and worker.process is None and worker.restart_at is not None \
+                    and now >= worker.restart_at:
+                worker.restarts += 1
+                self.stats['restarts'] += 1
+                self._start(worker)
+
+    def broadcast(self, command):
+        """Send a command to every running worker"""
+        for worker in self.workers:
+            if worker.process is not None:
+                try:
+                    worker.conn.send(command)
+                except OSError:
+                    pass
+
+    async def shutdown(self):
+        """Ask every worker to stop, then wait; terminate stragglers"""
+        self.running = False
+        self.broadcast('stop')
+
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            await asyncio.to_thread(worker.process.join, self.stop_timeout_seconds)
+            if worker.process.is_alive():
+                logger.warning(f"⚠️  {worker.key} worker did not stop in time, terminating")
+                worker.process.terminate()
+                await asyncio.to_thread(worker.process.join)
+            self._drain(worker)
+            worker.conn.close()
+            worker.process = None
+            worker.conn = None
+
+    def get_status(self) -> Dict:
+        """Latest worker statuses merged into one manager-shaped status"""
+        traders: Dict[str, Dict] = {}
+        positions: List[Dict] = []
+        orders: Dict[str, float] = {}
+        rpc: Dict[str, float] = {}
+        journal_backlog = 0
+        for worker in self.workers:
+            status = worker.status or {}
+            traders.update(status.get('traders', {}))
+            positions.extend(status.get('positions', []))
+            for total, part in ((orders, status.get('orders', {})), (rpc, status.get('rpc', {}))):
+                for name, value in part.items():
+                    if isinstance(value, (int, float)):
+                        total[name] = total.get(name, 0) + value
+            journal_backlog += status.get('journal_backlog', 0)
+
+        risk = self.risk_state.get_status()
+        limit = self.config.get_setting('risk_management', 'daily_loss_limit_sol', 5.0)
+        risk['halted'] = -risk['daily_pnl_sol'] >= limit
+        return {
+            'traders': traders,
+            'positions': positions,
+            'risk': risk,
+            'orders': orders,
+            'rpc': rpc,
+            'journal_backlog': journal_backlog,
+            'workers': {
+                worker.key: {
+                    'pid': worker.process.pid if worker.process else None,
+                    'alive': worker.process is not None,
+                    'restarts': worker.restarts
+                }
+                for worker in self.workers
+            }
+        }
+
+    def _start(self, worker: Worker):
+        conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=self.target,
+            args=(
+                worker.key, worker.slot, self.config.config_path, dict(self.config.overrides),
+                self.risk_state, child_conn, self.status_interval_seconds
+            ),
+            name=f"elena-{worker.key}"
+        )
+        process.start()
+        child_conn.close()
+
+        worker.process = process
+        worker.conn = conn
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        self.stats['started'] += 1
+        logger.info(f"🚀 Started {worker.key} worker (pid {process.pid})")
+
+    def _drain(self, worker: Worker):
+        try:
+            while worker.conn.poll():
+                kind, payload = worker.conn.recv()
+                if kind == 'status':
+                    worker.status = payload
+        except (EOFError, OSError):
+            pass
+
+    def _on_exit(self, worker: Worker, now: float):
+        code = worker.process.exitcode
+        worker.process = None
+        worker.conn.close()
+        worker.conn = None
+        self.stats['exits'] += 1
+
+        # Its reservations died with it, but its positions are still held: they
+        # stay counted until the restarted worker rebuilds them from the journal
+        positions, pending = self.risk_state.clear(worker.slot, positions=False)
+        if positions:
+            logger.warning(f"⚠️  {worker.key} exited holding {positions} position(s), restored on restart")
+
+        if not self.running:
+            return
+        if now - worker.started_at >= self.max_restart_backoff_seconds:
+            worker.backoff_seconds = self.restart_backoff_seconds
+        else:
+            worker.backoff_seconds = min(
+                max(worker.backoff_seconds * 2, self.restart_backoff_seconds),
+                self.max_restart_backoff_seconds
+            )
+        worker.restart_at = now + worker.backoff_seconds
+        logger.error(
+            f"💥 {worker.key} worker exited with code {code}, "
+            f"restarting in {worker.backoff_seconds:.1f}s"
+        )
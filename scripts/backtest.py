@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Replay recorded data through Elena's traders
+
+    python scripts/backtest.py data/recording.jsonl
+    python scripts/backtest.py data/recording.jsonl \
+        --sweep volume_trader.volume_threshold_multiplier=2,3,4
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from core.backtest import run_backtest, run_sweep
+
+
+def parse_sweep(values):
+    """Turn `trader.key=v1,v2` arguments into a parameter grid"""
+    grid = {}
+    for value in values or []:
+        key, options = value.split('=', 1)
+        grid[key] = [yaml.safe_load(option) for option in options.split(',')]
+    return grid
+
+
+def print_report(report: dict):
+    """Print one row per trader plus a run summary"""
+    params = ', '.join(f"{k}={v}" for k, v in report['params'].items()) or 'baseline'
+    print(f"\n{params}")
+    print("-" * 72)
+    for name, trader in report['traders'].items():
+        print(
+            f"{name:15} | {trader['fills']:>5} fills | {trader['cycles']:>6} cycles | "
+            f"{trader['pnl_sol']:>+10.4f} SOL | {trader['return_pct']:>+7.2f}%"
+        )
+    print("-" * 72)
+    print(
+        f"{'total':15} | {report['pnl_sol']:>+10.4f} SOL | "
+        f"{report['simulated_seconds'] / 86400:.1f} days in {report['wall_seconds']:.2f}s | "
+        f"{report['cycles_per_second']:,.0f} cycles/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data', help='JSON lines recording to replay')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--trader', action='append', dest='traders', help='Trader to run (repeatable)')
+    parser.add_argument('--sweep', action='append', help='trader.key=v1,v2,... (repeatable)')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    grid = parse_sweep(args.sweep)
+    if grid:
+        reports = run_sweep(args.data, grid, args.config, args.traders, args.workers)
+    else:
+        reports = [run_backtest(args.data, args.config, trader_names=args.traders)]
+
+    for report in sorted(reports, key=lambda r: r['pnl_sol'], reverse=True):
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark the copy-trade fast path with a synthetic activity stream
+
+    python scripts/bench_copy_latency.py
+    python scripts/bench_copy_latency.py --activities 2000 --rate 50 --confirm-ms 800
+
+Buys from `--wallets` wallets arrive as Poisson events at `--rate` per
+second, each `--fetch-ms` (getTransaction) after its notification and
+0.4-1.2 s after its block time. Copies run through the real executor and
+execute_swap: quotes, route templates, signing, sendTransaction and
+confirmation polls all go over HTTP to local stand-ins for Jupiter and
+the RPC node, which answer after `--rpc-ms` and confirm a transaction
+`--confirm-ms` after its first send. Risk limits are off, so every fresh
+copy is sent. The run is seeded, so the stream is the same every time;
+reports p50/p99 of every fast-path span.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.signature import Signature
+
+from core.rpc import RpcGateway
+from tests.stand_ins import QuoteApiStandIn, RpcStandIn, SwapInstructionsStandIn
+from traders.copy_trader import CopyTrader
+from utils import dex
+from utils.config import Config
+from utils.dex import QuoteCache
+from utils.transactions import BlockhashRefresher, TransactionPipeline
+from utils.wallet_ranking import WalletRanker
+
+
+def node_handlers(confirm_seconds: float) -> dict:
+    """RPC node that confirms a transaction `confirm_seconds` after its first send"""
+    sent = {}
+
+    def send_transaction(params):
+        signature = str(Signature.from_bytes(base64.b64decode(params[0])[1:65]))
+        sent.setdefault(signature, time.monotonic())
+        return signature
+
+    def signature_statuses(params):
+        now = time.monotonic()
+        return {
+            'context': {'slot': 1},
+            'value': [
+                {'confirmationStatus': 'confirmed', 'err': None}
+                if signature in sent and now - sent[signature] >= confirm_seconds else None
+                for signature in params[0]
+            ]
+        }
+
+    return {
+        'getLatestBlockhash': lambda params: {
+            'context': {'slot': 1},
+            'value': {'blockhash': str(Hash.new_unique()), 'lastValidBlockHeight': 1_000_000}
+        },
+        'sendTransaction': send_transaction,
+        'getSignatureStatuses': signature_statuses,
+        'getBlockHeight': lambda params: 0
+    }
+
+
+async def run_benchmark(args) -> dict:
+    rng = random.Random(args.seed)
+    loop = asyncio.get_running_loop()
+
+    async with RpcStandIn(node_handlers(args.confirm_ms / 1000), delay=args.rpc_ms / 1000) as node, \
+            QuoteApiStandIn(delay=args.rpc_ms / 1000) as quotes, SwapInstructionsStandIn() as instructions:
+        config = Config(args.config)
+        rpc = RpcGateway(node.url, max_concurrency=config.get_setting('rpc', 'max_concurrency', 8))
+        keypair = Keypair()
+        pipeline = TransactionPipeline(
+            rpc, {str(keypair.pubkey()): keypair}, BlockhashRefresher(rpc, interval_seconds=60),
+            swap_instructions_url=instructions.url,
+            confirm_poll_seconds=config.get_setting('dex', 'confirm_poll_seconds', 0.4)
+        )
+        dex.quote_cache = QuoteCache(url=quotes.url)
+        dex.tx_pipeline = pipeline
+        await pipeline.start()
+
+        trader = CopyTrader(config)
+        trader.wallet = str(keypair.pubkey())
+        trader.executor.client = rpc
+        trader.executor.risk = None
+        trader.executor.positions = None
+        trader.copy_queue.budget_seconds = trader.copy_delay = args.budget
+        trader.copy_workers = args.workers
+
+        # A private ranker, so the benchmark never touches the persisted one
+        trader.ranker = WalletRanker(clock=time.time)
+        wallets = [f'Wallet{i:04d}' for i in range(args.wallets)]
+        trader.ranker.track(wallets)
+        for wallet in wallets:
+            trader.ranker.apply({'wallet': wallet, 'side': 'buy', 'signature': f'{wallet}-in',
+                                 'token': {'mint': 'SEED'}, 'token_amount': 1.0, 'amount_sol': 1.0})
+            trader.ranker.apply({'wallet': wallet, 'side': 'sell', 'signature': f'{wallet}-out',
+                                 'token': {'mint': 'SEED'}, 'token_amount': 1.0,
+                                 'amount_sol': rng.uniform(0.5, 6.0)})
+        trader._start_workers()
+
+        started = time.perf_counter()
+        for i in range(args.activities):
+            await asyncio.sleep(rng.expovariate(args.rate))
+            detected = time.time()
+            activity = {
+                'wallet': rng.choice(wallets),
+                'signature': f'sig{i}',
+                'side': 'buy',
+                'token': {'mint': f'MINT{i % args.mints}', 'symbol': f'T{i % args.mints}'},
+                'token_amount': 1000.0,
+                'amount_sol': rng.uniform(0.1, 5.0),
+                'timestamps': {'source': detected - rng.uniform(0.4, 1.2), 'detected': detected}
+            }
+            fetch = rng.uniform(0.5, 1.5) * args.fetch_ms / 1000
+            loop.call_later(fetch, _decoded, trader, activity)
+
+        # Let the tail drain: the queue is empty or stale and every swap has returned
+        await asyncio.sleep(args.fetch_ms * 1.5 / 1000)
+        while len(trader.copy_queue) or trader.executor.in_flight:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+
+        for worker in trader._workers:
+            worker.cancel()
+        await asyncio.gather(*trader._workers, return_exceptions=True)
+        await pipeline.stop()
+        await dex.quote_cache.close()
+        await rpc.close()
+        await trader.client.close()
+
+    return {
+        'activities': args.activities,
+        'seconds': elapsed,
+        'queue': dict(trader.copy_queue.stats),
+        'executor': dict(trader.executor.stats),
+        'latency': trader.latency.summary()
+    }
+
+
+def _decoded(trader: CopyTrader, activity: dict):
+    activity['timestamps']['decoded'] = time.time()
+    trader._on_activity(activity)
+
+
+def print_report(report: dict):
+    queue, executor = report['queue'], report['executor']
+    print(
+        f"{report['activities']} activities in {report['seconds']:.1f}s | "
+        f"{executor['executed'] + executor['failed']} sent, {executor['merged']} merged, "
+        f"{queue['stale'] + executor['stale']} stale, {queue['overflow']} overflowed"
+    )
+    print("-" * 56)
+    for span, stats in report['latency'].items():
+        if not stats['count']:
+            continue
+        print(
+            f"{span:18} | p50 {stats['p50'] * 1000:>8.2f} ms | "
+            f"p99 {stats['p99'] * 1000:>8.2f} ms | n={stats['count']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--activities', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=20.0, help='activities per second')
+    parser.add_argument('--wallets', type=int, default=50)
+    parser.add_argument('--mints', type=int, default=500, help='distinct tokens bought')
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--budget', type=float, default=5.0, help='latency budget in seconds')
+    parser.add_argument('--fetch-ms', type=float, default=80.0, help='getTransaction latency')
+    parser.add_argument('--rpc-ms', type=float, default=5.0, help='RPC and quote API round trip')
+    parser.add_argument('--confirm-ms', type=float, default=400.0, help='send to confirmation')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--config', default='config.yaml')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,32 +5,32 @@ Check wallet balances for all Elena traders
 
 import asyncio
 import os
+import sys
 from dotenv import load_dotenv
-from solana.rpc.async_api import AsyncClient
-from solders.pubkey import Pubkey
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from core.rpc import RpcGateway
+from utils.balances import snapshot_wallets
 
 load_dotenv()
 
 
-async def check_balance(client: AsyncClient, wallet_address: str, name: str):
-    """Check SOL balance for a wallet"""
-    try:
-        pubkey = Pubkey.from_string(wallet_address)
-        response = await client.get_balance(pubkey)
-        balance_lamports = response.value
-        balance_sol = balance_lamports / 1_000_000_000
-        
-        print(f"{name:20} | {wallet_address:44} | {balance_sol:>10.4f} SOL")
-        return balance_sol
-    except Exception as e:
-        print(f"{name:20} | {wallet_address:44} | Error: {e}")
-        return 0
+def print_balance(name: str, wallet: dict):
+    """Print SOL balance and token account count for a wallet"""
+    address = wallet['address']
+    if wallet['error']:
+        print(f"{name:20} | {address:44} | Error: {wallet['error']}")
+        return
+    
+    tokens = len(wallet['tokens'])
+    print(f"{name:20} | {address:44} | {wallet['sol']:>10.4f} SOL | {tokens:>3} tokens")
 
 
 async def main():
     """Main function"""
     rpc_url = os.getenv('SOLANA_RPC_URL', 'https://api.mainnet-beta.solana.com')
-    client = AsyncClient(rpc_url)
+    client = RpcGateway(rpc_url)
     
     wallets = {
         "Volume Trader": "Dsfm1XdBWBF68aSAYqZoTP6PRzxc4ZGgeXU14Zw8XAGU",
@@ -39,20 +39,23 @@ async def main():
         "Copy Trader": "CkSAH87iysawMBVaWginNW1tcWDSJ3x9UuL8Lkfjmmuu",
     }
     
-    print("\n" + "="*80)
+    print("\n" + "="*94)
     print("Elena Wallet Balances")
-    print("="*80)
-    print(f"{'Trader':20} | {'Wallet Address':44} | {'Balance':>12}")
-    print("-"*80)
+    print("="*94)
+    print(f"{'Trader':20} | {'Wallet Address':44} | {'Balance':>14} | {'Tokens':>10}")
+    print("-"*94)
+    
+    # One batched snapshot instead of a get_balance round trip per wallet
+    snapshot = await snapshot_wallets(client, list(wallets.values()))
     
     total = 0
     for name, address in wallets.items():
-        balance = await check_balance(client, address, name)
-        total += balance
+        print_balance(name, snapshot[address])
+        total += snapshot[address]['sol']
     
-    print("-"*80)
+    print("-"*94)
     print(f"{'TOTAL':20} | {' ':44} | {total:>10.4f} SOL")
-    print("="*80 + "\n")
+    print("="*94 + "\n")
     
     await client.close()
 
@@ -1,106 +1,119 @@
 #!/usr/bin/env python3
 """
-Simple monitoring dashboard for Elena
+Live monitoring dashboard for Elena
+
+Subscribes to the status socket of a running bot and redraws only the
+lines that changed since the previous frame.
 """
 
 import asyncio
+import json
 import os
-import time
-from datetime import datetime
-from dotenv import load_dotenv
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.config import Config
 
-load_dotenv()
+HIDE_CURSOR = '\x1b[?25l'
+SHOW_CURSOR = '\x1b[?25h'
+CLEAR_SCREEN = '\x1b[2J'
+CLEAR_LINE = '\x1b[K'
+CLEAR_BELOW = '\x1b[J'
 
 
-def clear_screen():
-    """Clear terminal screen"""
-    os.system('clear' if os.name == 'posix' else 'cls')
+def render(status: Dict) -> List[str]:
+    """Dashboard lines for one status snapshot"""
+    lines = [
+        "=" * 80,
+        "                    ELENA TRADING BOT - LIVE MONITOR",
+        "=" * 80,
+        f"Last Updated: {status['time']}",
+        "-" * 80,
+    ]
 
+    total_trades = 0
+    total_pnl = 0.0
+    for name, trader in status['traders'].items():
+        schedule = trader.get('schedule', {})
+        lines += [
+            "",
+            f"📊 {name}",
+            f"  Status:    {'🟢 Running' if trader['running'] else '🔴 Stopped'}",
+            f"  Trades:    {trader['trades']}  (W {trader['wins']} / L {trader['losses']})",
+            f"  P&L:       {trader['pnl_sol']:.4f} SOL",
+            f"  Cycles:    {schedule.get('cycles', 0)}  last {schedule.get('last_cycle_seconds', 0):.3f}s"
+            f"  late {schedule.get('last_lateness_seconds', 0):.3f}s  overruns {schedule.get('overruns', 0)}",
+        ]
+        if trader.get('uptime_seconds'):
+            lines.append(f"  Uptime:    {trader['uptime_seconds'] / 3600:.1f} hours")
+        total_trades += trader['trades']
+        total_pnl += trader['pnl_sol']
 
-def print_header():
-    """Print dashboard header"""
-    print("="*80)
-    print("                    ELENA TRADING BOT - LIVE MONITOR")
-    print("="*80)
-    print(f"Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("-"*80)
+    positions = status.get('positions', [])
+    lines += ["", f"📈 Open positions: {len(positions)}"]
+    for position in positions:
+        lines.append(
+            f"  {position['trader']:14} {position['symbol'] or position['mint'][:8]:10} "
+            f"{position['return_pct']:+7.2f}%"
+        )
 
+    risk = status.get('risk', {})
+    orders = status.get('orders', {})
+    lines += [
+        "",
+        f"🛡️  Risk: daily P&L {risk.get('daily_pnl_sol', 0):+.4f} SOL"
+        f"{'  HALTED' if risk.get('halted') else ''}",
+        f"⚡ Orders: {orders.get('in_flight', 0)} in flight, {orders.get('executed', 0)} executed, "
+        f"{orders.get('failed', 0)} failed",
+        "",
+        "=" * 80,
+        f"TOTAL TRADES: {total_trades} | TOTAL P&L: {total_pnl:.4f} SOL",
+        "=" * 80,
+        "Press Ctrl+C to exit",
+    ]
+    return lines
 
-def print_trader_status(trader_name, status_data):
-    """Print status for a single trader"""
-    print(f"\n📊 {trader_name}")
-    print(f"  Status:    {'🟢 Running' if status_data['running'] else '🔴 Stopped'}")
-    print(f"  Trades:    {status_data['trades']}")
-    print(f"  Wins:      {status_data['wins']}")
-    print(f"  Losses:    {status_data['losses']}")
-    print(f"  P&L:       {status_data['pnl_sol']:.4f} SOL")
-    if status_data['uptime_seconds']:
-        hours = status_data['uptime_seconds'] / 3600
-        print(f"  Uptime:    {hours:.1f} hours")
 
+def redraw(previous: List[str], lines: List[str]) -> str:
+    """ANSI output that turns the previous frame into the new one"""
+    out = []
+    for row, line in enumerate(lines, start=1):
+        if row > len(previous) or previous[row - 1] != line:
+            out.append(f"\x1b[{row};1H{line}{CLEAR_LINE}")
+    if len(lines) < len(previous):
+        out.append(f"\x1b[{len(lines) + 1};1H{CLEAR_BELOW}")
+    return ''.join(out)
 
-async def monitor():
+
+async def monitor(socket_path: str):
     """Main monitoring loop"""
-    
-    # Mock data for now - will be replaced with real data
-    traders = {
-        "Volume Trader": {
-            "running": True,
-            "trades": 12,
-            "wins": 8,
-            "losses": 4,
-            "pnl_sol": 2.45,
-            "uptime_seconds": 3600
-        },
-        "Lore Trader": {
-            "running": True,
-            "trades": 5,
-            "wins": 3,
-            "losses": 2,
-            "pnl_sol": 0.89,
-            "uptime_seconds": 3600
-        },
-        "TikTok Trader": {
-            "running": True,
-            "trades": 8,
-            "wins": 6,
-            "losses": 2,
-            "pnl_sol": 1.23,
-            "uptime_seconds": 3600
-        },
-        "Copy Trader": {
-            "running": True,
-            "trades": 15,
-            "wins": 11,
-            "losses": 4,
-            "pnl_sol": 3.67,
-            "uptime_seconds": 3600
-        }
-    }
-    
+    sys.stdout.write(HIDE_CURSOR + CLEAR_SCREEN)
     while True:
-        clear_screen()
-        print_header()
-        
-        total_trades = 0
-        total_pnl = 0
-        
-        for trader_name, status in traders.items():
-            print_trader_status(trader_name, status)
-            total_trades += status['trades']
-            total_pnl += status['pnl_sol']
-        
-        print("\n" + "="*80)
-        print(f"TOTAL TRADES: {total_trades} | TOTAL P&L: {total_pnl:.4f} SOL")
-        print("="*80)
-        print("\n(This is a mock dashboard. Real implementation coming soon!)")
-        print("Press Ctrl+C to exit")
-        
-        await asyncio.sleep(5)
+        try:
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+        except OSError:
+            sys.stdout.write(f"\x1b[H{CLEAR_SCREEN}Waiting for Elena on {socket_path}...")
+            sys.stdout.flush()
+            await asyncio.sleep(2)
+            continue
+
+        previous: List[str] = []
+        sys.stdout.write(CLEAR_SCREEN)
+        while line := await reader.readline():
+            lines = render(json.loads(line))
+            sys.stdout.write(redraw(previous, lines))
+            sys.stdout.flush()
+            previous = lines
+        writer.close()
 
 
 if __name__ == "__main__":
+    path = Config().get_setting('status', 'socket_path', 'elena.sock')
     try:
-        asyncio.run(monitor())
+        asyncio.run(monitor(path))
     except KeyboardInterrupt:
-        print("\n\nMonitoring stopped.")
+        pass
+    finally:
+        sys.stdout.write(SHOW_CURSOR + "\n\nMonitoring stopped.\n")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Profile trade cycles of a running Elena
+
+    python scripts/profile.py                  # every trader, profiling.cycles cycles
+    python scripts/profile.py VolumeTrader --cycles 20
+
+Profiles are written to profiling.output_dir of the running bot as
+<trader>-<time>-cycles<first>-<last>.collapsed and .pstats files.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.config import Config
+
+
+async def request_profile(socket_path: str, trader, cycles) -> dict:
+    """Send a profile command over the status socket and wait for the reply"""
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    writer.write((json.dumps({'cmd': 'profile', 'trader': trader, 'cycles': cycles}) + '\n').encode())
+    await writer.drain()
+    try:
+        # Status frames may arrive before the reply
+        while line := await reader.readline():
+            message = json.loads(line)
+            if 'reply' in message:
+                return message['reply']
+        return {'ok': False, 'error': 'connection closed'}
+    finally:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('trader', nargs='?', help='trader name, e.g. VolumeTrader (default: all)')
+    parser.add_argument('--cycles', type=int, help='cycles to profile (default: profiling.cycles)')
+    parser.add_argument('--config', default='config.yaml')
+    args = parser.parse_args()
+
+    path = Config(args.config).get_setting('status', 'socket_path', 'elena.sock')
+    reply = asyncio.run(request_profile(path, args.trader, args.cycles))
+    if not reply.get('ok'):
+        sys.exit(f"Profile request failed: {reply.get('error')}")
+    print(f"Profiling {args.trader or 'every trader'}; files appear when the cycles finish")
+
+
+if __name__ == "__main__":
+    main()
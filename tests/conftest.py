@@ -1,8 +1,50 @@
 """Pytest configuration and fixtures"""
 
+import asyncio
 import pytest
 import os
 
+from core.base_trader import BaseTrader
+from utils.config import Config
+
+
+class TimedTrader(BaseTrader):
+    """Trader whose cycle takes a fixed amount of time"""
+
+    def __init__(self, config: Config, interval: float, cycle_time: float):
+        super().__init__("TimedTrader", "test_wallet", config)
+        self.interval = interval
+        self.cycle_time = cycle_time
+        self.cycle_starts = []
+
+    async def trade_cycle(self):
+        self.cycle_starts.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(self.cycle_time)
+
+    def get_sleep_interval(self) -> float:
+        return self.interval
+
+
+async def _run_for(trader: BaseTrader, seconds: float):
+    trader.running = True
+    task = asyncio.create_task(trader.scheduler.run_trader(trader))
+    await asyncio.sleep(seconds)
+    trader.running = False
+    trader.request_wakeup()
+    await task
+
+
+@pytest.fixture
+def timed_trader():
+    """Factory for traders whose cycle takes `cycle_time` every `interval`"""
+    return lambda interval, cycle_time: TimedTrader(Config(), interval, cycle_time)
+
+
+@pytest.fixture
+def run_for():
+    """Run a trader on its scheduler for `seconds`, then stop it"""
+    return _run_for
+
 
 @pytest.fixture
 def mock_env_vars(monkeypatch):
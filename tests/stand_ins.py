@@ -0,0 +1,320 @@
+"""Local stand-in servers used by the test suite"""
+
+import asyncio
+import base64
+import struct
+from typing import Any, Callable, Dict, List, Optional
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from solders.pubkey import Pubkey
+
+
+class RpcStandIn:
+    """Minimal JSON-RPC server answering from per-method handlers
+
+    Each handler receives the params list and returns the `result` value.
+    Every HTTP request and every JSON-RPC call is recorded so tests can
+    count wire round trips. Batches over `batch_limit` calls are rejected
+    with a single error object, as some nodes do.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[List], Any]],
+        delay: float = 0.0,
+        batch_limit: Optional[int] = None
+    ):
+        self.handlers = handlers
+        self.delay = delay
+        self.batch_limit = batch_limit
+        self.http_requests = 0
+        self.calls: List[Dict] = []
+        self.max_concurrent = 0
+        self._concurrent = 0
+        self._server: Optional[TestServer] = None
+
+    @property
+    def url(self) -> str:
+        return str(self._server.make_url('/'))
+
+    async def __aenter__(self) -> 'RpcStandIn':
+        app = web.Application()
+        app.router.add_post('/', self._handle)
+        self._server = TestServer(app)
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._server.close()
+
+    def _answer(self, payload: Dict) -> Dict:
+        self.calls.append(payload)
+        handler = self.handlers.get(payload['method'])
+        if handler is None:
+            return {
+                'jsonrpc': '2.0',
+                'id': payload['id'],
+                'error': {'code': -32601, 'message': 'Method not found'}
+            }
+        return {'jsonrpc': '2.0', 'id': payload['id'], 'result': handler(payload['params'])}
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        self._concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self._concurrent)
+        try:
+            payload = await request.json()
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if isinstance(payload, list):
+                if self.batch_limit is not None and len(payload) > self.batch_limit:
+                    return web.json_response({
+                        'jsonrpc': '2.0',
+                        'id': None,
+                        'error': {'code': -32600, 'message': 'Batch too large'}
+                    })
+                return web.json_response([self._answer(p) for p in payload])
+            return web.json_response(self._answer(payload))
+        finally:
+            self._concurrent -= 1
+
+
+class WebSocketStandIn:
+    """Solana PubSub stand-in that emits scripted logs notifications
+
+    Subscriptions are answered with increasing ids. Tests push
+    notifications with `notify()` and simulate a dropped connection with
+    `drop()`.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.subscribe_requests: List[Dict] = []
+        self.unsubscribe_requests: List[Dict] = []
+        self._ws: Optional[web.WebSocketResponse] = None
+        self._subscriptions: Dict[str, int] = {}
+        self._next_sub = 100
+        self._server: Optional[TestServer] = None
+
+    @property
+    def url(self) -> str:
+        return str(self._server.make_url('/')).replace('http://', 'ws://')
+
+    async def __aenter__(self) -> 'WebSocketStandIn':
+        app = web.Application()
+        app.router.add_get('/', self._handle)
+        self._server = TestServer(app)
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.drop()
+        await self._server.close()
+
+    async def wait_subscribed(self, wallets: List[str], timeout: float = 2.0):
+        """Wait until every wallet has a subscription on the live socket"""
+        async def subscribed():
+            while not (self._ws is not None and set(wallets) <= set(self._subscriptions)):
+                await asyncio.sleep(0.005)
+        await asyncio.wait_for(subscribed(), timeout)
+
+    async def notify(self, wallet: str, signature: str, err: Any = None):
+        await self._ws.send_json({
+            'jsonrpc': '2.0',
+            'method': 'logsNotification',
+            'params': {
+                'result': {
+                    'context': {'slot': 1},
+                    'value': {'signature': signature, 'err': err, 'logs': []}
+                },
+                'subscription': self._subscriptions[wallet]
+            }
+        })
+
+    async def drop(self):
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        self._ws = ws
+        self._subscriptions = {}
+
+        async for message in ws:
+            payload = message.json()
+            if payload['method'] == 'logsSubscribe':
+                self.subscribe_requests.append(payload)
+                wallet = payload['params'][0]['mentions'][0]
+                self._next_sub += 1
+                self._subscriptions[wallet] = self._next_sub
+                await ws.send_json({'jsonrpc': '2.0', 'id': payload['id'], 'result': self._next_sub})
+            elif payload['method'] == 'logsUnsubscribe':
+                self.unsubscribe_requests.append(payload)
+                await ws.send_json({'jsonrpc': '2.0', 'id': payload['id'], 'result': True})
+        return ws
+
+
+class QuoteApiStandIn:
+    """Jupiter-style `/quote` endpoint returning a fixed price per unit"""
+
+    def __init__(self, price: float = 1000.0, slot: int = 100, delay: float = 0.0):
+        self.price = price
+        self.slot = slot
+        self.delay = delay
+        self.requests: List[Dict] = []
+        self._server: Optional[TestServer] = None
+
+    @property
+    def url(self) -> str:
+        return str(self._server.make_url('/quote'))
+
+    async def __aenter__(self) -> 'QuoteApiStandIn':
+        app = web.Application()
+        app.router.add_get('/quote', self._handle)
+        self._server = TestServer(app)
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._server.close()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        params = dict(request.query)
+        self.requests.append(params)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        amount = int(params['amount'])
+        out_amount = int(amount * self.price)
+        return web.json_response({
+            'inputMint': params['inputMint'],
+            'outputMint': params['outputMint'],
+            'inAmount': str(amount),
+            'outAmount': str(out_amount),
+            'otherAmountThreshold': str(int(out_amount * 0.99)),
+            'swapMode': params['swapMode'],
+            'slippageBps': int(params['slippageBps']),
+            'routePlan': [],
+            'contextSlot': self.slot
+        })
+
+
+class SwapInstructionsStandIn:
+    """Jupiter-style `/swap-instructions` endpoint
+
+    Returns a System transfer wrapping the SOL input (for SOL inputs) and
+    a route instruction ending in amount | quoted amount | slippage | fee.
+    """
+
+    SOL_MINT = 'So11111111111111111111111111111111111111112'
+
+    def __init__(self):
+        self.requests: List[Dict] = []
+        self._server: Optional[TestServer] = None
+
+    @property
+    def url(self) -> str:
+        return str(self._server.make_url('/swap-instructions'))
+
+    async def __aenter__(self) -> 'SwapInstructionsStandIn':
+        app = web.Application()
+        app.router.add_post('/swap-instructions', self._handle)
+        self._server = TestServer(app)
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._server.close()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.requests.append(payload)
+        quote, user = payload['quoteResponse'], payload['userPublicKey']
+        exact_out = quote.get('swapMode') == 'ExactOut'
+        amount, quoted = (quote['outAmount'], quote['inAmount']) if exact_out else (quote['inAmount'], quote['outAmount'])
+        route = bytes(8) + b'\x01\x02\x03' + struct.pack(
+            '<QQHB', int(amount), int(quoted), int(quote.get('slippageBps', 50)), 0
+        )
+        wrapped = str(Pubkey.new_unique())
+
+        setup = []
+        if quote['inputMint'] == self.SOL_MINT:
+            lamports = int(quote['otherAmountThreshold'] if exact_out else quote['inAmount'])
+            setup.append(_instruction_json(
+                '11111111111111111111111111111111',
+                struct.pack('<IQ', 2, lamports),
+                [(user, True, True), (wrapped, False, True)]
+            ))
+        return web.json_response({
+            'setupInstructions': setup,
+            'swapInstruction': _instruction_json(
+                str(Pubkey.new_unique()), route, [(user, True, True), (wrapped, False, True)]
+            ),
+            'cleanupInstruction': None,
+            'addressLookupTableAddresses': []
+        })
+
+
+def _instruction_json(program_id: str, data: bytes, accounts: List) -> Dict:
+    return {
+        'programId': program_id,
+        'data': base64.b64encode(data).decode(),
+        'accounts': [
+            {'pubkey': pubkey, 'isSigner': signer, 'isWritable': writable}
+            for pubkey, signer, writable in accounts
+        ]
+    }
+
+
+class ScoringModelStandIn:
+    """Narrative scoring endpoint: strength = len(text) % 10 / 10
+
+    Records every batch and the peak number of batches in flight.
+    """
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.batches: List[List[Dict]] = []
+        self.headers: List[Dict] = []
+        self.max_concurrent = 0
+        self._concurrent = 0
+        self._server: Optional[TestServer] = None
+
+    @property
+    def url(self) -> str:
+        return str(self._server.make_url('/score'))
+
+    @staticmethod
+    def strength(text: str) -> float:
+        return len(text) % 10 / 10
+
+    async def __aenter__(self) -> 'ScoringModelStandIn':
+        app = web.Application()
+        app.router.add_post('/score', self._handle)
+        self._server = TestServer(app)
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._server.close()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.batches.append(payload['narratives'])
+        self.headers.append(dict(request.headers))
+        self._concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self._concurrent)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+        finally:
+            self._concurrent -= 1
+        if self.fail:
+            return web.json_response({'error': 'overloaded'}, status=503)
+        return web.json_response({
+            'scores': {item['id']: self.strength(item['text']) for item in payload['narratives']}
+        })
@@ -0,0 +1,81 @@
+"""Tests for the backtesting engine"""
+
+import json
+
+from core.backtest import RecordedData, expand_grid, run_backtest
+
+DAY = 86400
+T0 = 1_700_000_000
+
+
+def _recording(tmp_path):
+    """One simulated day: a volume spike, a narrative and a copied buy"""
+    events = [
+        {'t': T0, 'type': 'prices', 'prices': {'SPIKE': 1.0, 'LORE': 2.0, 'COPY': 0.5}},
+        {'t': T0, 'type': 'volume', 'tokens': [
+            {'mint': 'SPIKE', 'symbol': 'SPK', 'current_volume': 60000, 'avg_volume': 50000}
+        ]},
+        {'t': T0, 'type': 'top_wallets', 'wallets': [{'address': 'WHALE', 'roi': 5.0}]},
+        {'t': T0 + 3600, 'type': 'volume', 'tokens': [
+            {'mint': 'SPIKE', 'symbol': 'SPK', 'current_volume': 400000, 'avg_volume': 50000}
+        ]},
+        {'t': T0 + 3630, 'type': 'volume', 'tokens': [
+            {'mint': 'SPIKE', 'symbol': 'SPK', 'current_volume': 55000, 'avg_volume': 50000}
+        ]},
+        {'t': T0 + 3600, 'type': 'narratives', 'narratives': [
+            {'topic': 'AI', 'strength': 0.9, 'associated_token': {'mint': 'LORE', 'symbol': 'LR'}}
+        ]},
+        {'t': T0 + 7200, 'type': 'wallet_activity', 'activities': [
+            {'wallet': 'WHALE', 'side': 'buy', 'amount_sol': 2.0, 'token': {'mint': 'COPY', 'symbol': 'CP'}}
+        ]},
+        {'t': T0 + 4 * 3600, 'type': 'prices', 'prices': {'SPIKE': 2.0, 'LORE': 1.0}},
+        {'t': T0 + DAY, 'type': 'prices', 'prices': {}},
+    ]
+    path = tmp_path / 'recording.jsonl'
+    path.write_text('\n'.join(json.dumps(e) for e in events))
+    return str(path)
+
+
+def test_recorded_data_lookups(tmp_path):
+    """Events are looked up by time; prices accumulate across snapshots"""
+    data = RecordedData.load(_recording(tmp_path))
+
+    assert data.latest('volume', T0 + 10)['tokens'][0]['current_volume'] == 60000
+    assert data.latest('volume', T0 + 3600)['tokens'][0]['current_volume'] == 400000
+    assert data.between('narratives', T0, T0 + DAY)[0]['narratives'][0]['topic'] == 'AI'
+    assert data.prices(T0 + DAY) == {'SPIKE': 2.0, 'LORE': 1.0, 'COPY': 0.5}
+
+
+def test_replays_a_day_of_real_traders_quickly(tmp_path, monkeypatch):
+    """The unchanged traders trade the recording on a virtual clock"""
+    monkeypatch.setenv('MAX_POSITION_SIZE_SOL', '10')
+    report = run_backtest(
+        _recording(tmp_path),
+        trader_names=['volume_trader', 'lore_trader', 'copy_trader']
+    )
+
+    traders = report['traders']
+    # Volume and lore positions are closed by take-profit and stop-loss
+    assert traders['VolumeTrader']['fills'] == 2
+    assert traders['LoreTrader']['fills'] == 2
+    assert traders['VolumeTrader']['closed_trades'] == 1
+    assert traders['CopyTrader']['fills'] == 1
+    assert traders['CopyTrader']['open_positions'] == 1
+
+    # 5 SOL into a mint that doubled, less fees and slippage
+    assert 4.5 < traders['VolumeTrader']['pnl_sol'] < 5.0
+    assert -2.6 < traders['LoreTrader']['pnl_sol'] < -2.5
+    assert traders['CopyTrader']['pnl_sol'] < 0
+
+    # 60 s volume cycles for a whole day, in well under a minute of wall time
+    assert traders['VolumeTrader']['cycles'] >= DAY // 60
+    assert report['simulated_seconds'] == DAY
+    assert report['wall_seconds'] < 30
+
+
+def test_expand_grid():
+    grid = expand_grid({'volume_trader.timeframe_minutes': [5, 15], 'lore_trader.narrative_strength_min': [0.5]})
+    assert grid == [
+        {'volume_trader.timeframe_minutes': 5, 'lore_trader.narrative_strength_min': 0.5},
+        {'volume_trader.timeframe_minutes': 15, 'lore_trader.narrative_strength_min': 0.5},
+    ]
@@ -0,0 +1,57 @@
+"""Tests for batched wallet snapshots"""
+
+import pytest
+
+from core.rpc import RpcGateway
+from tests.stand_ins import RpcStandIn
+from utils.balances import snapshot_wallets
+
+
+def _multiple_accounts(params):
+    keys = params[0]
+    return {
+        'context': {'slot': 1},
+        'value': [
+            None if key.endswith('EMPTY') else {'lamports': 2_500_000_000}
+            for key in keys
+        ]
+    }
+
+
+def _token_accounts(params):
+    return {
+        'context': {'slot': 1},
+        'value': [{
+            'pubkey': f"ata-{params[0]}",
+            'account': {'data': {'parsed': {'info': {
+                'mint': 'MINT1',
+                'tokenAmount': {'uiAmountString': '12.5', 'decimals': 6}
+            }}}}
+        }]
+    }
+
+
+@pytest.mark.asyncio
+async def test_snapshot_uses_few_round_trips():
+    """200 wallets are fetched in a handful of requests"""
+    handlers = {
+        'getMultipleAccounts': _multiple_accounts,
+        'getTokenAccountsByOwner': _token_accounts
+    }
+    wallets = [f"Wallet{i}" for i in range(199)] + ['WalletEMPTY']
+
+    async with RpcStandIn(handlers) as server:
+        rpc = RpcGateway(server.url)
+        snapshot = await snapshot_wallets(rpc, wallets)
+        await rpc.close()
+
+    assert len(snapshot) == 200
+    assert server.http_requests == 6
+    assert snapshot['Wallet0']['sol'] == 2.5
+    assert snapshot['WalletEMPTY']['lamports'] == 0
+    assert snapshot['Wallet7']['tokens'] == [{
+        'account': 'ata-Wallet7',
+        'mint': 'MINT1',
+        'amount': 12.5,
+        'decimals': 6
+    }]
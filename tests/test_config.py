@@ -58,3 +58,59 @@ def test_calculate_position_size():
     position_size = config.calculate_position_size()
     assert position_size > 0
     assert isinstance(position_size, float)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """A writable copy of config.yaml"""
+    path = tmp_path / 'config.yaml'
+    path.write_text(open('config.yaml').read())
+    return path
+
+
+def test_snapshot_is_immutable():
+    """The compiled snapshot cannot be mutated in place"""
+    config = Config()
+
+    with pytest.raises(TypeError):
+        config.config['traders']['volume_trader']['strategy']['timeframe_minutes'] = 1
+    assert isinstance(config.config['traders']['lore_trader']['strategy']['monitor_platforms'], tuple)
+
+
+def test_reload_swaps_snapshot_and_traders_resync(config_file):
+    """A changed file is picked up by traders on their next sync"""
+    from traders.volume_trader import VolumeTrader
+
+    config = Config(str(config_file))
+    trader = VolumeTrader(config)
+    assert trader.volume_threshold == 3.0
+
+    config_file.write_text(config_file.read_text().replace(
+        'volume_threshold_multiplier: 3.0', 'volume_threshold_multiplier: 4.5'
+    ))
+    assert config.reload()
+    assert config.version == 2
+
+    assert trader.sync_config()
+    assert trader.volume_threshold == 4.5
+    assert not trader.sync_config()
+
+
+def test_invalid_reload_keeps_previous_snapshot(config_file):
+    """A bad edit is rejected and the running snapshot stays in place"""
+    config = Config(str(config_file))
+    config_file.write_text(config_file.read_text().replace(
+        'global_stop_loss: 0.15', 'global_stop_loss: "lots"'
+    ))
+
+    assert not config.reload()
+    assert config.version == 1
+    assert config.get_setting('risk_management', 'global_stop_loss') == 0.15
+
+
+def test_overrides_survive_reload(config_file):
+    config = Config(str(config_file))
+    config.override({'lore_trader.narrative_strength_min': 0.9})
+    config.reload()
+
+    assert config.get_trader_config('lore_trader', 'narrative_strength_min') == 0.9
@@ -0,0 +1,131 @@
+"""Tests for the DEX quote layer"""
+
+import asyncio
+import pytest
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+
+from core.rpc import RpcGateway
+from tests.stand_ins import QuoteApiStandIn, RpcStandIn, SwapInstructionsStandIn
+from utils import dex
+from utils.dex import SOL_MINT, QuoteCache
+from utils.transactions import BlockhashRefresher, TransactionPipeline
+
+
+@pytest.mark.asyncio
+async def test_concurrent_quotes_share_one_request():
+    """Identical concurrent quote requests collapse into one HTTP call"""
+    async with QuoteApiStandIn(delay=0.05) as api:
+        cache = QuoteCache(url=api.url)
+        quotes = await asyncio.gather(*[
+            cache.get_quote(SOL_MINT, 'MINT', 1_000_000_000) for _ in range(5)
+        ])
+        await cache.close()
+
+    assert len(api.requests) == 1
+    assert cache.stats == {'hits': 0, 'misses': 1, 'coalesced': 4, 'invalidated': 0}
+    assert all(q['inAmount'] == '1000000000' for q in quotes)
+
+
+@pytest.mark.asyncio
+async def test_nearby_amounts_hit_and_are_rescaled():
+    """Amounts in the same bucket are served from cache, rescaled"""
+    async with QuoteApiStandIn(price=2.0) as api:
+        cache = QuoteCache(url=api.url, amount_bucket_pct=0.01)
+        await cache.get_quote(SOL_MINT, 'MINT', 1_000_000_000)
+        quote = await cache.get_quote(SOL_MINT, 'MINT', 1_001_000_000)
+        await cache.close()
+
+    assert len(api.requests) == 1
+    assert cache.stats['hits'] == 1
+    assert quote['inAmount'] == '1001000000'
+    assert int(quote['outAmount']) == pytest.approx(2_002_000_000, rel=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_new_slot_invalidates_quote():
+    """Quotes older than max_slot_age slots are fetched again"""
+    async with QuoteApiStandIn(slot=100) as api:
+        cache = QuoteCache(url=api.url, max_slot_age=1)
+        await cache.get_quote(SOL_MINT, 'MINT', 5000)
+
+        cache.on_slot(101)
+        await cache.get_quote(SOL_MINT, 'MINT', 5000)
+        cache.on_slot(102)
+        await cache.get_quote(SOL_MINT, 'MINT', 5000)
+        await cache.close()
+
+    assert len(api.requests) == 2
+    assert cache.stats['hits'] == 1
+    assert cache.stats['invalidated'] == 1
+
+
+async def _swap(monkeypatch, statuses, heights, final_height=200, max_confirm_seconds=90.0):
+    """Run execute_swap against stand-ins answering status polls in order"""
+    handlers = {
+        'getLatestBlockhash': lambda params: {
+            'context': {'slot': 1},
+            'value': {'blockhash': str(Hash.new_unique()), 'lastValidBlockHeight': 100}
+        },
+        'sendTransaction': lambda params: 'SIG',
+        'getSignatureStatuses': lambda params: {'value': [statuses.pop(0) if statuses else None]},
+        'getBlockHeight': lambda params: heights.pop(0) if heights else final_height
+    }
+    async with RpcStandIn(handlers) as server, QuoteApiStandIn() as quotes, \
+            SwapInstructionsStandIn() as instructions:
+        rpc = RpcGateway(server.url)
+        payer = Keypair()
+        pipeline = TransactionPipeline(
+            rpc, {str(payer.pubkey()): payer}, BlockhashRefresher(rpc, interval_seconds=60),
+            swap_instructions_url=instructions.url, confirm_poll_seconds=0.01,
+            max_confirm_seconds=max_confirm_seconds
+        )
+        monkeypatch.setattr(dex, 'quote_cache', QuoteCache(url=quotes.url))
+        monkeypatch.setattr(dex, 'tx_pipeline', pipeline)
+        await pipeline.start()
+
+        result = await dex.execute_swap(rpc, str(payer.pubkey()), 'MINT', 0.1, 'buy')
+
+        await pipeline.stop()
+        await dex.quote_cache.close()
+        await rpc.close()
+    sends = sum(1 for call in server.calls if call['method'] == 'sendTransaction')
+    return result, sends
+
+
+@pytest.mark.asyncio
+async def test_swap_succeeds_only_once_confirmed(monkeypatch):
+    """Sent transactions are rebroadcast until their status is confirmed"""
+    result, sends = await _swap(
+        monkeypatch,
+        statuses=[None, {'confirmationStatus': 'processed', 'err': None},
+                  {'confirmationStatus': 'confirmed', 'err': None}],
+        heights=[90, 91, 92]
+    )
+
+    assert result['success'] and result['tx'] == 'SIG'
+    assert sends == 3
+
+
+@pytest.mark.asyncio
+async def test_swap_fails_on_error_or_expiry(monkeypatch):
+    """An on-chain error or an expired blockhash is a failed swap"""
+    failed, _ = await _swap(
+        monkeypatch, statuses=[{'confirmationStatus': 'confirmed', 'err': {'InstructionError': [2, 1]}}],
+        heights=[90]
+    )
+    expired, _ = await _swap(monkeypatch, statuses=[], heights=[90, 101])
+
+    assert not failed['success'] and 'InstructionError' in failed['error']
+    assert not expired['success'] and 'expired' in expired['error']
+    assert expired['tx'] == 'SIG'
+
+
+@pytest.mark.asyncio
+async def test_swap_gives_up_when_confirmation_cannot_be_told(monkeypatch):
+    """A node that never answers the block height does not poll forever"""
+    result, sends = await _swap(monkeypatch, statuses=[], heights=[], final_height=None, max_confirm_seconds=0.05)
+
+    assert not result['success'] and 'unconfirmed' in result['error']
+    assert result['tx'] == 'SIG' and sends > 1
@@ -0,0 +1,96 @@
+"""Tests for the shared order executor"""
+
+import asyncio
+import time
+import pytest
+
+from core.executor import OrderExecutor, OrderIntent
+from utils import dex
+
+
+@pytest.fixture
+def fake_swaps(monkeypatch):
+    """Replace execute_swap with a slow fake that records concurrency"""
+    state = {'calls': [], 'running': 0, 'max_running': 0, 'success': True}
+
+    async def execute_swap(client, wallet, token_mint, amount_sol, side):
+        state['calls'].append(token_mint)
+        sent_at = time.time()
+        state['running'] += 1
+        state['max_running'] = max(state['max_running'], state['running'])
+        await asyncio.sleep(0.02)
+        state['running'] -= 1
+        return {'success': state['success'], 'error': None, 'tx': f"tx-{token_mint}", 'sent_at': sent_at}
+
+    monkeypatch.setattr(dex, 'execute_swap', execute_swap)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_orders_run_in_parallel_per_wallet(fake_swaps):
+    """Intents run concurrently, capped per wallet"""
+    executor = OrderExecutor(per_wallet_concurrency=3)
+    futures = [
+        executor.submit(OrderIntent('VolumeTrader', 'W1', f"MINT{i}", 1.0))
+        for i in range(6)
+    ]
+    results = await asyncio.gather(*futures)
+
+    assert all(r['success'] for r in results)
+    assert fake_swaps['max_running'] == 3
+    assert executor.stats['executed'] == 6
+
+
+@pytest.mark.asyncio
+async def test_duplicate_mint_is_merged_or_rejected(fake_swaps):
+    """Same trader merges, another trader is rejected within the window"""
+    executor = OrderExecutor()
+    first = executor.submit(OrderIntent('VolumeTrader', 'W1', 'MINT', 1.0))
+    merged = executor.submit(OrderIntent('VolumeTrader', 'W1', 'MINT', 1.0))
+    rejected = executor.submit(OrderIntent('LoreTrader', 'W2', 'MINT', 1.0))
+
+    assert merged is first
+    assert (await rejected)['duplicate'] is True
+    assert (await first)['success'] is True
+    assert fake_swaps['calls'] == ['MINT']
+
+
+@pytest.mark.asyncio
+async def test_failed_order_allows_retry(fake_swaps):
+    """A failed order does not block the mint for the rest of the window"""
+    fake_swaps['success'] = False
+    executor = OrderExecutor()
+    await executor.submit(OrderIntent('CopyTrader', 'W1', 'MINT', 1.0))
+
+    fake_swaps['success'] = True
+    result = await executor.submit(OrderIntent('LoreTrader', 'W2', 'MINT', 1.0))
+
+    assert result['success'] is True
+    assert fake_swaps['calls'] == ['MINT', 'MINT']
+
+
+@pytest.mark.asyncio
+async def test_cancelled_order_allows_retry(fake_swaps):
+    """A cancelled order neither raises on the next submit nor blocks it"""
+    executor = OrderExecutor()
+    first = executor.submit(OrderIntent('CopyTrader', 'W1', 'MINT', 1.0))
+    first.cancel()
+    await asyncio.gather(first, return_exceptions=True)
+
+    result = await executor.submit(OrderIntent('LoreTrader', 'W2', 'MINT', 1.0))
+    assert result['success'] is True
+
+
+@pytest.mark.asyncio
+async def test_intents_past_their_budget_are_dropped_unsent(fake_swaps):
+    """Waiting for the wallet past the budget drops an intent; sent ones are stamped"""
+    executor = OrderExecutor(per_wallet_concurrency=1)
+    sent, late = {}, {}
+    first = executor.submit(OrderIntent('CopyTrader', 'W1', 'FIRST', 1.0, timestamps=sent))
+    stale = executor.submit(OrderIntent('CopyTrader', 'W1', 'LATE', 1.0, timestamps=late, budget_seconds=0.01))
+
+    assert (await stale)['stale'] is True
+    assert (await first)['success'] is True
+    assert fake_swaps['calls'] == ['FIRST']
+    assert sent['submitted'] <= time.time() and late == {}
+    assert executor.stats['stale'] == 1 and executor.stats['failed'] == 0
@@ -0,0 +1,117 @@
+"""Tests for the trade journal"""
+
+import asyncio
+import sqlite3
+import time
+import pytest
+
+from core.executor import OrderExecutor, OrderIntent
+from core.journal import TradeJournal, sqlite_path
+from utils import dex
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = TradeJournal(str(tmp_path / 'elena.db'), batch_size=200)
+    journal.start()
+    yield journal
+    journal.close()
+
+
+def test_sqlite_path():
+    assert sqlite_path('sqlite:///elena.db') == 'elena.db'
+    assert sqlite_path('sqlite:////var/lib/elena.db') == '/var/lib/elena.db'
+    with pytest.raises(ValueError):
+        sqlite_path('postgresql://localhost/elena')
+
+
+def test_pnl_by_trader_and_time_range(journal):
+    """PnL is grouped per trader and limited to the requested window"""
+    journal.record_trade('VolumeTrader', 1.5, True, 'MINT1', 'sell', 5.0, 'tx1')
+    journal.record_trade('VolumeTrader', -0.5, False)
+    journal.record_trade('LoreTrader', 2.0, True)
+    assert journal.flush(timeout=5)
+
+    pnl = journal.pnl()
+    assert pnl['VolumeTrader'] == {'trades': 2, 'wins': 1, 'losses': 1, 'pnl_sol': 1.0}
+    assert pnl['LoreTrader']['pnl_sol'] == 2.0
+
+    assert list(journal.pnl(trader='LoreTrader')) == ['LoreTrader']
+    assert journal.pnl(since=time.time() + 60) == {}
+
+
+def test_writer_batches_thousands_of_events(journal):
+    """Queueing is cheap and rows are committed in groups"""
+    started = time.perf_counter()
+    for i in range(5000):
+        journal.record_cycle('VolumeTrader', 0.01, 0.0, i % 10 == 0)
+    queued = time.perf_counter() - started
+    assert journal.flush(timeout=10)
+
+    assert queued < 0.5
+    assert journal.stats['written'] == 5000
+    assert journal.stats['commits'] < 5000 / 10
+
+    db = journal._connect()
+    assert db.execute("SELECT COUNT(*) FROM cycles WHERE woken = 1").fetchone() == (500,)
+    assert db.execute("PRAGMA journal_mode").fetchone() == ('wal',)
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_executor_journals_fills(journal, monkeypatch):
+    """Each finished swap becomes a fill row with its latency"""
+    async def execute_swap(client, wallet, token_mint, amount_sol, side):
+        await asyncio.sleep(0.01)
+        return {'success': True, 'error': None, 'tx': 'sig'}
+
+    monkeypatch.setattr(dex, 'execute_swap', execute_swap)
+    executor = OrderExecutor()
+    executor.journal = journal
+    await executor.submit(OrderIntent('CopyTrader', 'W1', 'MINT', 1.0))
+    assert journal.flush(timeout=5)
+
+    db = journal._connect()
+    row = db.execute("SELECT trader, token_mint, success, tx_signature, latency_ms FROM fills").fetchone()
+    db.close()
+    assert row[:4] == ('CopyTrader', 'MINT', 1, 'sig')
+    assert row[4] >= 10
+
+
+def test_open_positions_replay_buys_since_last_sell(tmp_path):
+    """Buys after a trader's last sell of a mint are still held"""
+    path = str(tmp_path / 'old.db')
+    old = sqlite3.connect(path)
+    old.execute(
+        "CREATE TABLE fills (id INTEGER PRIMARY KEY, trader TEXT NOT NULL, wallet TEXT NOT NULL, "
+        "token_mint TEXT NOT NULL, side TEXT NOT NULL, amount_sol REAL NOT NULL, "
+        "success INTEGER NOT NULL, tx_signature TEXT, error TEXT, latency_ms REAL, "
+        "timestamp REAL NOT NULL)"
+    )
+    old.commit()
+    old.close()
+
+    # Journals written before fills kept their size are migrated on start
+    journal = TradeJournal(path)
+    journal.start()
+    bought = {'success': True, 'tx': 'sig', 'fill': {'tokens': 100.0, 'price': 0.01}}
+    journal.record_fill('VolumeTrader', 'W1', 'A', 'buy', 1.0, bought)
+    journal.record_fill('VolumeTrader', 'W1', 'A', 'sell', 1.2, {'success': True})
+    journal.record_fill('VolumeTrader', 'W1', 'A', 'buy', 1.0, bought)
+    journal.record_fill('VolumeTrader', 'W1', 'A', 'buy', 2.0,
+                        {'success': True, 'fill': {'tokens': 100.0, 'price': 0.02}})
+    journal.record_fill('VolumeTrader', 'W1', 'B', 'buy', 1.0, bought)
+    journal.record_fill('VolumeTrader', 'W1', 'B', 'sell', 1.1, {'success': False})
+    journal.record_fill('VolumeTrader', 'W1', 'C', 'buy', 1.0, {'success': False})
+    journal.record_fill('CopyTrader', 'W2', 'A', 'buy', 1.0, bought)
+    journal.record_fill('CopyTrader', 'W2', 'D', 'buy', 1.0, bought)
+    journal.record_fill('CopyTrader', 'W2', 'D', 'sell', 1.0, {'success': True})
+    assert journal.flush(timeout=5)
+
+    held = {(p['trader'], p['mint']): p for p in journal.open_positions(['VolumeTrader'])}
+    journal.close()
+
+    assert set(held) == {('VolumeTrader', 'A'), ('VolumeTrader', 'B')}
+    assert held[('VolumeTrader', 'A')]['quantity'] == 200
+    assert held[('VolumeTrader', 'A')]['price'] == pytest.approx(0.015)
+    assert held[('VolumeTrader', 'B')]['wallet'] == 'W1'
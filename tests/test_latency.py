@@ -0,0 +1,97 @@
+"""Tests for the copy-trade fast path"""
+
+import asyncio
+import time
+import pytest
+
+from core.latency import BudgetQueue, LatencyTracker
+from traders.copy_trader import CopyTrader
+from utils import dex
+from utils.config import Config
+
+
+def test_budget_queue_serves_best_fresh_items_first():
+    now = [100.0]
+    queue = BudgetQueue(budget_seconds=5, max_items=3, clock=lambda: now[0])
+
+    assert queue.put('small', 1.0, born_at=100)
+    assert queue.put('big', 9.0, born_at=100)
+    assert queue.put('old', 50.0, born_at=96)
+    assert not queue.put('expired', 99.0, born_at=90)
+    assert queue.put('medium', 5.0, born_at=100)
+    assert queue.stats['overflow'] == 1 and len(queue) == 3
+
+    now[0] = 102
+    assert asyncio.run(queue.get()) == 'big'
+    assert asyncio.run(queue.get()) == 'medium'
+    assert queue.stats == {'queued': 4, 'served': 2, 'stale': 2, 'overflow': 1}
+
+
+def test_latency_spans_and_percentiles():
+    tracker = LatencyTracker()
+    observed = []
+    tracker.observer = lambda span, seconds: observed.append(span)
+    for i in range(1, 101):
+        tracker.record({'detected': 0.0, 'queued': 0.0, 'dequeued': i / 1000, 'submitted': i / 1000})
+
+    assert tracker.percentile('detect_to_submit', 50) == pytest.approx(0.050)
+    assert tracker.percentile('detect_to_submit', 99) == pytest.approx(0.099)
+    assert tracker.summary()['source_to_submit'] == {'count': 0, 'p50': None, 'p99': None}
+    assert observed.count('queue_wait') == 100
+
+
+@pytest.mark.asyncio
+async def test_feed_activity_is_copied_without_waiting_for_a_cycle(monkeypatch):
+    trader = CopyTrader(Config())
+    trader.ranker.cache_path = None
+    trader.copy_workers = 1
+    trader.executor.per_wallet_concurrency = 1
+    submitted = []
+    release = asyncio.Event()
+
+    async def execute_swap(client, wallet, token_mint, amount_sol, side):
+        submitted.append(token_mint)
+        sent_at = time.time()
+        await release.wait()
+        return {'success': True, 'error': None, 'tx': f"tx-{token_mint}", 'sent_at': sent_at}
+
+    monkeypatch.setattr(dex, 'execute_swap', execute_swap)
+    trader.ranker.apply({'wallet': 'GOOD', 'side': 'buy', 'token': {'mint': 'X'}, 'token_amount': 1, 'amount_sol': 1})
+    trader.ranker.apply({'wallet': 'GOOD', 'side': 'sell', 'token': {'mint': 'X'}, 'token_amount': 1, 'amount_sol': 4})
+    trader._start_workers()
+
+    def activity(signature, wallet, mint, size, age=0.0):
+        now = time.time()
+        return {
+            'wallet': wallet, 'signature': signature, 'side': 'buy', 'amount_sol': size,
+            'token': {'mint': mint, 'symbol': mint},
+            'timestamps': {'source': now - age, 'detected': now, 'decoded': now}
+        }
+
+    trader._on_activity(activity('s1', 'MEH', 'FIRST', 1.0))
+    await asyncio.sleep(0.01)
+    # The worker is busy; these wait in the queue, best score x size first
+    trader._on_activity(activity('s2', 'MEH', 'SMALL', 1.0))
+    trader._on_activity(activity('s3', 'GOOD', 'BEST', 1.0))
+    trader._on_activity(activity('s4', 'MEH', 'STALE', 50.0, age=6.0))
+    trader._on_activity(activity('s5', 'MEH', 'SELL', 1.0) | {'side': 'sell'})
+    assert not trader._enqueue(activity('s3', 'GOOD', 'BEST', 1.0))
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert submitted == ['FIRST', 'BEST', 'SMALL']
+    assert trader.copy_queue.stats['stale'] == 1
+
+    latency = trader.latency.summary()
+    assert latency['detect_to_submit']['count'] == 3
+    assert latency['detect_to_submit']['p99'] < 1.0
+    status = await trader.get_status()
+    assert status['fast_path']['served'] == 3
+
+    # A buy the executor merges into an earlier order was never sent: not a copy
+    trader._on_activity(activity('s6', 'GOOD', 'FIRST', 1.0))
+    await asyncio.sleep(0.05)
+    assert submitted == ['FIRST', 'BEST', 'SMALL']
+    assert trader.copy_queue.stats['served'] == 4
+    assert trader.latency.summary()['detect_to_submit']['count'] == 3
+    await trader.stop()
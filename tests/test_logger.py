@@ -0,0 +1,81 @@
+"""Tests for the queued logging pipeline"""
+
+import io
+import json
+import logging
+import time
+import pytest
+
+from utils.logger import FastQueueHandler, log_fields, setup_logging, shutdown_logging
+
+
+class SlowStream(io.StringIO):
+    """A terminal that takes 1 ms per write"""
+
+    def write(self, text):
+        time.sleep(0.001)
+        return super().write(text)
+
+
+@pytest.fixture
+def stream():
+    stream = SlowStream()
+    setup_logging(level='INFO', fmt='json', rate_limit=5, rate_window_seconds=60, stream=stream)
+    yield stream
+    shutdown_logging()
+
+
+def _lines(stream):
+    shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_setup_is_idempotent(stream):
+    setup_logging()
+    setup_logging()
+    handlers = [h for h in logging.getLogger().handlers if isinstance(h, FastQueueHandler)]
+    assert len(handlers) == 1
+
+
+def test_json_lines_carry_cycle_context(stream):
+    logger = logging.getLogger('elena.VolumeTrader')
+    with log_fields(trader='VolumeTrader', cycle_id=7):
+        with log_fields(mint='MINT'):
+            logger.info("Executing %s swap", 'buy')
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.error("Swap failed", exc_info=True)
+
+    lines = _lines(stream)
+    assert lines[0]['msg'] == 'Executing buy swap'
+    assert (lines[0]['trader'], lines[0]['cycle_id'], lines[0]['mint']) == ('VolumeTrader', 7, 'MINT')
+    assert 'mint' not in lines[1]
+    assert 'ValueError: boom' in lines[1]['exc']
+
+
+def test_repetitive_messages_are_rate_limited(stream):
+    logger = logging.getLogger('elena.CopyTrader')
+    for i in range(100):
+        logger.info(f"Detected {i} wallet activities")
+    for i in range(10):
+        logger.error("Errors are never dropped")
+
+    lines = _lines(stream)
+    assert sum(l['level'] == 'INFO' for l in lines) == 5
+    assert sum(l['level'] == 'ERROR' for l in lines) == 10
+
+
+def test_burst_does_not_block_the_caller(stream):
+    """Thousands of records return immediately while the writer is slow"""
+    shutdown_logging()
+    setup_logging(level='INFO', fmt='json', rate_limit=10_000, stream=stream)
+    logger = logging.getLogger('elena.burst')
+    started = time.perf_counter()
+    for i in range(2000):
+        logger.warning("burst %d", i, extra={'mint': f"MINT{i}"})
+    elapsed = time.perf_counter() - started
+
+    # Writing them synchronously would take at least 2000 x 1 ms
+    assert elapsed < 0.5
+    assert len(_lines(stream)) == 2000
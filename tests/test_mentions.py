@@ -0,0 +1,142 @@
+"""Tests for local token mention extraction"""
+
+import random
+import string
+import time
+import pytest
+
+import base58
+
+from utils import mentions
+from utils.mentions import Automaton, MentionExtractor
+from utils.social import extract_token_mentions
+
+WIF = 'EKpQGSJtjMFqKZ9KQanSqYXRcF8fBopzLHYxdM65zcjm'
+BONK = 'DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263'
+
+
+def _mint(seed: int) -> str:
+    return base58.b58encode(random.Random(seed).randbytes(32)).decode()
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = Automaton(['he', 'she', 'hers', 'his'])
+    assert sorted(automaton.scan('ushers')) == [(3, 'he'), (3, 'she'), (5, 'hers')]
+
+
+def test_cashtags_names_tickers_and_addresses():
+    extractor = MentionExtractor([
+        {'mint': WIF, 'symbol': 'WIF', 'name': 'dogwifhat'},
+        {'mint': BONK, 'symbol': 'BONK', 'name': 'Bonk'},
+    ])
+
+    assert extractor.extract('loading up on $wif today') == [{'mint': WIF, 'symbol': 'WIF'}]
+    assert extractor.extract('Dogwifhat to the moon') == [{'mint': WIF, 'symbol': 'WIF'}]
+    assert extractor.extract('BONK season') == [{'mint': BONK, 'symbol': 'BONK'}]
+    # Lowercase bare tickers and word fragments are not mentions
+    assert extractor.extract('swifty bonkers') == []
+    assert extractor.extract('wif is nice') == []
+
+    assert extractor.extract(f"CA: {BONK}") == [{'mint': BONK, 'symbol': 'BONK'}]
+    # Unknown addresses may be wallets or programs: only the resolver may pick them
+    unknown = _mint(1)
+    assert extractor.scan(f"send to {unknown}") == ([], [[{'mint': unknown, 'symbol': None}]])
+    assert extractor.extract(f"CA: {unknown[:-2]}00") == []
+
+
+def test_new_listings_are_indexed_incrementally():
+    extractor = MentionExtractor(
+        [{'mint': _mint(i), 'symbol': f'TKN{i}'} for i in range(20)], merge_threshold=10
+    )
+    merges = extractor.stats['merges']
+
+    extractor.add_tokens([{'mint': _mint(100), 'symbol': 'FRESH'}])
+    assert extractor.stats['merges'] == merges
+    assert extractor.extract('$FRESH just listed') == [{'mint': _mint(100), 'symbol': 'FRESH'}]
+    assert extractor.extract('$TKN3 and $TKN17')[0]['symbol'] in {'TKN3', 'TKN17'}
+
+    assert extractor.add_tokens([{'mint': _mint(100), 'symbol': 'FRESH'}]) == 0
+
+
+@pytest.mark.asyncio
+async def test_only_ambiguous_mentions_reach_the_resolver():
+    copycat = _mint(7)
+    extractor = MentionExtractor([
+        {'mint': WIF, 'symbol': 'WIF'},
+        {'mint': copycat, 'symbol': 'WIF'},
+        {'mint': BONK, 'symbol': 'BONK'},
+    ])
+    calls = []
+
+    async def resolver(text, candidates):
+        calls.append(candidates)
+        return [c for c in candidates if c['mint'] == WIF]
+
+    extractor.resolver = resolver
+
+    assert await extractor.extract_async('$BONK only') == [{'mint': BONK, 'symbol': 'BONK'}]
+    assert calls == []
+
+    found = await extractor.extract_async('$WIF and $BONK')
+    assert {m['mint'] for m in found} == {WIF, BONK}
+    assert len(calls) == 1 and {c['mint'] for c in calls[0]} == {WIF, copycat}
+
+    # The address settles it without a resolver call
+    await extractor.extract_async(f'$WIF {copycat}')
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_social_content_fields_are_scanned(monkeypatch):
+    monkeypatch.setattr(mentions, 'mention_index', MentionExtractor([{'mint': WIF, 'symbol': 'WIF'}]))
+    found = await extract_token_mentions({'caption': 'new dance', 'hashtags': ['WIF', 'fyp']})
+    assert found == [{'mint': WIF, 'symbol': 'WIF'}]
+
+
+def test_scans_thousands_of_posts_per_second():
+    rng = random.Random(0)
+    symbols = list({''.join(rng.choices(string.ascii_uppercase, k=4)) for _ in range(6000)})[:5000]
+    tokens = [
+        {'mint': _mint(i), 'symbol': symbol, 'name': f'coin{i}'}
+        for i, symbol in enumerate(symbols)
+    ]
+    extractor = MentionExtractor(tokens)
+    words = ['the', 'moon', 'send', 'it', 'ser', 'gm', 'wagmi', 'this', 'pump', 'is', 'early']
+    posts = [
+        ' '.join(rng.choices(words, k=25)) + f" ${tokens[i]['symbol']}"
+        for i in range(3000)
+    ]
+
+    started = time.perf_counter()
+    found = [extractor.extract(post) for post in posts]
+    elapsed = time.perf_counter() - started
+
+    assert all(found)
+    assert len(posts) / elapsed > 2000
+
+
+def test_short_or_lowercase_names_are_not_mentions():
+    extractor = MentionExtractor([
+        {'mint': WIF, 'symbol': 'WIF', 'name': 'dogwifhat'},
+        {'mint': BONK, 'symbol': 'BNK', 'name': 'the'},
+    ])
+
+    assert extractor.extract('Dogwifhat is back') == [{'mint': WIF, 'symbol': 'WIF'}]
+    assert extractor.extract('saw a dogwifhat at the park') == []
+    assert extractor.extract('The moon') == []
+
+
+def test_listings_are_shared_through_the_token_list(tmp_path):
+    """Tokens one process saves are picked up by another's index"""
+    path = str(tmp_path / 'tokens.json')
+    volume = MentionExtractor(token_list_path=path)
+    tiktok = MentionExtractor(token_list_path=path)
+    assert tiktok.load() == 0
+
+    volume.add_tokens([{'mint': WIF, 'symbol': 'WIF', 'name': 'dogwifhat'}])
+    volume.save()
+    assert volume.load() == 0
+
+    assert tiktok.load() == 1
+    assert tiktok.extract('Dogwifhat $WIF') == [{'mint': WIF, 'symbol': 'WIF'}]
+    assert tiktok.load() == 0
@@ -0,0 +1,95 @@
+"""Tests for Prometheus metrics"""
+
+import socket
+import urllib.request
+import pytest
+import yaml
+
+from core.executor import OrderExecutor, OrderIntent
+from core.metrics import Metrics
+from core.rpc import RpcError, RpcGateway
+from tests.stand_ins import RpcStandIn
+from utils import dex
+from utils.config import Config
+
+
+def _value(metrics: Metrics, name: str, **labels) -> float:
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_cycles_and_overruns_are_observed(timed_trader, run_for):
+    metrics = Metrics()
+    trader = timed_trader(interval=0.05, cycle_time=0.08)
+    trader.scheduler.metrics = metrics
+    await run_for(trader, 0.3)
+
+    stats = trader.scheduler.stats_for(trader.name)
+    assert _value(metrics, 'elena_trade_cycle_seconds_count', trader='TimedTrader') == stats['cycles']
+    assert _value(metrics, 'elena_cycle_overruns_total', trader='TimedTrader') == stats['overruns'] > 0
+
+
+@pytest.mark.asyncio
+async def test_rpc_latency_and_errors_by_method():
+    metrics = Metrics()
+    handlers = {'getSlot': lambda params: 42}
+
+    async with RpcStandIn(handlers) as server:
+        rpc = RpcGateway(server.url)
+        rpc.metrics = metrics
+        await rpc.get_slot()
+        with pytest.raises(RpcError):
+            await rpc.get_balance('Wallet')
+        await rpc.close()
+
+    assert _value(metrics, 'elena_rpc_call_seconds_count', method='getSlot') == 1
+    assert _value(metrics, 'elena_rpc_errors_total', method='getSlot') == 0
+    assert _value(metrics, 'elena_rpc_errors_total', method='getBalance') == 1
+
+
+def test_gauges_and_http_endpoint(unused_tcp_port):
+    metrics = Metrics()
+    depth = [3]
+    metrics.track_queue('journal', lambda: depth[0])
+    metrics.track_positions(lambda: 7)
+    metrics.serve(port=unused_tcp_port)
+
+    body = urllib.request.urlopen(f"http://127.0.0.1:{unused_tcp_port}/metrics").read().decode()
+    assert 'elena_queue_depth{queue="journal"} 3.0' in body
+    assert 'elena_open_positions 7.0' in body
+
+
+def test_from_config_and_busy_port(tmp_path):
+    """Settings come from config.yaml and a taken port only logs a warning"""
+    raw = yaml.safe_load(open('config.yaml'))
+    raw['metrics'].update({'port': 9200, 'latency_buckets': [0.1, 1.0]})
+    path = tmp_path / 'config.yaml'
+    path.write_text(yaml.safe_dump(raw))
+    metrics = Metrics.from_config(Config(str(path)))
+    assert (metrics.host, metrics.port) == ('127.0.0.1', 9200)
+    assert metrics.swap_seconds._upper_bounds == [0.1, 1.0, float('inf')]
+
+    with socket.socket() as taken:
+        taken.bind(('127.0.0.1', 0))
+        taken.listen()
+        assert not metrics.serve(port=taken.getsockname()[1])
+
+
+@pytest.mark.asyncio
+async def test_swap_latency_is_send_to_confirm(monkeypatch):
+    """Swaps that reached the chain report their confirmation time"""
+    async def execute_swap(client, wallet, token_mint, amount_sol, side):
+        if token_mint == 'UNROUTED':
+            return {'success': False, 'error': 'Quote failed', 'tx': None}
+        return {'success': True, 'error': None, 'tx': 'sig', 'confirm_seconds': 0.7}
+
+    monkeypatch.setattr(dex, 'execute_swap', execute_swap)
+    metrics = Metrics()
+    executor = OrderExecutor()
+    executor.metrics = metrics
+    await executor.submit(OrderIntent('VolumeTrader', 'W', 'MINT', 1.0))
+    await executor.submit(OrderIntent('VolumeTrader', 'W', 'UNROUTED', 1.0))
+
+    labels = {'trader': 'VolumeTrader', 'side': 'buy'}
+    assert _value(metrics, 'elena_swap_seconds_sum', outcome='success', **labels) == 0.7
+    assert _value(metrics, 'elena_swap_seconds_count', outcome='failure', **labels) == 0
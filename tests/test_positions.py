@@ -0,0 +1,122 @@
+"""Tests for the position book and exit engine"""
+
+import pytest
+
+from core.executor import OrderExecutor, OrderIntent
+from core.positions import PositionBook, PositionWatcher
+from utils import dex
+from utils.dex import LAMPORTS_PER_SOL
+
+
+def test_stop_loss_take_profit_and_trailing():
+    """One price tick flags every rule that triggered"""
+    book = PositionBook(stop_loss=0.15, take_profit=0.50, trailing_stop=0.10)
+    book.open('VolumeTrader', 'W1', 'LOSER', 100, 1.0)
+    book.open('LoreTrader', 'W2', 'WINNER', 100, 1.0)
+    book.open('CopyTrader', 'W3', 'TRAIL', 100, 1.0)
+    book.open('CopyTrader', 'W3', 'FLAT', 100, 1.0)
+
+    assert book.on_prices({'TRAIL': 1.3}) == []
+    exits = book.on_prices({'LOSER': 0.8, 'WINNER': 1.6, 'TRAIL': 1.15, 'FLAT': 1.02})
+
+    assert {e['mint']: e['reason'] for e in exits} == {
+        'LOSER': 'stop_loss', 'WINNER': 'take_profit', 'TRAIL': 'trailing_stop'
+    }
+    # Exiting rows are not flagged again on the next tick
+    assert book.on_prices({'LOSER': 0.5}) == []
+
+
+def test_averaging_requested_exit_and_close():
+    book = PositionBook()
+    row = book.open('VolumeTrader', 'W1', 'MINT', 100, 1.0)
+    assert book.open('VolumeTrader', 'W1', 'MINT', 100, 2.0) == row
+    assert book.entry_price[row] == 1.5
+
+    assert book.request_exit('VolumeTrader', 'MINT', 'volume_drop')
+    exits = book.on_prices({})
+    assert exits[0]['reason'] == 'volume_drop'
+
+    assert book.close(row, 2.0) == pytest.approx(100.0)
+    assert len(book) == 0 and book.open_mints() == []
+    assert book.open('LoreTrader', 'W2', 'OTHER', 1, 1.0) == row
+
+
+def test_exits_trigger_within_one_tick_at_scale():
+    """Hundreds of positions are evaluated in the same pass"""
+    book = PositionBook(stop_loss=0.15, take_profit=0.50)
+    for i in range(500):
+        book.open(f"Trader{i % 4}", 'W', f"MINT{i}", 10, 1.0)
+
+    prices = {f"MINT{i}": (0.5 if i % 2 else 1.1) for i in range(500)}
+    exits = book.on_prices(prices)
+
+    assert len(exits) == 250
+    assert all(e['reason'] == 'stop_loss' for e in exits)
+
+
+@pytest.mark.asyncio
+async def test_watcher_sells_and_settles(monkeypatch):
+    """Executor buys open positions; the watcher sells them on a trigger"""
+    orders = []
+
+    async def execute_swap(client, wallet, token_mint, amount_sol, side, token_amount=None):
+        orders.append((side, token_mint, amount_sol))
+        if side == 'sell':
+            quote = {'inAmount': str(int(token_amount)), 'outAmount': str(int(amount_sol * LAMPORTS_PER_SOL))}
+        else:
+            quote = {'outAmount': '1000'}
+        return {'success': True, 'error': None, 'tx': 'sig', 'quote': quote}
+
+    monkeypatch.setattr(dex, 'execute_swap', execute_swap)
+    book = PositionBook(take_profit=0.5)
+    executor = OrderExecutor()
+    executor.positions = book
+
+    await executor.submit(OrderIntent('VolumeTrader', 'W1', 'MINT', 1.0, symbol='MNT'))
+    assert book.positions()[0]['entry_price'] == pytest.approx(0.001)
+
+    closed = []
+
+    async def prices(mints):
+        return {'MINT': 0.002}
+
+    watcher = PositionWatcher(book, executor, prices, on_closed=lambda e, pnl: closed.append(pnl))
+    await watcher.tick()
+    await watcher.stop()
+
+    assert orders[-1] == ('sell', 'MINT', pytest.approx(2.0))
+    assert closed == [pytest.approx(1.0)]
+    assert len(book) == 0
+
+
+@pytest.mark.asyncio
+async def test_stop_loss_sells_the_held_quantity_at_the_quoted_price(monkeypatch):
+    """A price that keeps falling after the tick still fills; PnL is the real fill"""
+    sells = []
+
+    async def get_quote(input_mint, output_mint, amount, slippage_bps=100, swap_mode='ExactIn'):
+        sells.append((input_mint, amount, swap_mode))
+        # Half the tick price by the time the route is quoted
+        return {'inAmount': str(amount), 'outAmount': str(int(amount * 0.0004 * LAMPORTS_PER_SOL))}
+
+    async def execute_swap(client, wallet, token_mint, amount_sol, side, token_amount=None):
+        quote = await dex.get_swap_quote(token_mint, amount_sol, side, token_amount=token_amount)
+        return {'success': True, 'error': None, 'tx': 'sig', 'quote': quote}
+
+    monkeypatch.setattr(dex.quote_cache, 'get_quote', get_quote)
+    monkeypatch.setattr(dex, 'execute_swap', execute_swap)
+    book = PositionBook(stop_loss=0.15)
+    book.open('CopyTrader', 'W1', 'MINT', 1000, 0.001)
+    closed = []
+
+    async def prices(mints):
+        return {'MINT': 0.0008}
+
+    watcher = PositionWatcher(book, OrderExecutor(), prices, on_closed=lambda e, pnl: closed.append(pnl))
+    exits = await watcher.tick()
+    await watcher.stop()
+
+    assert exits[0]['reason'] == 'stop_loss'
+    assert sells == [('MINT', 1000, 'ExactIn')]
+    assert closed == [pytest.approx(1000 * (0.0004 - 0.001))]
+    assert len(book) == 0
@@ -0,0 +1,113 @@
+"""Tests for the on-demand cycle profiler"""
+
+import asyncio
+import json
+import os
+import pstats
+import time
+import pytest
+
+from core.base_trader import BaseTrader
+from core.profiling import CycleProfiler
+from core.status import StatusPublisher
+from utils.config import Config
+
+
+def busy_work(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class BusyTrader(BaseTrader):
+    """Trader whose cycle burns CPU and then waits on 'I/O'"""
+
+    def __init__(self, config: Config, name: str = "BusyTrader"):
+        super().__init__(name, "test_wallet", config)
+        self.cycles = 0
+
+    async def trade_cycle(self):
+        self.cycles += 1
+        busy_work(0.03)
+        await asyncio.sleep(0.01)
+
+    def get_sleep_interval(self) -> float:
+        return 0.01
+
+
+@pytest.mark.asyncio
+async def test_requested_cycles_are_sampled_and_written(tmp_path, run_for):
+    trader = BusyTrader(Config())
+    trader.profiler = CycleProfiler(str(tmp_path), interval_seconds=0.002)
+
+    trader.profile(cycles=3)
+    await run_for(trader, 0.4)
+
+    assert trader.profiler.stats['profiled_cycles'] == 3
+    assert trader.cycles > 3
+    assert trader.profiler.sessions == {} and trader.profiler.requested == {}
+
+    collapsed = [p for p in os.listdir(tmp_path) if p.endswith('.collapsed')]
+    assert len(collapsed) == 1 and collapsed[0].endswith('cycles1-3.collapsed')
+    lines = (tmp_path / collapsed[0]).read_text().splitlines()
+    assert {line.split(';')[0] for line in lines} <= {f"BusyTrader:cycle-{i}" for i in (1, 2, 3)}
+    assert any('busy_work' in line for line in lines)
+
+    stats = pstats.Stats(str(tmp_path / collapsed[0].replace('.collapsed', '.pstats')))
+    hot = max(stats.stats.items(), key=lambda item: item[1][2])
+    assert hot[0][2] == 'busy_work'
+
+
+@pytest.mark.asyncio
+async def test_profiler_is_idle_when_not_requested(tmp_path, run_for):
+    trader = BusyTrader(Config())
+    trader.profiler = CycleProfiler(str(tmp_path))
+
+    await run_for(trader, 0.1)
+
+    assert trader.profiler.stats['samples'] == 0
+    assert trader.profiler._thread is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_config_reload_arms_every_trader(tmp_path):
+    path = tmp_path / 'config.yaml'
+    path.write_text(open('config.yaml').read())
+    config = Config(str(path))
+    profiler = CycleProfiler.from_config(config)
+    profiler.traders.update({'VolumeTrader', 'CopyTrader'})
+    config.on_reload(profiler.apply_config)
+
+    config.reload()
+    assert profiler.requested == {}
+
+    path.write_text(path.read_text().replace('  request: 0', '  request: 1').replace(
+        '  cycles: 10\n', '  cycles: 4\n'
+    ))
+    config.reload()
+    assert profiler.requested == {'VolumeTrader': 4, 'CopyTrader': 4}
+
+
+@pytest.mark.asyncio
+async def test_profile_command_over_status_socket(tmp_path):
+    profiler = CycleProfiler(str(tmp_path))
+
+    async def on_command(command):
+        profiler.request(command['trader'], command['cycles'])
+        return {'ok': True}
+
+    async def snapshot():
+        return {}
+
+    publisher = StatusPublisher(snapshot, str(tmp_path / 'elena.sock'), interval_seconds=10)
+    publisher.on_command = on_command
+    await publisher.start()
+
+    reader, writer = await asyncio.open_unix_connection(publisher.socket_path)
+    writer.write(b'{"cmd": "profile", "trader": "LoreTrader", "cycles": 2}\n')
+    reply = json.loads(await reader.readline())
+
+    assert reply == {'reply': {'ok': True}}
+    assert profiler.requested == {'LoreTrader': 2}
+    writer.close()
+    await publisher.stop()
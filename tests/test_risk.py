@@ -0,0 +1,92 @@
+"""Tests for the global risk engine"""
+
+import asyncio
+import pytest
+
+from core.executor import OrderExecutor, OrderIntent
+from core.positions import PositionBook
+from core.risk import RiskEngine
+from utils import dex
+
+
+def test_reservations_cap_concurrent_positions():
+    """Pending reservations count against the limit until released"""
+    risk = RiskEngine(max_concurrent_positions=2)
+    first = risk.reserve('VolumeTrader', 'A', 1.0)
+    second = risk.reserve('LoreTrader', 'B', 1.0)
+
+    assert risk.reserve('CopyTrader', 'C', 1.0) is None
+    risk.release(second)
+    third = risk.reserve('CopyTrader', 'C', 1.0)
+    assert third is not None
+
+    risk.commit(first)
+    # Adding to a held position needs no new slot
+    assert risk.reserve('VolumeTrader', 'A', 1.0) is not None
+    assert risk.stats['rejected_positions'] == 1
+
+
+def test_size_is_capped_by_capital_pct_and_absolute_max():
+    risk = RiskEngine(max_position_size_pct=0.2, max_position_size_sol=3.0)
+    assert risk.reserve('VolumeTrader', 'A', 5.0).amount_sol == 3.0
+
+    risk.set_capital('LoreTrader', 10.0)
+    assert risk.reserve('LoreTrader', 'B', 5.0).amount_sol == 2.0
+
+
+def test_daily_loss_limit_halts_until_next_day():
+    now = [86400 * 100 + 10]
+    risk = RiskEngine(daily_loss_limit_sol=2.0, clock=lambda: now[0])
+    reservation = risk.reserve('VolumeTrader', 'A', 1.0)
+    risk.commit(reservation)
+
+    risk.record_close('VolumeTrader', 'A', -2.5)
+    assert risk.get_status()['halted']
+    assert risk.reserve('VolumeTrader', 'B', 1.0) is None
+
+    now[0] += 86400
+    assert risk.reserve('VolumeTrader', 'B', 1.0) is not None
+    assert risk.daily_pnl_sol == 0.0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_signals_do_not_over_allocate(monkeypatch):
+    """Buys from every trader at once never exceed the position limit"""
+    async def execute_swap(client, wallet, token_mint, amount_sol, side):
+        await asyncio.sleep(0.01)
+        return {'success': True, 'error': None, 'tx': 'sig'}
+
+    monkeypatch.setattr(dex, 'execute_swap', execute_swap)
+    executor = OrderExecutor()
+    executor.risk = RiskEngine(max_concurrent_positions=5)
+
+    results = await asyncio.gather(*[
+        executor.submit(OrderIntent(f"Trader{i % 4}", f"W{i % 4}", f"MINT{i}", 1.0))
+        for i in range(20)
+    ])
+
+    assert sum(r['success'] for r in results) == 5
+    assert sum(bool(r.get('risk_rejected')) for r in results) == 15
+    assert len(executor.risk.open_positions) == 5
+    assert executor.risk.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_buy_without_a_fill_keeps_its_exposure(monkeypatch):
+    """A confirmed buy the position book cannot open still holds its slot"""
+    async def execute_swap(client, wallet, token_mint, amount_sol, side):
+        return {'success': True, 'error': None, 'tx': 'sig'}
+
+    monkeypatch.setattr(dex, 'execute_swap', execute_swap)
+    executor = OrderExecutor()
+    executor.risk = RiskEngine(max_concurrent_positions=1)
+    executor.positions = PositionBook()
+
+    result = await executor.submit(OrderIntent('VolumeTrader', 'W', 'A', 1.0))
+
+    assert result['success']
+    assert len(executor.positions) == 0
+    assert executor.stats['untracked'] == 1
+    assert executor.risk.open_positions == {('VolumeTrader', 'A')}
+    assert executor.risk.pending == {}
+    assert executor.risk.reserve('VolumeTrader', 'B', 1.0) is None
@@ -0,0 +1,65 @@
+"""Tests for the shared RPC gateway"""
+
+import asyncio
+import pytest
+
+from core.rpc import RpcGateway, RpcError
+from tests.stand_ins import RpcStandIn
+
+
+@pytest.mark.asyncio
+async def test_identical_inflight_calls_are_coalesced():
+    """Two traders asking for the same balance in one tick share a wire call"""
+    handlers = {'getBalance': lambda params: {'context': {'slot': 1}, 'value': 5_000_000_000}}
+
+    async with RpcStandIn(handlers, delay=0.05) as server:
+        rpc = RpcGateway(server.url)
+        balances = await asyncio.gather(
+            rpc.get_balance('WalletA'),
+            rpc.get_balance('WalletA'),
+            rpc.get_balance('WalletA')
+        )
+        await rpc.close()
+
+    assert balances == [5_000_000_000] * 3
+    assert server.http_requests == 1
+    assert rpc.stats['coalesced'] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    """No more than max_concurrency requests reach the endpoint at once"""
+    handlers = {'getBalance': lambda params: {'context': {'slot': 1}, 'value': 1}}
+
+    async with RpcStandIn(handlers, delay=0.02) as server:
+        rpc = RpcGateway(server.url, max_concurrency=2)
+        await asyncio.gather(*[rpc.get_balance(f"Wallet{i}") for i in range(8)])
+        await rpc.close()
+
+    assert server.http_requests == 8
+    assert server.max_concurrent <= 2
+
+
+@pytest.mark.asyncio
+async def test_rpc_error_is_raised():
+    """JSON-RPC errors surface as RpcError"""
+    async with RpcStandIn({}) as server:
+        rpc = RpcGateway(server.url)
+        with pytest.raises(RpcError):
+            await rpc.get_slot()
+        await rpc.close()
+
+    assert rpc.stats['errors'] == 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_batch_raises_rpc_error():
+    """A node answering a whole batch with one error object raises RpcError"""
+    async with RpcStandIn({'getSlot': lambda params: 7}, batch_limit=2) as server:
+        rpc = RpcGateway(server.url)
+        assert await rpc.batch([('getSlot', [])] * 2) == [7, 7]
+        with pytest.raises(RpcError, match='Batch too large'):
+            await rpc.batch([('getSlot', [])] * 3)
+        await rpc.close()
+
+    assert rpc.stats['errors'] == 1
@@ -0,0 +1,56 @@
+"""Tests for the deadline cycle scheduler"""
+
+import asyncio
+import pytest
+
+from core.scheduler import CycleScheduler
+from utils.config import Config
+
+
+@pytest.mark.asyncio
+async def test_period_does_not_include_cycle_time(timed_trader, run_for):
+    """Cycles start on the deadline grid, not interval + cycle time apart"""
+    trader = timed_trader(interval=0.05, cycle_time=0.03)
+    await run_for(trader, 0.52)
+
+    starts = trader.cycle_starts
+    assert len(starts) >= 9
+    assert starts[-1] - starts[0] == pytest.approx(0.05 * (len(starts) - 1), abs=0.03)
+
+
+@pytest.mark.asyncio
+async def test_overrun_skips_missed_slots(timed_trader, run_for):
+    """A slow cycle skips the slots it overran and reports it"""
+    trader = timed_trader(interval=0.05, cycle_time=0.12)
+    await run_for(trader, 0.3)
+
+    stats = trader.scheduler.stats_for(trader.name)
+    assert stats['overruns'] >= 1
+    assert stats['skipped_slots'] >= 2
+    assert stats['cycles'] <= 3
+
+
+@pytest.mark.asyncio
+async def test_wakeup_runs_cycle_early(timed_trader):
+    """request_wakeup runs a cycle before the deadline"""
+    trader = timed_trader(interval=10, cycle_time=0)
+    trader.running = True
+    task = asyncio.create_task(trader.scheduler.run_trader(trader))
+
+    await asyncio.sleep(0.01)
+    assert len(trader.cycle_starts) == 1
+
+    trader.request_wakeup()
+    await asyncio.sleep(0.01)
+    assert len(trader.cycle_starts) == 2
+    assert trader.scheduler.stats_for(trader.name)['wakeups'] == 1
+
+    trader.running = False
+    trader.request_wakeup()
+    await task
+
+
+def test_scheduler_from_config():
+    """Jitter comes from the scheduler section of config.yaml"""
+    scheduler = CycleScheduler.from_config(Config())
+    assert scheduler.jitter_pct == 0.02
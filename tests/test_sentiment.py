@@ -0,0 +1,203 @@
+"""Tests for narrative scoring"""
+
+import asyncio
+import random
+import time
+import pytest
+
+from tests.stand_ins import ScoringModelStandIn
+from traders import lore_trader
+from traders.lore_trader import LoreTrader
+from utils.config import Config
+from utils.sentiment import NarrativeClusterer, NarrativeScorer, content_key, narrative_text
+
+
+def _narratives(count: int, prefix: str = 'cats on solana'):
+    return [{'topic': f'{prefix} {"x" * i}'} for i in range(count)]
+
+
+def test_content_key_ignores_case_links_and_spacing():
+    assert content_key('Dogs  are BACK https://t.co/abc') == content_key('dogs are back')
+    assert content_key('dogs are back') != content_key('dogs are back!')
+
+
+@pytest.mark.asyncio
+async def test_misses_are_batched_and_run_concurrently():
+    async with ScoringModelStandIn(delay=0.05) as model:
+        scorer = NarrativeScorer(model.url, batch_size=4, max_concurrency=2)
+        narratives = _narratives(10)
+
+        scores = await scorer.score_many(narratives)
+
+        assert scores == [model.strength(narrative_text(n)) for n in narratives]
+        assert [len(batch) for batch in model.batches] == [4, 4, 2]
+        assert model.max_concurrent == 2
+        await scorer.close()
+
+
+@pytest.mark.asyncio
+async def test_repeats_are_served_from_cache_and_coalesced():
+    async with ScoringModelStandIn(delay=0.05) as model:
+        scorer = NarrativeScorer(model.url, batch_size=8)
+        narratives = _narratives(3)
+        reposted = [{'topic': n['topic'].upper() + '  '} for n in narratives]
+
+        # Two cycles overlapping in time share one request
+        await asyncio.gather(scorer.score_many(narratives), scorer.score_many(narratives))
+        assert len(model.batches) == 1 and scorer.stats['coalesced'] == 3
+
+        await scorer.score_many(reposted + narratives)
+        assert len(model.batches) == 1
+        assert scorer.stats['hits'] == 3
+        await scorer.close()
+
+
+@pytest.mark.asyncio
+async def test_ttl_and_lru_eviction():
+    async with ScoringModelStandIn() as model:
+        scorer = NarrativeScorer(model.url, max_entries=2, ttl_seconds=0.05)
+        a, b, c = _narratives(3)
+
+        await scorer.score_many([a, b])
+        await scorer.score(a)
+        await scorer.score(c)
+        assert len(scorer) == 2 and scorer.stats['evicted'] == 1
+
+        # b was least recently used; a and c are still cached
+        await scorer.score_many([a, c])
+        assert len(model.batches) == 2
+        await scorer.score(b)
+        assert len(model.batches) == 3
+
+        await asyncio.sleep(0.06)
+        await scorer.score(c)
+        assert len(model.batches) == 4
+        await scorer.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_survives_restart(tmp_path):
+    path = str(tmp_path / 'scores.json')
+    async with ScoringModelStandIn() as model:
+        scorer = NarrativeScorer(model.url, api_key='k', cache_path=path)
+        first = await scorer.score_many(_narratives(5))
+        await scorer.close()
+
+        restarted = NarrativeScorer(model.url, cache_path=path)
+        restarted.load()
+        assert await restarted.score_many(_narratives(5)) == first
+        assert len(model.batches) == 1
+        assert model.headers[0]['Authorization'] == 'Bearer k'
+        await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_score_zero_and_are_retried():
+    async with ScoringModelStandIn(fail=True) as model:
+        scorer = NarrativeScorer(model.url)
+        assert await scorer.score_many(_narratives(2)) == [0.0, 0.0]
+        assert scorer.stats['errors'] == 1 and len(scorer) == 0
+
+        model.fail = False
+        assert await scorer.score_many(_narratives(2)) != [0.0, 0.0]
+        assert len(model.batches) == 2
+        await scorer.close()
+
+
+STORY = "the cat token community just launched a charity wallet for shelter cats on solana and the chart is going vertical"
+
+
+def _reworded(story: str, rng: random.Random, edits: int = 1) -> str:
+    words = story.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(['wow', 'huge', 'ser', 'lfg'])
+    return ' '.join(words)
+
+
+def test_near_duplicates_merge_across_platforms():
+    rng = random.Random(0)
+    narratives = [
+        {'topic': _reworded(STORY, rng), 'platform': platform, 'mentions': 3}
+        for platform in ('twitter', 'discord', 'telegram', 'twitter')
+    ]
+    narratives.append({'topic': STORY.upper() + ' https://t.co/x', 'platform': 'twitter', 'mentions': 10,
+                       'associated_token': None})
+    narratives[1]['associated_token'] = {'mint': 'CAT', 'symbol': 'CAT'}
+    narratives.append({'topic': 'dog coin holders vote to burn half the supply next week', 'platform': 'discord'})
+
+    merged = NarrativeClusterer().merge(narratives)
+
+    assert len(merged) == 2
+    story, other = merged
+    assert story['topic'] == narratives[4]['topic']
+    assert story['mentions'] == 22 and story['cluster_size'] == 5
+    assert story['platforms'] == ['discord', 'telegram', 'twitter']
+    assert story['associated_token'] == {'mint': 'CAT', 'symbol': 'CAT'}
+    assert other['mentions'] == 1 and other['cluster_size'] == 1
+
+
+def test_narratives_about_different_mints_stay_apart():
+    post = "New cat coin {} is pumping hard on solana right now"
+    mew = {'topic': post.format('MEW'), 'associated_token': {'mint': 'MEW', 'symbol': 'MEW'}}
+    popcat = {'topic': post.format('POPCAT'), 'associated_token': {'mint': 'POPCAT', 'symbol': 'POPCAT'}}
+    # Similar to both, but must not bridge them into one cluster
+    untagged = {'topic': post.format('coin')}
+
+    merged = NarrativeClusterer().merge([mew, untagged, popcat, dict(mew)])
+
+    assert [n['associated_token']['mint'] for n in merged] == ['MEW', 'POPCAT']
+    assert [n['cluster_size'] for n in merged] == [3, 1]
+
+
+def test_same_mint_duplicates_merge_behind_another_mint():
+    """A bucket led by one mint still compares the other mint's copies"""
+    text = "New cat coin is pumping hard on solana right now, get in early"
+
+    assert NarrativeClusterer().clusters([text] * 3, keys=['X', 'Y', 'Y']) == [[0], [1, 2]]
+
+
+def test_clustering_scales_linearly():
+    rng = random.Random(1)
+    vocab = [f'word{i}' for i in range(5000)]
+    stories = [' '.join(rng.choices(vocab, k=25)) for _ in range(1000)]
+    narratives = [{'topic': _reworded(stories[i % len(stories)], rng)} for i in range(20_000)]
+    clusterer = NarrativeClusterer()
+
+    started = time.perf_counter()
+    merged = clusterer.merge(narratives)
+    elapsed = time.perf_counter() - started
+
+    # Copies one word apart share about 0.7 of their bigrams; stray splits are rare
+    assert len(stories) <= len(merged) < len(stories) * 1.1
+    assert elapsed < 5
+
+
+@pytest.mark.asyncio
+async def test_lore_trader_scores_and_trades_each_story_once(monkeypatch):
+    rng = random.Random(2)
+    scored = []
+    orders = []
+
+    async def get_trending_narratives(platforms):
+        return [
+            {'topic': _reworded(STORY, rng), 'platform': platform, 'associated_token': {'mint': 'CAT', 'symbol': 'CAT'}}
+            for platform in platforms * 5
+        ]
+
+    async def analyze_narratives(narratives):
+        scored.extend(narratives)
+        return [0.9] * len(narratives)
+
+    monkeypatch.setattr(lore_trader, 'get_trending_narratives', get_trending_narratives)
+    monkeypatch.setattr(lore_trader, 'analyze_narratives', analyze_narratives)
+    trader = LoreTrader(Config())
+
+    async def submit_order(mint, amount, side, **kwargs):
+        orders.append(mint)
+        return {'success': True}
+
+    trader.submit_order = submit_order
+    await trader.trade_cycle()
+
+    assert len(scored) == 1 and scored[0]['mentions'] == 15
+    assert orders == ['CAT']
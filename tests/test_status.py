@@ -0,0 +1,56 @@
+"""Tests for the status publisher"""
+
+import asyncio
+import json
+import pytest
+
+from core.status import StatusPublisher
+
+
+@pytest.mark.asyncio
+async def test_snapshots_reach_every_monitor(tmp_path):
+    """One snapshot per interval is shared by all connected monitors"""
+    built = []
+
+    async def snapshot():
+        built.append(1)
+        return {'traders': {'VolumeTrader': {'trades': len(built)}}}
+
+    publisher = StatusPublisher(snapshot, str(tmp_path / 'elena.sock'), interval_seconds=0.02)
+    await publisher.start()
+
+    # Nothing is built while nobody listens
+    await asyncio.sleep(0.06)
+    assert built == []
+
+    monitors = [await asyncio.open_unix_connection(publisher.socket_path) for _ in range(3)]
+    frames = [json.loads(await reader.readline()) for reader, _ in monitors]
+
+    assert len({json.dumps(f) for f in frames}) == 1
+    assert frames[0]['traders']['VolumeTrader']['trades'] >= 1
+
+    for _, writer in monitors:
+        writer.close()
+    await publisher.stop()
+    assert publisher.stats['published'] == len(built)
+
+
+@pytest.mark.asyncio
+async def test_slow_monitor_skips_frames(tmp_path):
+    """A monitor that stops reading does not buffer without bound"""
+    async def snapshot():
+        return {'padding': 'x' * 64 * 1024}
+
+    publisher = StatusPublisher(
+        snapshot, str(tmp_path / 'elena.sock'), interval_seconds=3600, max_buffer_bytes=128 * 1024
+    )
+    await publisher.start()
+    reader, writer = await asyncio.open_unix_connection(publisher.socket_path)
+    await asyncio.sleep(0.01)
+
+    for _ in range(50):
+        await publisher.publish()
+
+    assert publisher.stats['dropped_frames'] > 0
+    writer.close()
+    await publisher.stop()
@@ -0,0 +1,138 @@
+"""Tests for the multi-process trader supervisor"""
+
+import asyncio
+import os
+import time
+import pytest
+
+from core.manager import TradingManager
+from core.risk import RiskEngine, SharedRiskState
+from core.supervisor import Supervisor
+from traders import load_trader
+from utils.config import Config
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.yaml')
+
+
+def crashing_worker(key, slot, config_path, overrides, risk_state, conn, status_interval_seconds):
+    """Reports once, then dies"""
+    conn.send(('status', {'traders': {key: {'trades': 0}}}))
+    os._exit(1)
+
+
+def trading_worker(key, slot, config_path, overrides, risk_state, conn, status_interval_seconds):
+    """Opens one position through the shared risk state, then waits for stop"""
+    risk = RiskEngine(max_concurrent_positions=2, shared=risk_state, slot=slot)
+    reservation = risk.reserve(key, f"MINT-{key}", 1.0)
+    if reservation:
+        risk.commit(reservation)
+    conn.send(('status', {
+        'traders': {key: {'trades': 1}},
+        'orders': {'executed': 1},
+        'positions': [{'trader': key}] if reservation else []
+    }))
+    while conn.recv() != 'stop':
+        pass
+
+
+async def wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.05)
+
+
+def test_shared_state_caps_positions_across_engines():
+    """Engines in different slots draw from one global limit"""
+    shared = SharedRiskState(2)
+    volume = RiskEngine(max_concurrent_positions=2, shared=shared, slot=0)
+    copy = RiskEngine(max_concurrent_positions=2, shared=shared, slot=1)
+
+    volume.commit(volume.reserve('VolumeTrader', 'A', 1.0))
+    pending = copy.reserve('CopyTrader', 'B', 1.0)
+    assert volume.reserve('VolumeTrader', 'C', 1.0) is None
+
+    copy.release(pending)
+    assert shared.get_status()['pending'] == 0
+    copy.commit(copy.reserve('CopyTrader', 'B', 1.0))
+
+    copy.record_close('CopyTrader', 'B', -1.5)
+    assert volume.daily_pnl_sol == -1.5
+    assert shared.get_status()['open_positions'] == 1
+
+    # A crashed worker's capacity is handed back
+    assert shared.clear(0) == (1, 0)
+    assert copy.reserve('CopyTrader', 'D', 1.0) is not None
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_restarted_with_backoff():
+    supervisor = Supervisor(
+        ['volume_trader'], Config(CONFIG_PATH),
+        restart_backoff_seconds=0.1, max_restart_backoff_seconds=30,
+        poll_seconds=0.02, target=crashing_worker
+    )
+    task = asyncio.create_task(supervisor.run())
+
+    worker = supervisor.workers[0]
+    await wait_for(lambda: worker.restarts >= 2)
+    assert supervisor.get_status()['traders'] == {'volume_trader': {'trades': 0}}
+    # Consecutive crashes double the wait
+    assert worker.backoff_seconds >= 0.2
+
+    await supervisor.shutdown()
+    await task
+    assert all(w.process is None for w in supervisor.workers)
+
+
+@pytest.mark.asyncio
+async def test_status_and_risk_aggregate_across_workers():
+    supervisor = Supervisor(
+        ['volume_trader', 'copy_trader', 'lore_trader'], Config(CONFIG_PATH),
+        poll_seconds=0.02, target=trading_worker
+    )
+    task = asyncio.create_task(supervisor.run())
+
+    await wait_for(lambda: all(w.status for w in supervisor.workers))
+    status = supervisor.get_status()
+
+    assert set(status['traders']) == {'volume_trader', 'copy_trader', 'lore_trader'}
+    assert status['orders'] == {'executed': 3}
+    # max_concurrent_positions=2 held across all three processes
+    assert len(status['positions']) == 2
+    assert status['risk']['open_positions'] == 2
+    assert all(w['alive'] for w in status['workers'].values())
+
+    await supervisor.shutdown()
+    await task
+    assert supervisor.stats['exits'] == 0
+    assert supervisor.stats['restarts'] == 0
+
+
+def test_restarted_worker_restores_its_open_positions(tmp_path, monkeypatch):
+    """A crashed worker's positions stay counted and are rebuilt on restart"""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'elena.db'}")
+
+    shared = SharedRiskState(2)
+    config = Config(CONFIG_PATH)
+    manager = TradingManager([load_trader('volume_trader', config)], config, risk_state=shared, risk_slot=1)
+    manager.journal.start()
+    bought = {'success': True, 'fill': {'tokens': 50.0, 'price': 0.02}}
+    manager.journal.record_fill('VolumeTrader', 'W', 'HELD', 'buy', 1.0, bought)
+    manager.journal.record_fill('VolumeTrader', 'W', 'SOLD', 'buy', 1.0, bought)
+    manager.journal.record_fill('VolumeTrader', 'W', 'SOLD', 'sell', 1.0, {'success': True})
+    assert manager.journal.flush(timeout=5)
+
+    # The crash keeps positions counted and drops in-flight reservations
+    shared.add(1, positions=2, pending=1)
+    assert shared.clear(1, positions=False) == (2, 1)
+    assert shared.get_status()['open_positions'] == 2
+
+    manager._restore_positions()
+    manager.journal.close()
+
+    assert manager.positions.holds('VolumeTrader', 'HELD')
+    assert not manager.positions.holds('VolumeTrader', 'SOLD')
+    assert manager.positions.positions()[0]['entry_price'] == pytest.approx(0.02)
+    assert manager.risk.open_positions == {('VolumeTrader', 'HELD')}
+    assert shared.get_status() == {'open_positions': 1, 'pending': 0, 'daily_pnl_sol': 0.0}
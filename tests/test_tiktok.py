@@ -0,0 +1,156 @@
+"""Tests for the TikTok ingestion pipeline"""
+
+import asyncio
+import time
+import pytest
+
+from core.pipeline import Stage, StagePipeline
+from traders import tiktok_trader
+from traders.tiktok_trader import TikTokTrader
+from utils.config import Config
+from utils.seen import SeenSet
+
+POSTS = [
+    {'id': f'post{i}', 'views': 500_000, 'likes': 40_000, 'comments': 5_000, 'shares': 5_000}
+    for i in range(20)
+]
+
+
+@pytest.fixture
+def trader(monkeypatch):
+    extracted = []
+    orders = []
+
+    async def scan_tiktok_viral(threshold_views, hours_ago, min_engagement):
+        return POSTS
+
+    async def extract_token_mentions(content):
+        extracted.append(content['id'])
+        await asyncio.sleep(0.05)
+        return [{'mint': f"MINT-{content['id']}", 'symbol': 'VIRAL'}]
+
+    monkeypatch.setattr(tiktok_trader, 'scan_tiktok_viral', scan_tiktok_viral)
+    monkeypatch.setattr(tiktok_trader, 'extract_token_mentions', extract_token_mentions)
+
+    trader = TikTokTrader(Config())
+
+    async def execute(token, content):
+        orders.append(token['mint'])
+        return not token['mint'].startswith('FAIL')
+
+    trader._execute_tiktok_trade = execute
+    trader.extracted = extracted
+    trader.orders = orders
+    return trader
+
+
+def test_seen_set_expires_and_stays_bounded():
+    now = [0.0]
+    seen = SeenSet(ttl_seconds=10, max_items=3, clock=lambda: now[0])
+
+    assert seen.add('a') and not seen.add('a')
+    seen.add('b')
+    seen.add('c')
+    seen.add('d')
+    assert 'a' not in seen and len(seen) == 3
+
+    now[0] = 11
+    assert len(seen) == 0
+    assert seen.add('a')
+
+
+@pytest.mark.asyncio
+async def test_posts_are_processed_once_across_cycles(trader):
+    await trader.trade_cycle()
+    await trader.trade_cycle()
+
+    assert sorted(trader.extracted) == sorted(p['id'] for p in POSTS)
+    assert len(trader.orders) == len(POSTS)
+    assert trader.pipeline.stats['dedup']['dropped'] == len(POSTS)
+
+
+@pytest.mark.asyncio
+async def test_extraction_runs_in_parallel(trader):
+    """20 posts at 50 ms each take three rounds of 8 workers, not 1 s"""
+    started = time.perf_counter()
+    await trader.trade_cycle()
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_failed_extraction_is_retried_and_held_tokens_skipped(trader, monkeypatch):
+    calls = []
+
+    async def flaky(content):
+        calls.append(content['id'])
+        if len(calls) == 1:
+            raise RuntimeError("model timeout")
+        return [{'mint': 'HELD', 'symbol': 'HELD'}]
+
+    monkeypatch.setattr(tiktok_trader, 'extract_token_mentions', flaky)
+    trader.positions.open('TikTokTrader', 'W', 'HELD', 1.0, 1.0)
+    trader.pipeline.stages[1].workers = 1
+
+    await trader.trade_cycle()
+    assert trader.pipeline.stats['extract']['errors'] == 1
+    assert trader.orders == []
+
+    failed = calls[0]
+    calls.clear()
+    await trader.trade_cycle()
+    assert calls == [failed]
+
+
+@pytest.mark.asyncio
+async def test_filtered_and_failed_mentions_are_reconsidered(trader, monkeypatch):
+    """Mentions are claimed only after scoring and an order that went through"""
+    post = {'id': 'slow', 'views': 500_000, 'likes': 1_000, 'comments': 0, 'shares': 0}
+    posts = [post]
+
+    async def extract_token_mentions(content):
+        trader.extracted.append(content['id'])
+        return [{'mint': 'LATE', 'symbol': 'LATE'}, {'mint': 'FAIL', 'symbol': 'FAIL'}]
+
+    monkeypatch.setattr(tiktok_trader, 'extract_token_mentions', extract_token_mentions)
+
+    # Too little engagement yet: nothing is ordered or marked seen
+    assert await trader.pipeline.run(posts) == []
+    assert trader.orders == [] and len(trader.seen_mentions) == 0
+
+    # The post catches on; its mentions are scored again without re-extraction
+    post['likes'] = 50_000
+    results = await trader.pipeline.run(posts)
+    assert [token['mint'] for token in results] == ['LATE']
+    assert sorted(trader.orders) == ['FAIL', 'LATE']
+    assert trader.extracted == ['slow']
+
+    # Only the failed order is retried
+    trader.orders.clear()
+    await trader.pipeline.run(posts)
+    assert trader.orders == ['FAIL']
+
+
+@pytest.mark.asyncio
+async def test_bounded_queues_apply_backpressure(monkeypatch):
+    """A slow stage keeps at most queue_size items waiting in front of it"""
+    depth = []
+
+    async def fast(item):
+        return item
+
+    async def slow(item):
+        await asyncio.sleep(0.001)
+        return item
+
+    pipeline = StagePipeline([Stage('fast', fast), Stage('slow', slow)], queue_size=2)
+    original = asyncio.Queue.put
+
+    async def put(queue, item):
+        await original(queue, item)
+        depth.append(queue.qsize())
+
+    monkeypatch.setattr(asyncio.Queue, 'put', put)
+    results = await pipeline.run(range(50))
+
+    assert sorted(results) == list(range(50))
+    assert max(depth) <= 2
@@ -68,3 +68,14 @@ def test_record_trade():
     assert trader.stats['wins'] == 1
     assert trader.stats['losses'] == 1
     assert trader.stats['total_pnl_sol'] == 1.0
+
+
+def test_volume_trader_identifies_spikes(sample_volume_data):
+    """Volume trader flags tokens above the threshold multiplier"""
+    from traders.volume_trader import VolumeTrader
+    
+    trader = VolumeTrader(Config())
+    trader.volume_threshold = 2.5
+    spikes = trader._identify_spikes(sample_volume_data)
+    
+    assert [token['mint'] for token in spikes] == ['TOKEN1']
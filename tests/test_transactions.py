@@ -0,0 +1,147 @@
+"""Tests for transaction pre-building"""
+
+import base64
+import struct
+import pytest
+
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from core.rpc import RpcGateway
+from tests.stand_ins import RpcStandIn, SwapInstructionsStandIn
+from utils.dex import SOL_MINT
+from utils.transactions import BlockhashRefresher, SwapTemplate, TransactionPipeline
+
+
+def _route_instruction(payer: Keypair) -> Instruction:
+    # discriminator | route plan | amount | quoted amount | slippage | fee
+    data = bytes(8) + b'\x01\x02\x03' + struct.pack('<QQHB', 0, 0, 50, 0)
+    return Instruction(
+        Pubkey.new_unique(),
+        data,
+        [AccountMeta(payer.pubkey(), True, True), AccountMeta(Pubkey.new_unique(), False, True)]
+    )
+
+
+def _template(payer: Keypair) -> SwapTemplate:
+    ix = _route_instruction(payer)
+    size = len(ix.data)
+    return SwapTemplate(payer, [ix], {
+        'amount': (0, size - 19, '<Q'),
+        'quoted_amount': (0, size - 11, '<Q')
+    })
+
+
+def test_template_patches_amounts_and_signs():
+    """Built transactions carry the patched fields and a valid signature"""
+    payer = Keypair()
+    blockhash = Hash.new_unique()
+    wire = _template(payer).build(blockhash, amount=123, quoted_amount=456, cu_price=789)
+
+    tx = VersionedTransaction.from_bytes(wire)
+    assert all(tx.verify_with_results())
+    assert tx.message.recent_blockhash == blockhash
+
+    budget_price, route = tx.message.instructions[1], tx.message.instructions[2]
+    assert struct.unpack('<Q', bytes(budget_price.data)[1:9]) == (789,)
+    assert struct.unpack('<QQHB', bytes(route.data)[-19:]) == (123, 456, 50, 0)
+
+
+@pytest.mark.asyncio
+async def test_refresher_and_sub_millisecond_prepare():
+    """Blockhash is prefetched and preparing a swap takes well under 1 ms"""
+    blockhash = str(Hash.new_unique())
+    handlers = {'getLatestBlockhash': lambda params: {
+        'context': {'slot': 777},
+        'value': {'blockhash': blockhash, 'lastValidBlockHeight': 1000}
+    }}
+    slots = []
+
+    async with RpcStandIn(handlers) as server:
+        rpc = RpcGateway(server.url)
+        payer = Keypair()
+        refresher = BlockhashRefresher(rpc, interval_seconds=60, on_slot=slots.append)
+        pipeline = TransactionPipeline(rpc, {str(payer.pubkey()): payer}, refresher)
+        await pipeline.start()
+
+        key = ('wallet', 'route')
+        pipeline.add_template(key, _template(payer))
+        for amount in range(200):
+            encoded = pipeline.prepare(key, amount=amount, quoted_amount=amount * 2)
+
+        await pipeline.stop()
+        await rpc.close()
+
+    tx = VersionedTransaction.from_bytes(base64.b64decode(encoded))
+    assert str(tx.message.recent_blockhash) == blockhash
+    assert slots == [777]
+
+    total = pipeline.timings['total']
+    assert total['count'] == 200
+    assert total['total_us'] / total['count'] < 1000
+
+
+def _quote(amount: int, slippage_bps: int = 50) -> dict:
+    return {
+        'inputMint': SOL_MINT,
+        'outputMint': 'MINT',
+        'inAmount': str(amount),
+        'outAmount': str(amount * 1000),
+        'otherAmountThreshold': str(amount * 990),
+        'swapMode': 'ExactIn',
+        'slippageBps': slippage_bps,
+        'routePlan': []
+    }
+
+
+@pytest.mark.asyncio
+async def test_route_template_patches_wrapped_sol_per_size():
+    """A reused template wraps exactly the SOL each buy spends"""
+    blockhash = str(Hash.new_unique())
+    handlers = {'getLatestBlockhash': lambda params: {
+        'context': {'slot': 1},
+        'value': {'blockhash': blockhash, 'lastValidBlockHeight': 1000}
+    }}
+
+    async with RpcStandIn(handlers) as server, SwapInstructionsStandIn() as api:
+        rpc = RpcGateway(server.url)
+        payer = Keypair()
+        wallet = str(payer.pubkey())
+        refresher = BlockhashRefresher(rpc, interval_seconds=60)
+        pipeline = TransactionPipeline(
+            rpc, {wallet: payer}, refresher, swap_instructions_url=api.url
+        )
+        await pipeline.start()
+
+        built = {}
+        for amount in (1_000_000, 250_000_000):
+            encoded = await pipeline.prepare_swap(wallet, _quote(amount))
+            built[amount] = VersionedTransaction.from_bytes(base64.b64decode(encoded))
+        await pipeline.prepare_swap(wallet, _quote(1_000_000, slippage_bps=300))
+
+        await pipeline.stop()
+        await rpc.close()
+
+    # One template per slippage; the second size reused the first template
+    assert len(api.requests) == 2
+    for amount, tx in built.items():
+        assert all(tx.verify_with_results())
+        transfer, route = tx.message.instructions[2], tx.message.instructions[3]
+        assert struct.unpack('<IQ', bytes(transfer.data)) == (2, amount)
+        assert struct.unpack('<QQHB', bytes(route.data)[-19:]) == (amount, amount * 1000, 50, 0)
+
+
+@pytest.mark.asyncio
+async def test_prepare_swap_gives_up_without_a_blockhash():
+    """A refresher that never becomes ready fails the swap instead of hanging"""
+    payer = Keypair()
+    refresher = BlockhashRefresher(rpc=None)
+    pipeline = TransactionPipeline(
+        None, {str(payer.pubkey()): payer}, refresher, blockhash_timeout_seconds=0.05
+    )
+
+    with pytest.raises(RuntimeError, match='blockhash'):
+        await pipeline.prepare_swap(str(payer.pubkey()), _quote(1_000_000))
@@ -0,0 +1,121 @@
+"""Tests for volume data structures"""
+
+import numpy as np
+
+from utils.volume import VolumeTable
+from utils.volume_history import VolumeHistoryStore
+
+
+def test_spikes_use_threshold_and_min_volume(sample_volume_data):
+    """Only rows above multiplier x average and min volume are spikes"""
+    table = VolumeTable()
+    table.update(sample_volume_data)
+
+    spikes = table.records(table.spikes(multiplier=2.5, min_volume=50000))
+
+    assert [s['mint'] for s in spikes] == ['TOKEN1']
+    assert len(table.spikes(multiplier=3.0, min_volume=50000)) == 0
+    assert spikes[0]['symbol'] == 'TKN1'
+
+
+def test_table_updates_in_place_and_grows():
+    """Rows keep their position across cycles and stale rows never spike"""
+    table = VolumeTable(capacity=2)
+    table.update([
+        {'mint': f"M{i}", 'symbol': f"S{i}", 'current_volume': 100000, 'avg_volume': 1}
+        for i in range(5)
+    ])
+    assert len(table) == 5
+    row = table.index['M3']
+
+    # Next cycle only M3 is reported; the rest are stale
+    table.update([{'mint': 'M3', 'symbol': 'S3', 'current_volume': 200000, 'avg_volume': 1}])
+
+    assert table.index['M3'] == row
+    assert table.current[row] == 200000
+    assert list(table.spikes(3.0, 50000)) == [row]
+
+
+def test_columnar_update():
+    """Column arrays can be written without building row dicts"""
+    table = VolumeTable()
+    rows = table.rows_for(['A', 'B', 'C'])
+    table.update_columns(
+        rows,
+        current=np.array([10.0, 900000.0, 60000.0]),
+        average=np.array([1.0, 100000.0, 30000.0])
+    )
+
+    assert [table.mints[r] for r in table.spikes(3.0, 50000)] == ['B']
+
+
+def test_history_rolling_mean_and_warm_start(tmp_path):
+    """Rolling means survive closing and reopening the store"""
+    path = str(tmp_path / 'history')
+    store = VolumeHistoryStore(path, capacity=8, buckets=4, bucket_seconds=60)
+    for minute, volume in enumerate([100, 200, 300, 400]):
+        store.record('MINT', volume, now=minute * 60)
+    store.close()
+
+    reopened = VolumeHistoryStore(path, capacity=8, buckets=4, bucket_seconds=60)
+
+    # Current bucket (400) is excluded from the baseline
+    assert reopened.mean('MINT', now=3 * 60) == 200
+
+    # Next bucket rolls the oldest value (100) out of the window
+    reopened.record('MINT', 500, now=4 * 60)
+    assert reopened.mean('MINT', now=4 * 60) == 300
+
+
+def test_history_with_other_settings_is_moved_aside(tmp_path):
+    """A changed timeframe starts a fresh store instead of failing every cycle"""
+    path = str(tmp_path / 'history')
+    store = VolumeHistoryStore(path, capacity=8, buckets=4, bucket_seconds=60)
+    store.record('MINT', 100, now=0)
+    store.close()
+
+    rebuilt = VolumeHistoryStore(path, capacity=8, buckets=4, bucket_seconds=300)
+
+    assert len(rebuilt) == 0 and rebuilt.bucket_seconds == 300
+    assert len(list(tmp_path.glob('history.*'))) == 1
+    assert len(VolumeHistoryStore(path, capacity=8, buckets=4, bucket_seconds=300)) == 0
+
+
+def test_history_zero_fills_gaps_and_evicts(tmp_path):
+    """Missed buckets count as zero volume; cold mints are evicted when full"""
+    store = VolumeHistoryStore(str(tmp_path / 'h'), capacity=2, buckets=4, bucket_seconds=60)
+    store.record('A', 300, now=0)
+    store.record('A', 300, now=120)
+    assert store.mean('A', now=120) == 150
+
+    store.record('B', 1, now=130)
+    store.record('C', 1, now=140)
+
+    assert len(store) == 2
+    assert 'A' not in store.index
+    assert store.stats['evictions'] == 1
+
+
+def test_history_batch_never_evicts_its_own_slots(tmp_path):
+    """A mint allocated later in a batch does not evict one resolved earlier"""
+    store = VolumeHistoryStore(str(tmp_path / 'h'), capacity=3, buckets=4, bucket_seconds=60)
+    for at, mint in enumerate(['A', 'B', 'C']):
+        store.slots_for([mint], now=at)
+
+    slots = store.slots_for(['A', 'D'], now=10)
+
+    assert len(set(slots.tolist())) == 2
+    assert store.index['A'] == slots[0] and store.index['D'] == slots[1]
+    assert 'B' not in store.index
+
+
+def test_history_evicts_idle_mints(tmp_path):
+    """Mints idle past the cutoff free their slots for new ones"""
+    store = VolumeHistoryStore(str(tmp_path / 'h'), capacity=2, buckets=4, bucket_seconds=60)
+    store.record('A', 1, now=0)
+    store.record('B', 1, now=200)
+
+    assert store.evict_idle(240, now=300) == 1
+    assert list(store.index) == ['B']
+    store.record('C', 1, now=300)
+    assert store.stats['evictions'] == 1
@@ -0,0 +1,200 @@
+"""Tests for incremental wallet ranking"""
+
+import random
+import time
+import pytest
+
+from core.rpc import RpcGateway
+from tests.stand_ins import RpcStandIn
+from utils.wallet_ranking import DAY_SECONDS, WalletRanker
+from utils.wallet_tracking import LAMPORTS_PER_SOL, get_top_wallets
+
+T0 = 1_700_000_000
+
+
+def _trade(wallet, side, sol, tokens, mint='MEME', signature=None, at=T0):
+    return {
+        'wallet': wallet,
+        'signature': signature or f'{wallet}-{side}-{sol}-{at}',
+        'block_time': at,
+        'side': side,
+        'token': {'mint': mint, 'symbol': mint},
+        'token_amount': tokens,
+        'amount_sol': sol
+    }
+
+
+def _transaction(wallet, sol_delta, token_before, token_after, at=T0):
+    def balances(amount):
+        return [{
+            'owner': wallet,
+            'mint': 'MEME',
+            'uiTokenAmount': {'uiAmountString': str(amount), 'decimals': 6}
+        }] if amount else []
+
+    return {
+        'slot': 1,
+        'blockTime': at,
+        'transaction': {'message': {'accountKeys': [{'pubkey': wallet}]}},
+        'meta': {
+            'err': None,
+            'preBalances': [10 * LAMPORTS_PER_SOL],
+            'postBalances': [int((10 + sol_delta) * LAMPORTS_PER_SOL)],
+            'preTokenBalances': balances(token_before),
+            'postTokenBalances': balances(token_after)
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_realized_and_unrealized_roi_rank_wallets():
+    ranker = WalletRanker(clock=lambda: T0)
+    ranker.track(['A', 'B', 'C'])
+
+    # A doubles 1 SOL on a full exit; B holds a bag marked at the last trade
+    ranker.apply(_trade('A', 'buy', 1.0, 100))
+    ranker.apply(_trade('A', 'sell', 2.0, 100))
+    ranker.apply(_trade('B', 'buy', 1.0, 100))
+    ranker.apply(_trade('C', 'buy', 2.0, 100))
+    assert not ranker.apply(_trade('A', 'sell', 2.0, 100))
+
+    # B and C are marked at their own buys until a price update re-ranks holders
+    assert [w['address'] for w in ranker.top(10, 1.5)] == ['A']
+    ranker.update_prices({'MEME': 0.05})
+    top = await get_top_wallets(2, 2.0, ranker=ranker)
+    assert [w['address'] for w in top] == ['B', 'C']
+    assert top[0]['roi'] == pytest.approx(5.0)
+    assert ranker.summary('A')['realized_pnl_sol'] == pytest.approx(1.0)
+
+    # Wallets that are no longer candidates are not offered
+    ranker.candidates.discard('B')
+    assert [w['address'] for w in ranker.top(2, 2.0)] == ['C', 'A']
+
+
+def test_trades_leave_the_window():
+    now = [T0]
+    ranker = WalletRanker(window_days=30, clock=lambda: now[0])
+    ranker.track(['OLD', 'NEW'])
+    ranker.apply(_trade('OLD', 'buy', 1.0, 100, at=T0))
+    ranker.apply(_trade('OLD', 'sell', 3.0, 100, at=T0 + 60))
+    ranker.apply(_trade('NEW', 'buy', 1.0, 100, at=T0 + 10 * DAY_SECONDS))
+    ranker.apply(_trade('NEW', 'sell', 2.5, 100, at=T0 + 10 * DAY_SECONDS))
+
+    assert [w['address'] for w in ranker.top(2, 2.0)] == ['OLD', 'NEW']
+    now[0] = T0 + 31 * DAY_SECONDS
+    assert [w['address'] for w in ranker.top(2, 2.0)] == ['NEW']
+    now[0] = T0 + 41 * DAY_SECONDS
+    assert ranker.top(2, 0.0) == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_fetches_only_new_history_with_bounded_concurrency(tmp_path):
+    wallets = [f'W{i}' for i in range(12)]
+    history = {w: ['sell1', 'buy1'] for w in wallets}
+    transactions = {
+        f'{w}:buy1': _transaction(w, -1.0, 0, 100) for w in wallets
+    }
+    transactions.update({f'{w}:sell1': _transaction(w, 2.0 + i / 10, 100, 0) for i, w in enumerate(wallets)})
+    fetched = []
+
+    def signatures(params):
+        wallet, options = params
+        known = [f'{wallet}:{s}' for s in history[wallet]]
+        if 'until' in options:
+            known = known[:known.index(options['until'])]
+        return [{'signature': s, 'err': None} for s in known]
+
+    def transaction(params):
+        fetched.append(params[0])
+        return transactions[params[0]]
+
+    path = str(tmp_path / 'ranking.json')
+    async with RpcStandIn({'getSignaturesForAddress': signatures, 'getTransaction': transaction},
+                          delay=0.01) as server:
+        rpc = RpcGateway(server.url)
+        ranker = WalletRanker(max_concurrency=3, cache_path=path, clock=lambda: T0)
+        ranker.track(wallets)
+
+        await ranker.refresh(rpc)
+        assert server.max_concurrent <= 3
+        assert len(fetched) == 24
+        assert [w['address'] for w in ranker.top(3, 2.0)] == ['W11', 'W10', 'W9']
+
+        # A new buy is the only transaction fetched next time
+        history['W0'].insert(0, 'buy2')
+        transactions['W0:buy2'] = _transaction('W0', -1.0, 0, 10)
+        fetched.clear()
+        await ranker.refresh(rpc)
+        assert fetched == ['W0:buy2']
+        ranker.save()
+
+        restarted = WalletRanker(cache_path=path, clock=lambda: T0)
+        restarted.load()
+        assert restarted.top(3, 2.0) == ranker.top(3, 2.0)
+        fetched.clear()
+        await restarted.refresh(rpc)
+        assert fetched == []
+        await rpc.close()
+
+
+def test_top_k_is_a_heap_lookup():
+    rng = random.Random(0)
+    ranker = WalletRanker(clock=lambda: T0)
+    wallets = [f'W{i}' for i in range(50_000)]
+    ranker.track(wallets)
+    for wallet in wallets:
+        ranker.apply(_trade(wallet, 'buy', 1.0, 100, mint=wallet))
+        ranker.apply(_trade(wallet, 'sell', rng.uniform(0.1, 5.0), 100, mint=wallet))
+
+    started = time.perf_counter()
+    top = ranker.top(10, 2.0)
+    elapsed = time.perf_counter() - started
+
+    assert [w['roi'] for w in top] == sorted((w['roi'] for w in top), reverse=True)
+    assert top[0]['roi'] == max(ranker.wallets[w].roi for w in wallets)
+    assert elapsed < 0.01
+
+
+@pytest.mark.asyncio
+async def test_refresh_pages_back_and_retries_failed_fetches():
+    """Backlogs longer than one page are paged; a failed fetch is retried next time"""
+    history = [f'buy{i}' for i in range(7)][::-1]
+    missing = {'buy2'}
+    fetched = []
+
+    def signatures(params):
+        _, options = params
+        known = list(history)
+        if 'before' in options:
+            known = known[known.index(options['before']) + 1:]
+        if 'until' in options:
+            known = known[:known.index(options['until'])] if options['until'] in known else known
+        return [{'signature': s, 'err': None, 'blockTime': T0} for s in known[:options['limit']]]
+
+    def transaction(params):
+        fetched.append(params[0])
+        if params[0] in missing:
+            return None
+        return _transaction('W', -1.0, 0, 10)
+
+    async with RpcStandIn({'getSignaturesForAddress': signatures, 'getTransaction': transaction}) as server:
+        rpc = RpcGateway(server.url)
+        ranker = WalletRanker(history_limit=3, clock=lambda: T0)
+        ranker.track(['W'])
+
+        await ranker.refresh(rpc)
+        pages = [c for c in server.calls if c['method'] == 'getSignaturesForAddress']
+        assert len(pages) == 3
+        assert sorted(fetched) == sorted(history)
+        # Applied up to the transaction that could not be fetched
+        assert ranker.wallets['W'].newest_signature == 'buy1'
+        assert ranker.summary('W')['invested_sol'] == pytest.approx(2.0)
+        assert ranker.stats['fetch_errors'] == 1
+
+        missing.clear()
+        fetched.clear()
+        await ranker.refresh(rpc)
+        assert sorted(fetched) == ['buy2', 'buy3', 'buy4', 'buy5', 'buy6']
+        assert ranker.wallets['W'].newest_signature == 'buy6'
+        assert ranker.summary('W')['invested_sol'] == pytest.approx(7.0)
+        await rpc.close()
@@ -0,0 +1,111 @@
+"""Tests for the wallet subscription engine"""
+
+import asyncio
+import pytest
+
+from core.rpc import RpcGateway
+from tests.stand_ins import RpcStandIn, WebSocketStandIn
+from utils.wallet_tracking import WalletSubscriptionEngine, decode_activity
+
+WALLET = 'TopWallet1111111111111111111111111111111111'
+
+
+def _transaction(params):
+    return {
+        'slot': 42,
+        'blockTime': 1_700_000_000,
+        'transaction': {'message': {'accountKeys': [{'pubkey': WALLET}]}},
+        'meta': {
+            'err': None,
+            'preBalances': [3_000_000_000],
+            'postBalances': [1_500_000_000],
+            'preTokenBalances': [],
+            'postTokenBalances': [{
+                'owner': WALLET,
+                'mint': 'MEMEMINT',
+                'uiTokenAmount': {'uiAmountString': '1000', 'decimals': 6}
+            }]
+        }
+    }
+
+
+def test_decode_buy_activity():
+    """Token balance increase with SOL spent decodes as a buy"""
+    activities = decode_activity(WALLET, 'sig', _transaction([]))
+
+    assert len(activities) == 1
+    assert activities[0]['side'] == 'buy'
+    assert activities[0]['token']['mint'] == 'MEMEMINT'
+    assert activities[0]['amount_sol'] == 1.5
+
+
+@pytest.mark.asyncio
+async def test_notifications_reconnect_and_backfill():
+    """Notifications are decoded; signatures missed while down are backfilled"""
+    handlers = {
+        'getTransaction': _transaction,
+        'getSignaturesForAddress': lambda params: (
+            [{'signature': 'sig2', 'err': None}] if params[1]['until'] == 'sig1' else []
+        )
+    }
+    woken = []
+
+    async with RpcStandIn(handlers) as rpc_server, WebSocketStandIn() as ws_server:
+        rpc = RpcGateway(rpc_server.url)
+        engine = WalletSubscriptionEngine(
+            ws_server.url, rpc, reconnect_delay=0.01, on_activity=woken.append
+        )
+        await engine.set_wallets([WALLET])
+        await engine.start()
+
+        await ws_server.wait_subscribed([WALLET])
+        await ws_server.notify(WALLET, 'sig1')
+        first = await asyncio.wait_for(engine.queue.get(), 2)
+
+        # Drop the socket; sig2 lands while we are disconnected
+        await ws_server.drop()
+        backfilled = await asyncio.wait_for(engine.queue.get(), 2)
+
+        await engine.stop()
+        await rpc.close()
+
+    assert first['signature'] == 'sig1'
+    assert backfilled['signature'] == 'sig2'
+    assert ws_server.connections == 2
+    assert len(ws_server.subscribe_requests) == 2
+    assert engine.stats['backfilled'] == 1
+    assert len(woken) == 2
+
+
+@pytest.mark.asyncio
+async def test_null_transactions_are_retried_and_late_subscriptions_dropped():
+    """A not-yet-visible transaction is fetched again; a removed wallet is unsubscribed"""
+    nulls = [None, None]
+    handlers = {'getTransaction': lambda params: nulls.pop() if nulls else _transaction(params)}
+
+    async with RpcStandIn(handlers) as rpc_server, WebSocketStandIn() as ws_server:
+        rpc = RpcGateway(rpc_server.url)
+        engine = WalletSubscriptionEngine(ws_server.url, rpc, fetch_retry_delay=0.01)
+        await engine.set_wallets([WALLET])
+        await engine.start()
+        await ws_server.wait_subscribed([WALLET])
+
+        await ws_server.notify(WALLET, 'sig1')
+        activity = await asyncio.wait_for(engine.queue.get(), 2)
+
+        # Removed again before its subscribe response is read
+        await engine.set_wallets([WALLET, 'LeftTopK'])
+        await engine.set_wallets([WALLET])
+        await ws_server.wait_subscribed(['LeftTopK'])
+        for _ in range(100):
+            if ws_server.unsubscribe_requests:
+                break
+            await asyncio.sleep(0.01)
+
+        await engine.stop()
+        await rpc.close()
+
+    assert activity['signature'] == 'sig1'
+    assert engine.stats['fetch_retries'] == 2 and engine.stats['missing'] == 0
+    assert len(ws_server.unsubscribe_requests) == 1
+    assert set(engine._subscriptions.values()) == {WALLET}
@@ -1 +1,25 @@
 """Trading strategies and implementations"""
+
+import importlib
+
+# config.yaml trader key -> (module, class)
+TRADER_CLASSES = {
+    'volume_trader': ('traders.volume_trader', 'VolumeTrader'),
+    'lore_trader': ('traders.lore_trader', 'LoreTrader'),
+    'tiktok_trader': ('traders.tiktok_trader', 'TikTokTrader'),
+    'copy_trader': ('traders.copy_trader', 'CopyTrader'),
+}
+
+
+def trader_key(trader) -> str:
+    """config.yaml key of a trader instance"""
+    for key, (_, class_name) in TRADER_CLASSES.items():
+        if type(trader).__name__ == class_name:
+            return key
+    raise KeyError(f"Unknown trader class {type(trader).__name__}")
+
+
+def load_trader(key: str, config):
+    """Instantiate the trader configured under `key`"""
+    module_name, class_name = TRADER_CLASSES[key]
+    return getattr(importlib.import_module(module_name), class_name)(config)
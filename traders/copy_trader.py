@@ -3,19 +3,37 @@ Copy Trader
 Mirrors trades from top-performing wallets
 """
 
+import asyncio
 import logging
-from typing import List, Dict
+from typing import Any, Dict, List
 
 from core.base_trader import BaseTrader
+from core.latency import BudgetQueue, LatencyTracker
 from utils.config import Config
-from utils.wallet_tracking import get_top_wallets, monitor_wallet_activity
-from utils.dex import execute_swap
+from utils.seen import SeenSet
+from utils.wallet_ranking import WalletRanker
+from utils.wallet_tracking import (
+    WalletSubscriptionEngine,
+    get_top_wallets,
+    monitor_wallet_activity
+)
 
 logger = logging.getLogger(__name__)
 
 
 class CopyTrader(BaseTrader):
-    """Trader that copies successful wallet trades"""
+    """Trader that copies successful wallet trades
+
+    Buys seen on the wallet feed skip the cycle: they go straight into a
+    fast-path queue ranked by the source wallet's ROI times the trade
+    size, and `copy_workers` workers submit the best one still younger
+    than `copy_delay_seconds`, counted from its block time. Anything
+    older is dropped, since a copy's edge is gone within seconds; the
+    executor drops one still waiting for the wallet by then. Each sent
+    copy records source, detected, decoded, queued, dequeued and
+    submitted (sendTransaction) timestamps; `latency` keeps their spans
+    for p50/p99.
+    """
     
     def __init__(self, config: Config):
         super().__init__(
@@ -24,76 +42,169 @@ class CopyTrader(BaseTrader):
             config=config
         )
         
-        self.top_wallets_count = config.get_trader_config(
+        self.monitored_wallets = []
+        self.feed = None
+        
+        # 30-day ROI of candidate wallets, kept current between cycles
+        self.ranker = WalletRanker.from_config(config, clock=lambda: self.clock())
+        self._refresh_task = None
+        self._refreshed_at = None
+        
+        # Fast path: detect-to-submit spans of every copy, and its workers
+        self.latency = LatencyTracker()
+        self._workers = []
+        
+    def load_settings(self):
+        """Read strategy thresholds; called again after a config reload"""
+        self.top_wallets_count = self.config.get_trader_config(
             'copy_trader', 'top_wallets_count', 10
         )
-        self.min_roi = config.get_trader_config(
+        self.min_roi = self.config.get_trader_config(
             'copy_trader', 'min_wallet_roi_30d', 2.0
         )
-        self.copy_delay = config.get_trader_config(
+        self.copy_delay = self.config.get_trader_config(
             'copy_trader', 'copy_delay_seconds', 5
         )
-        self.position_ratio = config.get_trader_config(
+        self.position_ratio = self.config.get_trader_config(
             'copy_trader', 'position_size_ratio', 0.5
         )
+        self.ranking_refresh_seconds = self.config.get_trader_config(
+            'copy_trader', 'ranking_refresh_seconds', 300
+        )
+        self.copy_workers = self.config.get_trader_config(
+            'copy_trader', 'copy_workers', 3
+        )
         
-        self.monitored_wallets = []
+        queue_size = self.config.get_trader_config('copy_trader', 'copy_queue_size', 1000)
+        if getattr(self, 'copy_queue', None) is None:
+            self.copy_queue = BudgetQueue(self.copy_delay, queue_size, clock=lambda: self.clock())
+            # Feed and cycle both see an activity; it is copied once
+            self.copied = SeenSet(ttl_seconds=600, max_items=10_000, clock=lambda: self.clock())
+        else:
+            # Keep what is queued across a reload
+            self.copy_queue.budget_seconds = self.copy_delay
+            self.copy_queue.max_items = queue_size
+        
+    async def _start_feed(self):
+        """Open the WebSocket wallet feed; new activity goes to the fast path"""
+        self.feed = WalletSubscriptionEngine(
+            wss_url=self.config.get('SOLANA_WSS_URL', 'wss://api.mainnet-beta.solana.com'),
+            rpc=self.client,
+            reconnect_delay=self.config.get_setting('websocket', 'reconnect_delay', 1.0),
+            max_reconnect_delay=self.config.get_setting('websocket', 'max_reconnect_delay', 30.0),
+            fetch_retries=self.config.get_setting('websocket', 'fetch_retries', 3),
+            fetch_retry_delay=self.config.get_setting('websocket', 'fetch_retry_seconds', 0.2),
+            on_activity=self._on_activity
+        )
+        await self.feed.start()
+        
+    def _start_workers(self):
+        if self.metrics is not None:
+            self.latency.observer = lambda span, seconds: self.metrics.copy_span(self.name, span).observe(seconds)
+        self._workers = [asyncio.create_task(self._copy_worker()) for _ in range(self.copy_workers)]
+        
+    def _on_activity(self, activity: Dict):
+        """Fold feed activity into the ranking and queue it for copying"""
+        self.ranker.apply(activity)
+        self._enqueue(activity)
+        
+    def _enqueue(self, activity: Dict) -> bool:
+        """Queue a buy for the fast path, ranked by wallet score and size"""
+        if activity['side'] != 'buy':
+            return False
+        if activity.get('signature') and not self.copied.add((activity['signature'], activity['token']['mint'])):
+            return False
+        
+        timestamps = activity.setdefault('timestamps', {})
+        timestamps['queued'] = self.clock()
+        priority = self.ranker.score(activity['wallet']) * activity.get('amount_sol', 0)
+        return self.copy_queue.put(activity, priority, _born_at(timestamps))
+        
+    async def _copy_worker(self):
+        while True:
+            activity = await self.copy_queue.get()
+            activity['timestamps']['dequeued'] = self.clock()
+            await self._copy_trade(activity)
+        
+    async def stop(self):
+        """Stop the trader, close the wallet feed and persist the ranking"""
+        if self.feed:
+            await self.feed.stop()
+            self.feed = None
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+        try:
+            self.ranker.save()
+        except OSError as e:
+            self.logger.warning(f"Wallet ranking not saved: {e}")
+        await super().stop()
         
     async def trade_cycle(self):
         """Execute one copy trading cycle"""
         try:
-            # Update list of top wallets periodically
-            if not self.monitored_wallets or self.stats['trades'] % 100 == 0:
-                await self._update_top_wallets()
+            if self.feed is None:
+                await self._start_feed()
+            if not self._workers:
+                self._start_workers()
+            
+            # Fetch new candidate history in the background; re-ranking is cheap every cycle
+            self._schedule_refresh()
+            await self._update_top_wallets()
             
-            # Monitor activity from top wallets
+            # Feed activity was queued as it arrived; this picks up anything else
             activities = await monitor_wallet_activity(
                 self.client,
-                self.monitored_wallets
+                self.monitored_wallets,
+                engine=self.feed
             )
             
-            if activities:
-                self.logger.info(f"👥 Detected {len(activities)} wallet activities")
-                
-                for activity in activities:
-                    await self._copy_trade(activity)
+            queued = sum(self._enqueue(activity) for activity in activities)
+            if queued:
+                self.logger.info(f"👥 Queued {queued} wallet activities")
                     
         except Exception as e:
             self.logger.error(f"Error in trade cycle: {e}", exc_info=True)
     
+    def _schedule_refresh(self):
+        """Start a ranking refresh when the last one is old enough and finished"""
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        now = self.clock()
+        if self._refreshed_at is not None and now - self._refreshed_at < self.ranking_refresh_seconds:
+            return
+        self._refreshed_at = now
+        self._refresh_task = asyncio.create_task(self.ranker.refresh(self.client))
+    
     async def _update_top_wallets(self):
         """Update the list of top-performing wallets to copy"""
         try:
-            self.logger.info("🔍 Updating top wallets list...")
-            
             top_wallets = await get_top_wallets(
                 count=self.top_wallets_count,
-                min_roi=self.min_roi
+                min_roi=self.min_roi,
+                ranker=self.ranker
             )
             
-            self.monitored_wallets = [w['address'] for w in top_wallets]
-            
-            self.logger.info(
-                f"✅ Now monitoring {len(self.monitored_wallets)} wallets"
-            )
+            wallets = [w['address'] for w in top_wallets]
+            if wallets != self.monitored_wallets:
+                self.monitored_wallets = wallets
+                self.logger.info(
+                    f"✅ Now monitoring {len(self.monitored_wallets)} wallets"
+                )
             
         except Exception as e:
             self.logger.error(f"Error updating wallets: {e}", exc_info=True)
     
     async def _copy_trade(self, activity: Dict):
-        """Copy a trade from a monitored wallet"""
+        """Copy a buy from a monitored wallet"""
         try:
-            # Only copy buys
-            if activity['side'] != 'buy':
-                return
-            
             token = activity['token']
             
-            self.logger.info(
-                f"💰 Copying trade: {token['symbol']} from "
-                f"{activity['wallet'][:8]}..."
-            )
-            
             # Calculate our position size (ratio of their position)
             their_size_sol = activity.get('amount_sol', 0)
             our_size_sol = their_size_sol * self.position_ratio
@@ -102,14 +213,24 @@ class CopyTrader(BaseTrader):
             max_size = self.config.calculate_position_size()
             our_size_sol = min(our_size_sol, max_size)
             
-            result = await execute_swap(
-                client=self.client,
-                wallet=self.wallet,
-                token_mint=token['mint'],
-                amount_sol=our_size_sol,
-                side='buy'
+            # Whatever is left of the budget also bounds the wait for the wallet
+            timestamps = activity['timestamps']
+            result = await self.submit_order(
+                token['mint'], our_size_sol, 'buy', symbol=token['symbol'],
+                timestamps=timestamps,
+                budget_seconds=_born_at(timestamps) + self.copy_delay - self.clock()
             )
+            if 'submitted' not in timestamps:
+                # Never sent: rejected by risk, a duplicate or past its budget
+                self.logger.debug(f"Not copying {token['symbol']}: {result['error'] or 'already ordered'}")
+                return
             
+            self.latency.record(timestamps)
+            self.logger.info(
+                f"💰 Copied trade: {token['symbol']} from "
+                f"{activity['wallet'][:8]}... "
+                f"({(timestamps['submitted'] - timestamps['queued']) * 1000:.0f} ms after queueing)"
+            )
             if result['success']:
                 self.logger.info(f"✅ Copy trade executed: {token['symbol']}")
             else:
@@ -118,6 +239,25 @@ class CopyTrader(BaseTrader):
         except Exception as e:
             self.logger.error(f"Error copying trade: {e}", exc_info=True)
     
+    async def get_status(self) -> Dict[str, Any]:
+        status = await super().get_status()
+        status['ranking'] = {
+            'candidates': len(self.ranker),
+            'monitored': len(self.monitored_wallets),
+            **self.ranker.stats
+        }
+        status['fast_path'] = {
+            'waiting': len(self.copy_queue),
+            **self.copy_queue.stats,
+            'latency': self.latency.summary()
+        }
+        return status
+    
     def get_sleep_interval(self) -> int:
-        """Sleep for 30 seconds between checks"""
+        """Sleep for 30 seconds between checks - feed activity never waits for a cycle"""
         return 30
+
+
+def _born_at(timestamps: Dict[str, float]) -> float:
+    """When a copy's opportunity began: its block time when known"""
+    return timestamps.get('source') or timestamps.get('detected') or timestamps['queued']
@@ -3,13 +3,13 @@ Lore Trader
 Analyzes narratives and community sentiment
 """
 
+import asyncio
 import logging
-from typing import List, Dict
+from typing import Any, Dict, List
 
 from core.base_trader import BaseTrader
 from utils.config import Config
-from utils.sentiment import analyze_narrative_strength, get_trending_narratives
-from utils.dex import execute_swap
+from utils.sentiment import NarrativeClusterer, analyze_narratives, get_trending_narratives
 
 logger = logging.getLogger(__name__)
 
@@ -24,15 +24,18 @@ class LoreTrader(BaseTrader):
             config=config
         )
         
-        self.sentiment_threshold = config.get_trader_config(
+    def load_settings(self):
+        """Read strategy thresholds; called again after a config reload"""
+        self.sentiment_threshold = self.config.get_trader_config(
             'lore_trader', 'sentiment_threshold', 0.7
         )
-        self.narrative_strength_min = config.get_trader_config(
+        self.narrative_strength_min = self.config.get_trader_config(
             'lore_trader', 'narrative_strength_min', 0.6
         )
-        self.platforms = config.get_trader_config(
+        self.platforms = list(self.config.get_trader_config(
             'lore_trader', 'monitor_platforms', ['twitter', 'discord']
-        )
+        ))
+        self.clusterer = NarrativeClusterer.from_config(self.config)
         
     async def trade_cycle(self):
         """Execute one lore trading cycle"""
@@ -44,16 +47,23 @@ class LoreTrader(BaseTrader):
                 self.logger.debug("No trending narratives found")
                 return
             
-            # Analyze each narrative
-            for narrative in narratives:
-                strength = await analyze_narrative_strength(narrative)
-                
+            # The same story reposted across platforms is scored and traded once
+            narratives = self.clusterer.merge(narratives)
+            
+            # Score all narratives at once; repeats come from the cache
+            strengths = await analyze_narratives(narratives)
+            
+            trades = []
+            for narrative, strength in zip(narratives, strengths):
                 if strength >= self.narrative_strength_min:
                     self.logger.info(
                         f"📖 Strong narrative detected: {narrative['topic']} "
-                        f"(strength: {strength:.2f})"
+                        f"(strength: {strength:.2f}, {narrative['mentions']} mentions "
+                        f"on {', '.join(narrative['platforms']) or 'unknown platforms'})"
                     )
-                    await self._execute_lore_trade(narrative)
+                    trades.append(self._execute_lore_trade(narrative))
+            
+            await asyncio.gather(*trades)
                     
         except Exception as e:
             self.logger.error(f"Error in trade cycle: {e}", exc_info=True)
@@ -71,12 +81,8 @@ class LoreTrader(BaseTrader):
             
             position_size = self.config.calculate_position_size()
             
-            result = await execute_swap(
-                client=self.client,
-                wallet=self.wallet,
-                token_mint=token['mint'],
-                amount_sol=position_size,
-                side='buy'
+            result = await self.submit_order(
+                token['mint'], position_size, 'buy', symbol=token['symbol']
             )
             
             if result['success']:
@@ -87,6 +93,11 @@ class LoreTrader(BaseTrader):
         except Exception as e:
             self.logger.error(f"Error executing trade: {e}", exc_info=True)
     
+    async def get_status(self) -> Dict[str, Any]:
+        status = await super().get_status()
+        status['clusters'] = dict(self.clusterer.stats)
+        return status
+    
     def get_sleep_interval(self) -> int:
         """Sleep for 2 minutes between checks"""
         return 120
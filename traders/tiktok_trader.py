@@ -4,18 +4,27 @@ Detects viral crypto content early
 """
 
 import logging
-from typing import List, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 from core.base_trader import BaseTrader
+from core.pipeline import Stage, StagePipeline
 from utils.config import Config
+from utils.seen import SeenSet
 from utils.social import scan_tiktok_viral, extract_token_mentions
-from utils.dex import execute_swap
 
 logger = logging.getLogger(__name__)
 
 
 class TikTokTrader(BaseTrader):
-    """Trader that catches viral trends on TikTok"""
+    """Trader that catches viral trends on TikTok
+
+    Each cycle's scan results flow through a staged pipeline:
+    dedup -> extract -> score -> order. A post's token mentions are
+    extracted once and remembered for `seen_ttl_hours`. A (post, mint)
+    pair is marked seen only when it passes scoring, and forgotten again
+    if its order fails, so a post that stays viral for hours is extracted
+    and traded once while filtered mentions get another look next scan.
+    """
     
     def __init__(self, config: Config):
         super().__init__(
@@ -24,16 +33,37 @@ class TikTokTrader(BaseTrader):
             config=config
         )
         
-        self.viral_threshold = config.get_trader_config(
+    def load_settings(self):
+        """Read strategy thresholds; called again after a config reload"""
+        self.viral_threshold = self.config.get_trader_config(
             'tiktok_trader', 'viral_threshold_views', 100000
         )
-        self.early_window_hours = config.get_trader_config(
+        self.early_window_hours = self.config.get_trader_config(
             'tiktok_trader', 'early_detection_window_hours', 6
         )
-        self.min_engagement = config.get_trader_config(
+        self.min_engagement = self.config.get_trader_config(
             'tiktok_trader', 'engagement_rate_min', 0.05
         )
         
+        ttl = self.config.get_trader_config('tiktok_trader', 'seen_ttl_hours', 24) * 3600
+        max_items = self.config.get_trader_config('tiktok_trader', 'seen_max_items', 50_000)
+        if getattr(self, 'seen_posts', None) is None:
+            self.seen_posts = SeenSet(ttl, max_items)
+            self.seen_mentions = SeenSet(ttl, max_items)
+        else:
+            # Keep what was already seen across a reload
+            for seen in (self.seen_posts, self.seen_mentions):
+                seen.ttl_seconds = ttl
+                seen.max_items = max_items
+        
+        strategy = lambda key, default: self.config.get_trader_config('tiktok_trader', key, default)
+        self.pipeline = StagePipeline([
+            Stage('dedup', self._dedup),
+            Stage('extract', self._extract, strategy('extract_workers', 8), fan_out=True),
+            Stage('score', self._score, strategy('score_workers', 2)),
+            Stage('order', self._order, strategy('order_workers', 4)),
+        ], queue_size=strategy('pipeline_queue_size', 100))
+        
     async def trade_cycle(self):
         """Execute one TikTok trading cycle"""
         try:
@@ -48,20 +78,71 @@ class TikTokTrader(BaseTrader):
                 self.logger.debug("No viral content detected")
                 return
             
-            self.logger.info(f"📱 Found {len(viral_content)} viral posts")
-            
-            # Extract token mentions
-            for content in viral_content:
-                tokens = await extract_token_mentions(content)
-                
-                for token in tokens:
-                    await self._execute_tiktok_trade(token, content)
+            results = await self.pipeline.run(viral_content)
+            self.logger.info(
+                f"📱 Found {len(viral_content)} viral posts, {len(results)} new token mention(s) traded"
+            )
                     
         except Exception as e:
             self.logger.error(f"Error in trade cycle: {e}", exc_info=True)
     
-    async def _execute_tiktok_trade(self, token: Dict, content: Dict):
-        """Execute trade on viral TikTok mention"""
+    @staticmethod
+    def _post_id(content: Dict) -> Any:
+        return content.get('id') or content.get('url')
+    
+    async def _dedup(self, content: Dict) -> Optional[Tuple[Dict, Optional[List[Dict]]]]:
+        """Drop posts whose every mention was traded; pass on the known ones of the rest"""
+        post_id = self._post_id(content)
+        if post_id is None or post_id not in self.seen_posts:
+            return content, None
+        
+        tokens = self.seen_posts.get(post_id, [])
+        pending = [t for t in tokens if (post_id, t['mint']) not in self.seen_mentions]
+        if not pending:
+            return None
+        return content, pending
+    
+    async def _extract(self, item: Tuple[Dict, Optional[List[Dict]]]) -> List[Tuple[Dict, Dict]]:
+        """Token mentions of a post, extracted only the first time it is seen"""
+        content, tokens = item
+        if tokens is None:
+            # A failure leaves the post unseen, so the next scan retries it
+            tokens = await extract_token_mentions(content)
+            post_id = self._post_id(content)
+            if post_id is not None:
+                self.seen_posts.add(post_id, tokens)
+        return [(content, token) for token in tokens]
+    
+    async def _score(self, mention: Tuple[Dict, Dict]) -> Optional[Tuple[Dict, Dict]]:
+        """Keep new mentions of posts engaging enough, of tokens not already held"""
+        content, token = mention
+        mention_key = (self._post_id(content), token['mint'])
+        if mention_key in self.seen_mentions or self.positions.holds(self.name, token['mint']):
+            return None
+        
+        engagement = content.get('engagement_rate')
+        if engagement is None and content.get('views'):
+            interactions = sum(content.get(key, 0) for key in ('likes', 'comments', 'shares'))
+            engagement = interactions / content['views']
+        if engagement is not None and engagement < self.min_engagement:
+            return None
+        
+        # Claimed only once it passes, so filtered mentions get another look
+        if not self.seen_mentions.add(mention_key):
+            return None
+        return mention
+    
+    async def _order(self, mention: Tuple[Dict, Dict]) -> Optional[Dict]:
+        """Buy a mentioned token; only successful orders are emitted"""
+        content, token = mention
+        if await self._execute_tiktok_trade(token, content):
+            return token
+        # Let a later scan try this mention again
+        self.seen_mentions.discard((self._post_id(content), token['mint']))
+        return None
+    
+    async def _execute_tiktok_trade(self, token: Dict, content: Dict) -> bool:
+        """Execute trade on viral TikTok mention; True if the buy succeeded"""
         try:
             self.logger.info(
                 f"💰 Executing TikTok trade for {token['symbol']} "
@@ -70,21 +151,27 @@ class TikTokTrader(BaseTrader):
             
             position_size = self.config.calculate_position_size()
             
-            result = await execute_swap(
-                client=self.client,
-                wallet=self.wallet,
-                token_mint=token['mint'],
-                amount_sol=position_size,
-                side='buy'
+            result = await self.submit_order(
+                token['mint'], position_size, 'buy', symbol=token['symbol']
             )
             
             if result['success']:
                 self.logger.info(f"✅ TikTok trade executed: {token['symbol']}")
-            else:
-                self.logger.warning(f"❌ Trade failed: {result['error']}")
+                return True
+            self.logger.warning(f"❌ Trade failed: {result['error']}")
                 
         except Exception as e:
             self.logger.error(f"Error executing trade: {e}", exc_info=True)
+        return False
+    
+    async def get_status(self) -> Dict[str, Any]:
+        status = await super().get_status()
+        status['pipeline'] = {
+            'stages': self.pipeline.stats,
+            'seen_posts': len(self.seen_posts),
+            'seen_mentions': len(self.seen_mentions)
+        }
+        return status
     
     def get_sleep_interval(self) -> int:
         """Sleep for 3 minutes between checks"""
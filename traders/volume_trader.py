@@ -3,13 +3,19 @@ Volume Trader
 Tracks volume spikes and momentum trading
 """
 
+import asyncio
 import logging
 from typing import List, Dict
 from datetime import datetime, timedelta
 
+import numpy as np
+
 from core.base_trader import BaseTrader
+from utils import mentions
 from utils.config import Config
-from utils.dex import get_volume_data, execute_swap
+from utils.dex import get_volume_data
+from utils.volume import VolumeTable
+from utils.volume_history import VolumeHistoryStore
 
 logger = logging.getLogger(__name__)
 
@@ -24,50 +30,122 @@ class VolumeTrader(BaseTrader):
             config=config
         )
         
-        self.volume_threshold = config.get_trader_config(
+        # Columnar per-mint volume state, updated in place each cycle
+        self.volume_table = VolumeTable()
+        
+        # Persistent volume baseline, opened on the first cycle
+        self.history = None
+        self.history_path = config.get_trader_config(
+            'volume_trader', 'history_path', 'data/volume_history'
+        )
+        self.history_buckets = config.get_trader_config(
+            'volume_trader', 'history_buckets', 96
+        )
+        self.history_capacity = config.get_trader_config(
+            'volume_trader', 'history_capacity', 20000
+        )
+        
+    def load_settings(self):
+        """Read strategy thresholds; called again after a config reload"""
+        self.volume_threshold = self.config.get_trader_config(
             'volume_trader', 'volume_threshold_multiplier', 3.0
         )
-        self.timeframe = config.get_trader_config(
+        self.timeframe = self.config.get_trader_config(
             'volume_trader', 'timeframe_minutes', 15
         )
-        self.min_volume = config.get_trader_config(
+        self.min_volume = self.config.get_trader_config(
             'volume_trader', 'min_volume_usd', 50000
         )
+        self.exit_on_volume_drop = self.config.get_trader_config(
+            'volume_trader', 'exit_on_volume_drop', True
+        )
         
     async def trade_cycle(self):
         """Execute one volume trading cycle"""
         try:
+            if self.history is None:
+                self.history = VolumeHistoryStore(
+                    self.history_path,
+                    capacity=self.history_capacity,
+                    buckets=self.history_buckets,
+                    bucket_seconds=self.timeframe * 60
+                )
+            
             # Fetch recent volume data
             volume_data = await get_volume_data(
                 self.client, 
                 timeframe_minutes=self.timeframe
             )
             
+            # Newly listed tokens become recognizable in social posts, in
+            # every process once saved to the shared token list
+            if mentions.mention_index.add_tokens(volume_data):
+                mentions.mention_index.save()
+            
             # Identify volume spikes
             spikes = self._identify_spikes(volume_data)
             
+            if self.exit_on_volume_drop:
+                self._flag_volume_drops()
+            
             if spikes:
                 self.logger.info(f"📊 Found {len(spikes)} volume spikes")
                 
-                for token in spikes:
-                    await self._execute_volume_trade(token)
+                # Submit all spikes at once; the executor bounds parallelism
+                await asyncio.gather(
+                    *[self._execute_volume_trade(token) for token in spikes]
+                )
             
         except Exception as e:
             self.logger.error(f"Error in trade cycle: {e}", exc_info=True)
             
     def _identify_spikes(self, volume_data: List[Dict]) -> List[Dict]:
         """Identify tokens with volume spikes"""
-        spikes = []
+        self.volume_table.update(volume_data)
+        if self.history is not None and volume_data:
+            self._apply_history(volume_data)
+        rows = self.volume_table.spikes(self.volume_threshold, self.min_volume)
+        return self.volume_table.records(rows)
+    
+    def _flag_volume_drops(self):
+        """Exit held mints whose volume fell back below its average"""
+        table = self.volume_table
+        held = [
+            p['mint'] for p in self.positions.positions(self.name)
+            if p['mint'] in table.index
+        ]
+        if not held:
+            return
         
-        for token_data in volume_data:
-            current_volume = token_data.get('current_volume', 0)
-            avg_volume = token_data.get('avg_volume', 0)
-            
-            if current_volume > avg_volume * self.volume_threshold:
-                if current_volume >= self.min_volume:
-                    spikes.append(token_data)
-                    
-        return spikes
+        rows = table.rows_for(held)
+        dropped = (table.updated[rows] == table.cycle) & (table.current[rows] < table.average[rows])
+        for i in np.flatnonzero(dropped):
+            if self.positions.request_exit(self.name, held[i], 'volume_drop'):
+                self.logger.info(f"📉 Volume faded for {table.symbols[rows[i]]}, exiting")
+    
+    def _apply_history(self, volume_data: List[Dict]):
+        """Record this cycle's volumes and fill missing averages from history"""
+        mints = [d['mint'] for d in volume_data]
+        now = self.clock()
+        
+        # Mints unseen for a whole window have no baseline left to keep
+        evicted = self.history.evict_idle(self.history_buckets * self.timeframe * 60, now)
+        if evicted:
+            self.logger.debug(f"Evicted {evicted} idle mints from volume history")
+        
+        rows = self.volume_table.rows_for(mints)
+        slots = self.history.slots_for(mints, now)
+        self.history.record_many(slots, self.volume_table.current[rows], now)
+        
+        baseline = self.history.means(slots, now)
+        missing = self.volume_table.average[rows] <= 0
+        self.volume_table.average[rows[missing]] = baseline[missing]
+    
+    async def stop(self):
+        """Stop the trader and flush volume history to disk"""
+        if self.history is not None:
+            self.history.close()
+        await super().stop()
     
     async def _execute_volume_trade(self, token: Dict):
         """Execute trade on volume spike"""
@@ -78,17 +156,12 @@ class VolumeTrader(BaseTrader):
             position_size = self.config.calculate_position_size()
             
             # Execute swap
-            result = await execute_swap(
-                client=self.client,
-                wallet=self.wallet,
-                token_mint=token['mint'],
-                amount_sol=position_size,
-                side='buy'
+            result = await self.submit_order(
+                token['mint'], position_size, 'buy', symbol=token['symbol']
             )
             
             if result['success']:
                 self.logger.info(f"✅ Volume trade executed: {token['symbol']}")
-                # TODO: Add position tracking and exit logic
             else:
                 self.logger.warning(f"❌ Trade failed: {result['error']}")
                 
@@ -0,0 +1,125 @@
+"""Batched wallet balance and token account snapshots"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Sequence
+
+from core.rpc import RpcError, RpcGateway
+
+logger = logging.getLogger(__name__)
+
+LAMPORTS_PER_SOL = 1_000_000_000
+TOKEN_PROGRAM_ID = 'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA'
+
+# getMultipleAccounts accepts at most 100 keys per call
+MAX_ACCOUNTS_PER_CALL = 100
+
+
+def _chunks(items: Sequence, size: int) -> List[Sequence]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def snapshot_wallets(
+    rpc: RpcGateway,
+    wallets: Sequence[str],
+    include_tokens: bool = True,
+    chunk_size: int = MAX_ACCOUNTS_PER_CALL,
+    batch_size: int = 50,
+    max_concurrency: int = 4
+) -> Dict[str, Dict]:
+    """
+    Fetch SOL balances and SPL token accounts for many wallets at once
+
+    SOL balances come from `getMultipleAccounts` in chunks of `chunk_size`
+    and token accounts from JSON-RPC batches of `getTokenAccountsByOwner`,
+    so 200 wallets cost a handful of round trips instead of 200+.
+
+    Returns a dict keyed by wallet address:
+        {'address', 'lamports', 'sol', 'tokens': [...], 'error'}
+    """
+    wallets = list(dict.fromkeys(wallets))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    snapshot = {
+        address: {
+            'address': address,
+            'lamports': 0,
+            'sol': 0.0,
+            'tokens': [],
+            'error': None
+        }
+        for address in wallets
+    }
+
+    async def fetch_balances(chunk: Sequence[str]):
+        async with semaphore:
+            try:
+                result = await rpc.call('getMultipleAccounts', [
+                    list(chunk),
+                    {'encoding': 'base64', 'dataSlice': {'offset': 0, 'length': 0}}
+                ])
+            except Exception as e:
+                logger.warning(f"Balance chunk failed: {e}")
+                for address in chunk:
+                    snapshot[address]['error'] = str(e)
+                return
+
+        for address, account in zip(chunk, result['value']):
+            lamports = account['lamports'] if account else 0
+            snapshot[address]['lamports'] = lamports
+            snapshot[address]['sol'] = lamports / LAMPORTS_PER_SOL
+
+    async def fetch_tokens(chunk: Sequence[str]):
+        calls = [
+            ('getTokenAccountsByOwner', [
+                address,
+                {'programId': TOKEN_PROGRAM_ID},
+                {'encoding': 'jsonParsed'}
+            ])
+            for address in chunk
+        ]
+        async with semaphore:
+            try:
+                results = await rpc.batch(calls)
+            except Exception as e:
+                logger.warning(f"Token account batch failed: {e}")
+                for address in chunk:
+                    snapshot[address]['error'] = str(e)
+                return
+
+        for address, result in zip(chunk, results):
+            if isinstance(result, RpcError):
+                snapshot[address]['error'] = str(result)
+                continue
+            snapshot[address]['tokens'] = _parse_token_accounts(result['value'])
+
+    jobs = [fetch_balances(chunk) for chunk in _chunks(wallets, chunk_size)]
+    if include_tokens:
+        jobs += [fetch_tokens(chunk) for chunk in _chunks(wallets, batch_size)]
+
+    await asyncio.gather(*jobs)
+    return snapshot
+
+
+def _parse_token_accounts(accounts: List[Dict]) -> List[Dict]:
+    """Flatten jsonParsed token accounts into {'mint', 'amount', ...} dicts"""
+    tokens = []
+    for entry in accounts:
+        info = _parsed_info(entry)
+        if info is None:
+            continue
+        amount = info.get('tokenAmount', {})
+        tokens.append({
+            'account': entry.get('pubkey'),
+            'mint': info.get('mint'),
+            'amount': float(amount.get('uiAmountString') or amount.get('uiAmount') or 0),
+            'decimals': amount.get('decimals', 0)
+        })
+    return tokens
+
+
+def _parsed_info(entry: Dict) -> Optional[Dict]:
+    try:
+        return entry['account']['data']['parsed']['info']
+    except (KeyError, TypeError):
+        return None
@@ -1,39 +1,209 @@
 """Configuration management"""
 
+import asyncio
+import logging
 import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
 import yaml
-from typing import Any, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class ConfigError(ValueError):
+    """config.yaml or the environment failed validation"""
+
+
+@dataclass(frozen=True)
+class TraderSettings:
+    """Validated settings of one trader block"""
+    name: str
+    enabled: bool
+    wallet: str
+    strategy: Mapping[str, Any]
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable view of config.yaml plus the environment at load time"""
+    version: int
+    raw: Mapping[str, Any]
+    traders: Mapping[str, TraderSettings]
+    env: Mapping[str, str]
+    max_position_size_sol: float
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+# (section, key) -> (type, lower bound, upper bound)
+NUMERIC_SETTINGS = {
+    ('risk_management', 'global_stop_loss'): (float, 0.0, 1.0),
+    ('risk_management', 'global_take_profit'): (float, 0.0, None),
+    ('risk_management', 'trailing_stop'): (float, 0.0, 1.0),
+    ('risk_management', 'max_concurrent_positions'): (int, 1, None),
+    ('risk_management', 'max_position_size_pct'): (float, 0.0, 1.0),
+    ('risk_management', 'daily_loss_limit_sol'): (float, 0.0, None),
+}
+
+
+def compile_snapshot(raw: Any, env: Mapping[str, str], version: int = 1) -> ConfigSnapshot:
+    """Validate a parsed config.yaml and environment into a snapshot"""
+    if not isinstance(raw, dict) or not isinstance(raw.get('traders'), dict):
+        raise ConfigError("config.yaml needs a 'traders' mapping")
+
+    traders = {}
+    for name, block in raw['traders'].items():
+        if not isinstance(block, dict) or not isinstance(block.get('wallet'), str):
+            raise ConfigError(f"traders.{name} needs a 'wallet' address")
+        strategy = block.get('strategy') or {}
+        if not isinstance(strategy, dict):
+            raise ConfigError(f"traders.{name}.strategy must be a mapping")
+        traders[name] = TraderSettings(
+            name=name,
+            enabled=bool(block.get('enabled', False)),
+            wallet=block['wallet'],
+            strategy=freeze(strategy)
+        )
+
+    for (section, key), (kind, low, high) in NUMERIC_SETTINGS.items():
+        value = (raw.get(section) or {}).get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or (kind is int and not isinstance(value, int)):
+            raise ConfigError(f"{section}.{key} must be a {kind.__name__}, got {value!r}")
+        if value < low or (high is not None and value > high):
+            raise ConfigError(f"{section}.{key}={value} is out of range")
+
+    try:
+        max_position_size_sol = float(env.get('MAX_POSITION_SIZE_SOL', '10'))
+    except ValueError:
+        raise ConfigError(f"MAX_POSITION_SIZE_SOL is not a number: {env.get('MAX_POSITION_SIZE_SOL')!r}")
+
+    return ConfigSnapshot(
+        version=version,
+        raw=freeze(raw),
+        traders=MappingProxyType(traders),
+        env=MappingProxyType(dict(env)),
+        max_position_size_sol=max_position_size_sol
+    )
+
 
 class Config:
-    """Configuration manager for Elena"""
-    
+    """Configuration manager for Elena
+
+    config.yaml and the environment are compiled once into an immutable
+    `ConfigSnapshot`; every getter reads from the current snapshot.
+    `reload()` (or the `watch()` task) swaps in a new snapshot in a single
+    assignment when the file changes, leaving the old one in place if the
+    new file does not validate. Consumers compare `version` to notice
+    a reload.
+    """
+
     def __init__(self, config_path: str = "config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
-        
-        self.env = os.getenv
-        
+        self.config_path = config_path
+        self._overrides: Dict[str, Any] = {}
+        self._callbacks: List[Callable[['Config'], None]] = []
+        self._mtime = self._stat()
+        self.snapshot = self._compile(version=1)
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """Read-only parsed config.yaml"""
+        return self.snapshot.raw
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
+
+    @property
+    def overrides(self) -> Mapping[str, Any]:
+        """`trader.key` values pinned through `override()`"""
+        return MappingProxyType(self._overrides)
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get environment variable"""
-        return self.env(key, default)
-    
+        return self.snapshot.env.get(key, default)
+
     def get_trader_wallet(self, trader_name: str) -> str:
         """Get wallet address for a trader"""
-        return self.config['traders'][trader_name]['wallet']
-    
+        return self.snapshot.traders[trader_name].wallet
+
     def get_trader_config(self, trader_name: str, key: str, default: Any = None) -> Any:
         """Get configuration value for a trader"""
-        return self.config['traders'][trader_name]['strategy'].get(key, default)
-    
+        return self.snapshot.traders[trader_name].strategy.get(key, default)
+
+    def get_setting(self, section: str, key: str, default: Any = None) -> Any:
+        """Get a value from a top-level section of config.yaml"""
+        return (self.snapshot.raw.get(section) or {}).get(key, default)
+
     def is_enabled(self, trader_name: str) -> bool:
         """Check if a trader is enabled"""
-        return self.config['traders'][trader_name].get('enabled', False)
-    
+        return self.snapshot.traders[trader_name].enabled
+
     def calculate_position_size(self) -> float:
         """Calculate position size in SOL based on risk management"""
-        max_position = float(self.env('MAX_POSITION_SIZE_SOL', '10'))
-        return max_position * 0.5  # Start with 50% of max
+        return self.snapshot.max_position_size_sol * 0.5  # Start with 50% of max
+
+    def override(self, overrides: Dict[str, Any]):
+        """Pin `trader.key` strategy values over config.yaml, now and on reload"""
+        self._overrides.update(overrides)
+        self.snapshot = self._compile(self.version + 1)
+
+    def on_reload(self, callback: Callable[['Config'], None]):
+        """Call `callback(config)` after each successful reload"""
+        self._callbacks.append(callback)
+
+    def reload(self) -> bool:
+        """Recompile config.yaml and the environment; keep the old snapshot on error"""
+        try:
+            snapshot = self._compile(self.version + 1)
+        except (ConfigError, OSError, yaml.YAMLError) as e:
+            logger.error(f"❌ Config reload failed, keeping version {self.version}: {e}")
+            return False
+
+        self.snapshot = snapshot
+        logger.info(f"🔄 Config reloaded (version {snapshot.version})")
+        for callback in self._callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error(f"Config reload callback failed: {e}", exc_info=True)
+        return True
+
+    async def watch(self, interval_seconds: float = 2.0):
+        """Reload whenever config.yaml's modification time changes"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            mtime = self._stat()
+            if mtime != self._mtime:
+                self._mtime = mtime
+                self.reload()
+
+    def _stat(self) -> Optional[float]:
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _compile(self, version: int) -> ConfigSnapshot:
+        with open(self.config_path, 'r') as f:
+            raw = yaml.safe_load(f)
+        for dotted, value in self._overrides.items():
+            trader, key = dotted.split('.', 1)
+            block = ((raw or {}).get('traders') or {}).get(trader)
+            if not isinstance(block, dict):
+                raise ConfigError(f"Override {dotted} names an unknown trader")
+            block.setdefault('strategy', {})[key] = value
+        return compile_snapshot(raw, os.environ, version)
@@ -1,40 +1,344 @@
 """DEX interaction utilities"""
 
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
 
 logger = logging.getLogger(__name__)
 
+SOL_MINT = 'So11111111111111111111111111111111111111112'
+LAMPORTS_PER_SOL = 1_000_000_000
+JUPITER_QUOTE_URL = 'https://quote-api.jup.ag/v6/quote'
+
+# Transactions are sent without preflight and rebroadcast until confirmed
+SEND_OPTIONS = {'encoding': 'base64', 'skipPreflight': True, 'maxRetries': 0}
+
+
+class QuoteCache:
+    """Short-lived, single-flight cache of swap route quotes
+
+    Quotes are keyed by (input mint, output mint, amount bucket, slippage,
+    swap mode). Amounts are bucketed on a logarithmic grid, so near
+    identical sizes share one quote that is rescaled to the requested
+    amount. Entries expire after `ttl_seconds` or once the chain has moved
+    more than `max_slot_age` slots past the quote. Concurrent requests for
+    the same key share one HTTP call.
+    """
+
+    def __init__(
+        self,
+        url: str = JUPITER_QUOTE_URL,
+        ttl_seconds: float = 2.0,
+        max_slot_age: int = 1,
+        amount_bucket_pct: float = 0.01,
+        max_entries: int = 1024
+    ):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.max_slot_age = max_slot_age
+        self.amount_bucket_pct = amount_bucket_pct
+        self.max_entries = max_entries
+        self.current_slot = 0
+
+        self._entries: Dict[Tuple, Tuple[float, int, Dict]] = {}
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'invalidated': 0
+        }
+
+    @classmethod
+    def from_config(cls, config) -> 'QuoteCache':
+        """Build a quote cache from the `dex` section of config.yaml"""
+        return cls(
+            url=config.get_setting('dex', 'quote_url', JUPITER_QUOTE_URL),
+            ttl_seconds=config.get_setting('dex', 'quote_ttl_seconds', 2.0),
+            max_slot_age=config.get_setting('dex', 'quote_max_slot_age', 1),
+            amount_bucket_pct=config.get_setting('dex', 'quote_amount_bucket_pct', 0.01)
+        )
+
+    def bucket(self, amount: int) -> int:
+        """Index of `amount` on the logarithmic amount grid"""
+        if amount <= 0:
+            return 0
+        return round(math.log(amount) / math.log1p(self.amount_bucket_pct))
+
+    def bucket_amount(self, bucket: int) -> int:
+        """Representative amount quoted for a bucket"""
+        return max(1, round((1 + self.amount_bucket_pct) ** bucket))
+
+    def on_slot(self, slot: int):
+        """Advance the known slot; older quotes stop being served"""
+        if slot > self.current_slot:
+            self.current_slot = slot
+
+    async def get_quote(
+        self,
+        input_mint: str,
+        output_mint: str,
+        amount: int,
+        slippage_bps: int = 100,
+        swap_mode: str = 'ExactIn'
+    ) -> Dict:
+        """Return a route quote for `amount` base units of the input (or output) mint"""
+        bucket = self.bucket(amount)
+        key = (input_mint, output_mint, bucket, slippage_bps, swap_mode)
+
+        entry = self._entries.get(key)
+        if entry is not None and self._fresh(entry):
+            self.stats['hits'] += 1
+            return self._rescale(entry[2], amount, swap_mode)
+        if entry is not None:
+            self.stats['invalidated'] += 1
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+        else:
+            self.stats['misses'] += 1
+            task = asyncio.ensure_future(self._fetch(key, self.bucket_amount(bucket)))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None))
+
+        quote = await asyncio.shield(task)
+        return self._rescale(quote, amount, swap_mode)
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _fresh(self, entry: Tuple[float, int, Dict]) -> bool:
+        fetched_at, slot, _ = entry
+        if time.monotonic() - fetched_at > self.ttl_seconds:
+            return False
+        return not (slot and self.current_slot - slot > self.max_slot_age)
+
+    async def _fetch(self, key: Tuple, amount: int) -> Dict:
+        input_mint, output_mint, _, slippage_bps, swap_mode = key
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+
+        params = {
+            'inputMint': input_mint,
+            'outputMint': output_mint,
+            'amount': str(amount),
+            'slippageBps': str(slippage_bps),
+            'swapMode': swap_mode
+        }
+        async with self._session.get(self.url, params=params) as response:
+            response.raise_for_status()
+            quote = await response.json(content_type=None)
+
+        slot = int(quote.get('contextSlot') or 0)
+        self.on_slot(slot)
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic(), slot, quote)
+        return quote
+
+    @staticmethod
+    def _rescale(quote: Dict, amount: int, swap_mode: str) -> Dict:
+        """Scale a bucket quote to the exact requested amount"""
+        fixed, derived = ('inAmount', 'outAmount') if swap_mode == 'ExactIn' else ('outAmount', 'inAmount')
+        quoted = int(quote[fixed])
+        if quoted == amount:
+            return quote
+
+        ratio = amount / quoted
+        scaled = dict(quote)
+        scaled[fixed] = str(amount)
+        scaled[derived] = str(int(int(quote[derived]) * ratio))
+        if 'otherAmountThreshold' in quote:
+            scaled['otherAmountThreshold'] = str(int(int(quote['otherAmountThreshold']) * ratio))
+        return scaled
+
+
+# Process-wide quote cache, replaced from config by the TradingManager
+quote_cache = QuoteCache()
+
+# Transaction pipeline (utils.transactions), set up by the TradingManager
+tx_pipeline = None
+
 
 async def get_volume_data(client, timeframe_minutes: int = 15) -> List[Dict]:
     """
     Fetch volume data for tokens
-    
+
     TODO: Implement with Jupiter/Raydium API
     """
     logger.debug(f"Fetching volume data for {timeframe_minutes}min timeframe")
-    
+
     # Placeholder - integrate with actual DEX APIs
     return []
 
 
+async def get_swap_quote(
+    token_mint: str,
+    amount_sol: float,
+    side: str,
+    slippage_bps: int = 100,
+    token_amount: Optional[float] = None
+) -> Dict:
+    """
+    Quote a SOL-denominated swap through the shared quote cache
+
+    Buys spend exactly `amount_sol`; sells receive exactly `amount_sol`,
+    or, given `token_amount` base units, sell exactly those for whatever
+    SOL the route pays.
+    """
+    if side == 'sell' and token_amount is not None:
+        return await quote_cache.get_quote(token_mint, SOL_MINT, int(token_amount), slippage_bps, 'ExactIn')
+    lamports = int(amount_sol * LAMPORTS_PER_SOL)
+    if side == 'buy':
+        return await quote_cache.get_quote(SOL_MINT, token_mint, lamports, slippage_bps, 'ExactIn')
+    return await quote_cache.get_quote(token_mint, SOL_MINT, lamports, slippage_bps, 'ExactOut')
+
+
+async def get_token_prices(mints: List[str], reference_sol: float = 1.0) -> Dict[str, float]:
+    """
+    Prices in SOL per token base unit, from cached buy quotes
+
+    Uses the same units as the quote `outAmount` of a buy, so positions can
+    be marked against their entry price. Mints without a route are left out.
+    """
+    lamports = int(reference_sol * LAMPORTS_PER_SOL)
+    quotes = await asyncio.gather(
+        *[quote_cache.get_quote(SOL_MINT, mint, lamports) for mint in mints],
+        return_exceptions=True
+    )
+
+    prices = {}
+    for mint, quote in zip(mints, quotes):
+        if isinstance(quote, Exception) or not int(quote.get('outAmount') or 0):
+            continue
+        prices[mint] = reference_sol / int(quote['outAmount'])
+    return prices
+
+
 async def execute_swap(
     client,
     wallet: str,
     token_mint: str,
     amount_sol: float,
-    side: str
+    side: str,
+    token_amount: Optional[float] = None
 ) -> Dict:
     """
     Execute a token swap
-    
-    TODO: Implement with Jupiter Aggregator
+
+    Quotes through the shared cache, turns the quote into a signed
+    transaction from a pre-built route template and submits it. Success is
+    only reported once the transaction is confirmed; one that fails or
+    whose blockhash expires first is reported as failed. A sell given
+    `token_amount` sells exactly that many token base units.
     """
     logger.info(f"Executing {side} swap: {amount_sol} SOL for {token_mint}")
-    
-    # Placeholder - integrate with Jupiter/Raydium
+
+    try:
+        quote = await get_swap_quote(token_mint, amount_sol, side, token_amount=token_amount)
+    except Exception as e:
+        return {'success': False, 'error': f"Quote failed: {e}", 'tx': None}
+
+    if tx_pipeline is None:
+        return {
+            'success': False,
+            'error': 'Transaction pipeline not configured',
+            'tx': None,
+            'quote': quote
+        }
+
+    try:
+        signed_tx = await tx_pipeline.prepare_swap(wallet, quote)
+        last_valid_block_height = tx_pipeline.refresher.last_valid_block_height
+        sent_at = time.monotonic()
+        # Wall clock, comparable with the block and detection times of a copy
+        sent_at_wall = time.time()
+        signature = await client.call('sendTransaction', [signed_tx, SEND_OPTIONS])
+    except Exception as e:
+        return {'success': False, 'error': str(e), 'tx': None, 'quote': quote}
+
+    error = await confirm_transaction(
+        client, signature, signed_tx, last_valid_block_height,
+        tx_pipeline.confirm_poll_seconds, tx_pipeline.max_confirm_seconds
+    )
+    confirm_seconds = time.monotonic() - sent_at
+    if error is not None:
+        return {
+            'success': False,
+            'error': error,
+            'tx': signature,
+            'quote': quote,
+            'sent_at': sent_at_wall,
+            'confirm_seconds': confirm_seconds
+        }
+
     return {
-        'success': False,
-        'error': 'Not implemented yet',
-        'tx': None
+        'success': True,
+        'error': None,
+        'tx': signature,
+        'quote': quote,
+        'sent_at': sent_at_wall,
+        'confirm_seconds': confirm_seconds,
+        'timings': {
+            stage: tx_pipeline.timings[stage]['last_us']
+            for stage in tx_pipeline.STAGES
+        }
     }
+
+
+async def confirm_transaction(
+    client,
+    signature: str,
+    signed_tx: str,
+    last_valid_block_height: int,
+    poll_seconds: float = 0.4,
+    max_seconds: float = 90.0
+) -> Optional[str]:
+    """
+    Wait until a sent transaction is confirmed or its blockhash expires
+
+    Returns None once confirmed, else the reason it failed. The node is
+    asked not to retry, so the same signed transaction is rebroadcast on
+    every poll until one of the two happens. If neither can be told
+    within `max_seconds` (e.g. the node keeps failing), the transaction
+    is reported unconfirmed.
+    """
+    deadline = time.monotonic() + max_seconds
+    while True:
+        try:
+            statuses, height = await client.batch([
+                ('getSignatureStatuses', [[signature]]),
+                ('getBlockHeight', [{'commitment': 'confirmed'}])
+            ])
+        except Exception as e:
+            logger.debug(f"Confirmation poll for {signature[:8]}... failed: {e}")
+            statuses = height = None
+
+        status = None
+        if statuses is not None and not isinstance(statuses, Exception):
+            status = statuses['value'][0]
+        if status is not None:
+            if status.get('err') is not None:
+                return f"Transaction failed: {status['err']}"
+            if status.get('confirmationStatus') in ('confirmed', 'finalized'):
+                return None
+        if isinstance(height, int) and height > last_valid_block_height:
+            return 'Transaction expired before confirmation'
+        if time.monotonic() >= deadline:
+            return f"Transaction unconfirmed after {max_seconds}s"
+
+        await asyncio.sleep(poll_seconds)
+        try:
+            await client.call('sendTransaction', [signed_tx, SEND_OPTIONS])
+        except Exception as e:
+            logger.debug(f"Rebroadcast of {signature[:8]}... failed: {e}")
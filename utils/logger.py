@@ -1,29 +1,172 @@
-"""Logging configuration"""
+"""Logging configuration
 
+Records are handed to a queue on the calling thread and formatted and
+written by a background listener thread, so logging from a trade cycle
+never waits on terminal or pipe I/O.
+"""
+
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
-from datetime import datetime
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# Set around each trade cycle and swap; tasks started inside inherit it
+log_context: contextvars.ContextVar = contextvars.ContextVar('log_context', default={})
+
+CONTEXT_FIELDS = ('trader', 'cycle_id', 'mint')
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def log_fields(**fields):
+    """Tag every record logged inside the block with `fields`"""
+    token = log_context.set({**log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current cycle context onto the record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Caps repetitive records per call site
+
+    At most `limit` records below `exempt_level` pass per `window_seconds`
+    from each logging call site; the count of dropped ones is attached to
+    the first record let through in the next window.
+    """
+
+    def __init__(self, limit: int = 20, window_seconds: float = 10.0, exempt_level: int = logging.ERROR):
+        super().__init__()
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.exempt_level = exempt_level
+        self._sites: Dict[Tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+
+        now = time.monotonic()
+        site = self._sites.get((record.pathname, record.lineno))
+        if site is None or now - site[0] >= self.window_seconds:
+            suppressed = site[2] if site else 0
+            self._sites[(record.pathname, record.lineno)] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+
+        if site[1] < self.limit:
+            site[1] += 1
+            return True
+        site[2] += 1
+        return False
+
+
+class FastQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key in CONTEXT_FIELDS + ('suppressed',):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    rate_limit: int = 20,
+    rate_window_seconds: float = 10.0,
+    stream=None
+) -> logging.Logger:
+    """Route all logging through a queue to a background writer; idempotent
+
+    `level` and `fmt` ('json' or 'text') default to the LOG_LEVEL and
+    LOG_FORMAT environment variables.
+    """
+    global _listener
+    root = logging.getLogger()
+    if _listener is not None:
+        return root
+
+    level = level or os.getenv('LOG_LEVEL', 'INFO')
+    fmt = fmt or os.getenv('LOG_FORMAT', 'json')
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(
+            '%(asctime)s | %(name)s | %(levelname)s | %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+
+    handler = FastQueueHandler(queue.SimpleQueue())
+    handler.addFilter(RateLimitFilter(rate_limit, rate_window_seconds))
+    handler.addFilter(ContextFilter())
+
+    root.setLevel(level)
+    root.addHandler(handler)
+
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return root
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in list(logging.getLogger().handlers):
+        if isinstance(handler, FastQueueHandler):
+            logging.getLogger().removeHandler(handler)
+    _listener = None
 
 
 def setup_logger(name: str) -> logging.Logger:
     """Setup and configure logger"""
-    
-    # Create logger
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s | %(name)s | %(levelname)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
-    
-    # Add handler
-    logger.addHandler(console_handler)
-    
-    return logger
+    setup_logging()
+    return logging.getLogger(name)
@@ -0,0 +1,309 @@
+"""Token mention extraction with an Aho-Corasick automaton"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import base58
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+CASHTAG, TICKER, NAME = 'cashtag', 'ticker', 'name'
+
+# Solana addresses: 32 bytes in base58
+ADDRESS_PATTERN = re.compile(r'(?<![1-9A-HJ-NP-Za-km-z])[1-9A-HJ-NP-Za-km-z]{32,44}(?![1-9A-HJ-NP-Za-km-z])')
+
+# Bare tickers only count when written in capitals and at least this long
+MIN_BARE_TICKER = 3
+
+# Names shorter than this are common words, and only count when not all lowercase
+MIN_NAME_LENGTH = 4
+
+
+class Automaton:
+    """Aho-Corasick automaton over a fixed set of lowercase patterns
+
+    Matching is one dict lookup per input character (plus failure hops),
+    independent of how many patterns are indexed.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[str, ...]] = [()]
+        self.size = 0
+
+        for pattern in patterns:
+            state = 0
+            for char in pattern:
+                nxt = self.goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][char] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] = self.out[state] + (pattern,)
+            self.size += 1
+
+        # Breadth-first failure links; outputs inherit their fallback's
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def scan(self, text: str) -> Iterator[Tuple[int, str]]:
+        """(end index, pattern) for every occurrence in lowercase `text`"""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                for pattern in out[state]:
+                    yield index, pattern
+
+
+class MentionExtractor:
+    """Finds token mentions in captions and posts without a model call
+
+    Known tokens are indexed by `$cashtag`, bare ticker and name in an
+    Aho-Corasick automaton; base58 addresses of known mints are matched
+    directly. Any other address may be a wallet or a program as well as
+    an unlisted mint, so it is only ever a candidate for the resolver.
+    Tokens listed later go into a small delta automaton that is rebuilt
+    on each `add_tokens()`, and merged into the main one once it holds
+    more than `merge_threshold` patterns, so a listing never pays for a
+    full rebuild.
+
+    A match naming several tokens (a ticker shared by two mints) is
+    ambiguous; those alone are passed to `resolver`, typically an LLM.
+
+    With a `token_list_path` the index is shared between processes: the
+    process that learns about listings `save()`s them there, and every
+    process `load()`s what changed, e.g. from `watch()`.
+    """
+
+    def __init__(
+        self,
+        tokens: Iterable[Dict] = (),
+        merge_threshold: int = 512,
+        token_list_path: Optional[str] = None
+    ):
+        self.merge_threshold = merge_threshold
+        self.token_list_path = token_list_path
+        self._loaded_mtime: Optional[int] = None
+
+        # Ambiguous matches are resolved here when set: resolver(text, candidates) -> chosen
+        self.resolver: Optional[Callable[[str, List[Dict]], Awaitable[List[Dict]]]] = None
+
+        self.symbols: Dict[str, Optional[str]] = {}
+        self.names: Dict[str, Optional[str]] = {}
+        self.patterns: Dict[str, Set[Tuple[str, str]]] = {}
+        self._main = Automaton(())
+        self._delta_patterns: Set[str] = set()
+        self._delta = Automaton(())
+
+        self.stats = {
+            'texts': 0,
+            'mentions': 0,
+            'ambiguous': 0,
+            'resolved': 0,
+            'merges': 0
+        }
+        self.add_tokens(tokens)
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'MentionExtractor':
+        """Build an extractor seeded from the `mentions.token_list_path` JSON list"""
+        extractor = cls(
+            merge_threshold=config.get_setting('mentions', 'merge_threshold', 512),
+            token_list_path=config.get_setting('mentions', 'token_list_path', None) or None
+        )
+        extractor.load()
+        return extractor
+
+    def load(self) -> int:
+        """Index tokens from `token_list_path` if it changed; returns how many were new"""
+        if not self.token_list_path:
+            return 0
+        try:
+            mtime = os.stat(self.token_list_path).st_mtime_ns
+            if mtime == self._loaded_mtime:
+                return 0
+            with open(self.token_list_path) as f:
+                tokens = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Token list {self.token_list_path} not loaded: {e}")
+            return 0
+        self._loaded_mtime = mtime
+        return self.add_tokens(tokens)
+
+    def save(self):
+        """Write every indexed token to `token_list_path` atomically"""
+        if not self.token_list_path:
+            return
+        tokens = [
+            {'mint': mint, 'symbol': symbol, 'name': self.names.get(mint)}
+            for mint, symbol in self.symbols.items()
+        ]
+        os.makedirs(os.path.dirname(self.token_list_path) or '.', exist_ok=True)
+        tmp = self.token_list_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(tokens, f)
+        os.replace(tmp, self.token_list_path)
+        # Our own write holds nothing new to load back
+        self._loaded_mtime = os.stat(self.token_list_path).st_mtime_ns
+
+    async def watch(self, interval_seconds: float = 30.0):
+        """Pick up tokens other processes saved, every `interval_seconds`"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            added = self.load()
+            if added:
+                logger.info(f"🔤 Indexed {added} new token(s) from {self.token_list_path}")
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def add_tokens(self, tokens: Iterable[Dict]) -> int:
+        """Index `{'mint', 'symbol', 'name'}` dicts; returns how many were new"""
+        added = 0
+        new_patterns = []
+        for token in tokens:
+            mint = token.get('mint')
+            if not mint or mint in self.symbols:
+                continue
+            symbol = token.get('symbol')
+            self.symbols[mint] = symbol
+            self.names[mint] = token.get('name')
+            added += 1
+
+            keys = []
+            if symbol:
+                keys += [('$' + symbol.lower(), CASHTAG), (symbol.lower(), TICKER)]
+            if token.get('name') and len(token['name']) >= MIN_NAME_LENGTH:
+                keys.append((token['name'].lower(), NAME))
+            for pattern, kind in keys:
+                if pattern not in self.patterns:
+                    self.patterns[pattern] = set()
+                    new_patterns.append(pattern)
+                self.patterns[pattern].add((kind, mint))
+
+        if new_patterns:
+            self._delta_patterns.update(new_patterns)
+            if len(self._delta_patterns) > self.merge_threshold:
+                self._main = Automaton(self.patterns)
+                self._delta_patterns.clear()
+                self._delta = Automaton(())
+                self.stats['merges'] += 1
+            else:
+                self._delta = Automaton(self._delta_patterns)
+        return added
+
+    def scan(self, text: str) -> Tuple[List[Dict], List[List[Dict]]]:
+        """Unambiguous mentions, and candidate lists for ambiguous ones"""
+        self.stats['texts'] += 1
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lowercase to two; keep offsets aligned with `text`
+            lowered = ''.join(char.lower()[0] for char in text)
+        found: Dict[str, Dict] = {}
+        ambiguous: Dict[frozenset, List[Dict]] = {}
+
+        for automaton in (self._main, self._delta):
+            for end, pattern in automaton.scan(lowered):
+                start = end - len(pattern) + 1
+                if not self._bounded(text, start, end):
+                    continue
+                word = text[start:end + 1]
+                mints = {
+                    mint for kind, mint in self.patterns[pattern]
+                    if (kind != TICKER or self._bare_ticker(word))
+                    and (kind != NAME or not word.islower())
+                }
+                if len(mints) == 1:
+                    mint = mints.pop()
+                    found[mint] = {'mint': mint, 'symbol': self.symbols[mint]}
+                elif mints:
+                    # `$WIF` also matches the bare `WIF`; ask once per candidate set
+                    ambiguous[frozenset(mints)] = [{'mint': m, 'symbol': self.symbols[m]} for m in sorted(mints)]
+
+        for match in ADDRESS_PATTERN.finditer(text):
+            address = match.group()
+            if address in found:
+                continue
+            if address in self.symbols:
+                found[address] = {'mint': address, 'symbol': self.symbols[address]}
+            elif _is_address(address):
+                ambiguous[frozenset((address,))] = [{'mint': address, 'symbol': None}]
+
+        # A mint named outright settles any ambiguity about it
+        candidates = [
+            options for options in ambiguous.values()
+            if not any(option['mint'] in found for option in options)
+        ]
+        self.stats['mentions'] += len(found)
+        self.stats['ambiguous'] += len(candidates)
+        return list(found.values()), candidates
+
+    def extract(self, text: str) -> List[Dict]:
+        """Unambiguous mentions in `text`"""
+        return self.scan(text)[0]
+
+    async def extract_async(self, text: str) -> List[Dict]:
+        """Mentions in `text`, asking the resolver about ambiguous ones"""
+        mentions, ambiguous = self.scan(text)
+        if ambiguous and self.resolver is not None:
+            seen = {mention['mint'] for mention in mentions}
+            for candidates in ambiguous:
+                try:
+                    chosen = await self.resolver(text, candidates)
+                except Exception as e:
+                    logger.warning(f"Mention resolver failed: {e}")
+                    continue
+                for mention in chosen:
+                    if mention['mint'] not in seen:
+                        seen.add(mention['mint'])
+                        mentions.append(mention)
+                        self.stats['resolved'] += 1
+        return mentions
+
+    @staticmethod
+    def _bounded(text: str, start: int, end: int) -> bool:
+        """Match is a whole word: no letter or digit right before or after it"""
+        if text[start] != '$' and start > 0 and text[start - 1].isalnum():
+            return False
+        return end + 1 >= len(text) or not text[end + 1].isalnum()
+
+    @staticmethod
+    def _bare_ticker(word: str) -> bool:
+        return len(word) >= MIN_BARE_TICKER and word.isupper()
+
+
+def _is_address(candidate: str) -> bool:
+    try:
+        return len(base58.b58decode(candidate)) == 32
+    except ValueError:
+        return False
+
+
+# Process-wide extractor, replaced from config by the TradingManager
+mention_index = MentionExtractor()
@@ -0,0 +1,73 @@
+"""Bounded set of recently seen keys with expiry"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class SeenSet:
+    """Remembers keys for `ttl_seconds`, holding at most `max_items`
+
+    Keys are kept in insertion order with their expiry time; since every
+    key lives for the same TTL the oldest entries are also the first to
+    expire, so expiry and eviction only ever pop from the front. A key can
+    carry a value, e.g. what was derived from it, kept as long as the key.
+    """
+
+    def __init__(self, ttl_seconds: float = 86400.0, max_items: int = 50_000, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.clock = clock
+        self._expiry: 'OrderedDict[Hashable, float]' = OrderedDict()
+        self._values: Dict[Hashable, Any] = {}
+
+        self.stats = {
+            'added': 0,
+            'hits': 0,
+            'expired': 0,
+            'evicted': 0
+        }
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._expiry)
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._expire()
+        return key in self._expiry
+
+    def add(self, key: Hashable, value: Any = None) -> bool:
+        """Remember `key` (with `value`); False if it was already seen and not yet expired"""
+        self._expire()
+        if key in self._expiry:
+            self.stats['hits'] += 1
+            return False
+        self._expiry[key] = self.clock() + self.ttl_seconds
+        if value is not None:
+            self._values[key] = value
+        self.stats['added'] += 1
+        while len(self._expiry) > self.max_items:
+            evicted, _ = self._expiry.popitem(last=False)
+            self._values.pop(evicted, None)
+            self.stats['evicted'] += 1
+        return True
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """The value stored with a seen key, `default` if none or not seen"""
+        self._expire()
+        return self._values.get(key, default)
+
+    def discard(self, key: Hashable):
+        """Forget `key` so it is processed again next time"""
+        self._expiry.pop(key, None)
+        self._values.pop(key, None)
+
+    def _expire(self):
+        now = self.clock()
+        while self._expiry:
+            key, expiry = next(iter(self._expiry.items()))
+            if expiry > now:
+                break
+            del self._expiry[key]
+            self._values.pop(key, None)
+            self.stats['expired'] += 1
@@ -1,28 +1,427 @@
 """Sentiment analysis utilities"""
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, List
+import os
+import re
+import time
+import zlib
+from collections import OrderedDict
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import numpy as np
+
+from utils.config import Config
 
 logger = logging.getLogger(__name__)
 
+URL_PATTERN = re.compile(r'https?://\S+')
+WORD_PATTERN = re.compile(r'[\w$]+')
+
+
+def narrative_text(narrative: Dict) -> str:
+    """The text a narrative is scored on"""
+    parts = [narrative.get(field) for field in ('topic', 'summary', 'text', 'description')]
+    return '\n'.join(str(part) for part in parts if part)
+
+
+def content_key(text: str) -> str:
+    """Hash of `text` ignoring case, links and whitespace differences"""
+    normalized = ' '.join(URL_PATTERN.sub('', text).lower().split())
+    return hashlib.sha256(normalized.encode()).hexdigest()[:32]
+
+
+def shingles(text: str, size: int = 2) -> List[int]:
+    """CRC32 of each overlapping `size`-word run of `text`, ignoring case, links and punctuation"""
+    words = WORD_PATTERN.findall(URL_PATTERN.sub('', text).lower())
+    if len(words) <= size:
+        return [zlib.crc32(' '.join(words).encode())]
+    return list({zlib.crc32(' '.join(run).encode()) for run in zip(*(words[i:] for i in range(size)))})
+
+
+class NarrativeClusterer:
+    """Merges near-duplicate narratives with MinHash and LSH banding
+
+    Each narrative's word shingles are reduced to a `permutations`-long
+    MinHash signature, whose rows agree in about the same fraction as the
+    shingle sets overlap (Jaccard similarity). Signatures are cut into
+    `bands`; narratives sharing any band land in the same bucket and
+    become candidates, and a candidate joins the bucket's cluster when
+    its signatures agree on at least `threshold` of the rows. Every
+    narrative is hashed and bucketed once, so a cycle costs time linear
+    in the number of posts rather than comparing every pair. Narratives
+    about different token mints are never merged, however alike the text.
+
+    A cluster becomes one narrative: its member with the most mentions,
+    with `mentions` summed over all members, `platforms` their union and
+    `cluster_size` the member count.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        permutations: int = 64,
+        bands: int = 16,
+        shingle_size: int = 2,
+        seed: int = 1
+    ):
+        if permutations % bands:
+            raise ValueError(f"{permutations} permutations do not split into {bands} bands")
+        self.threshold = threshold
+        self.permutations = permutations
+        self.bands = bands
+        self.shingle_size = shingle_size
+
+        # Multiply-shift hash family: h_i(x) = (a_i * x + b_i) mod 2**64 >> 32, a_i odd
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, permutations, dtype=np.uint64)[:, None] | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, permutations, dtype=np.uint64)[:, None]
+
+        self.stats = {
+            'narratives': 0,
+            'clusters': 0,
+            'merged': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'NarrativeClusterer':
+        """Build a clusterer from the `narratives` section of config.yaml"""
+        return cls(
+            threshold=config.get_setting('narratives', 'cluster_threshold', 0.5),
+            permutations=config.get_setting('narratives', 'minhash_permutations', 64),
+            bands=config.get_setting('narratives', 'lsh_bands', 16),
+            shingle_size=config.get_setting('narratives', 'shingle_size', 2)
+        )
+
+    def signatures(self, texts: Sequence[str], chunk_size: int = 1024) -> np.ndarray:
+        """MinHash signature of each text, one row per text"""
+        signatures = np.zeros((len(texts), self.permutations), dtype=np.uint32)
+        # Chunked so the permutations x shingles matrix stays a few MB
+        for start in range(0, len(texts), chunk_size):
+            hashed = [shingles(text, self.shingle_size) for text in texts[start:start + chunk_size]]
+            offsets = np.cumsum([0] + [len(h) for h in hashed[:-1]])
+            values = np.fromiter(chain.from_iterable(hashed), dtype=np.uint64)
+            # uint64 arithmetic wraps, which is the mod 2**64 of the hash family
+            permuted = (self._a * values + self._b) >> np.uint64(32)
+            signatures[start:start + len(hashed)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        return signatures
+
+    def clusters(self, texts: Sequence[str], keys: Optional[Sequence] = None) -> List[List[int]]:
+        """Indexes of `texts` grouped by near-duplication, in order of first appearance
+
+        Texts whose `keys` are both set and differ never share a cluster,
+        not even through a keyless text similar to both.
+        """
+        signatures = self.signatures(texts)
+        parent = list(range(len(texts)))
+        # Key of each cluster, held by its root
+        cluster_key = list(keys) if keys is not None else [None] * len(texts)
+
+        def root(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Candidates: each narrative paired with the first one in every bucket
+        # it falls in, and with the first one there sharing its key, so a
+        # bucket led by another mint never hides same-mint duplicates
+        codes = None
+        if keys is not None:
+            index: Dict = {None: 0}
+            codes = np.array([index.setdefault(key, len(index)) for key in keys], dtype=np.int64)
+        rows = self.permutations // self.bands
+        pairs = []
+        for band in range(self.bands):
+            columns = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+            band_values = columns.view(np.dtype((np.void, columns.dtype.itemsize * rows))).ravel()
+            _, first, bucket = np.unique(band_values, return_index=True, return_inverse=True)
+            bucket = bucket.ravel()
+            leads = [first[bucket]]
+            if codes is not None:
+                _, group_first, group = np.unique(
+                    bucket * len(index) + codes, return_index=True, return_inverse=True
+                )
+                leads.append(group_first[group.ravel()])
+            for lead in leads:
+                shared = np.flatnonzero(lead != np.arange(len(texts)))
+                pairs.append(lead[shared] * len(texts) + shared)
+
+        # A shared band only makes them candidates; the whole signature decides
+        packed = np.unique(np.concatenate(pairs))
+        candidates = np.stack([packed // len(texts), packed % len(texts)], axis=1)
+        for start in range(0, len(candidates), 65536):
+            chunk = candidates[start:start + 65536]
+            agree = np.count_nonzero(signatures[chunk[:, 0]] == signatures[chunk[:, 1]], axis=1)
+            for lead, other in chunk[agree >= self.threshold * self.permutations].tolist():
+                lead, other = root(lead), root(other)
+                if lead == other:
+                    continue
+                if cluster_key[lead] is not None and cluster_key[other] is not None \
+                        and cluster_key[lead] != cluster_key[other]:
+                    continue
+                parent[other] = lead
+                if cluster_key[lead] is None:
+                    cluster_key[lead] = cluster_key[other]
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(texts)):
+            groups.setdefault(root(i), []).append(i)
+        return list(groups.values())
+
+    def merge(self, narratives: Sequence[Dict]) -> List[Dict]:
+        """One narrative per cluster of near-duplicates"""
+        merged = []
+        mints = [(n.get('associated_token') or {}).get('mint') for n in narratives]
+        for members in self.clusters([narrative_text(n) for n in narratives], mints):
+            group = [narratives[i] for i in members]
+            lead = dict(max(group, key=_mention_count))
+            platforms = set()
+            for narrative in group:
+                platforms.update(narrative.get('platforms') or [])
+                if narrative.get('platform'):
+                    platforms.add(narrative['platform'])
+                if not lead.get('associated_token') and narrative.get('associated_token'):
+                    lead['associated_token'] = narrative['associated_token']
+            lead['mentions'] = sum(_mention_count(n) for n in group)
+            lead['platforms'] = sorted(platforms)
+            lead['cluster_size'] = len(group)
+            merged.append(lead)
+
+        self.stats['narratives'] += len(narratives)
+        self.stats['clusters'] += len(merged)
+        self.stats['merged'] += len(narratives) - len(merged)
+        return merged
+
+
+def _mention_count(narrative: Dict) -> int:
+    return narrative.get('mentions') or 1
+
+
+class NarrativeScorer:
+    """Batched, cached narrative strength scoring against a model endpoint
+
+    Scores are cached by `content_key`, so the same narrative seen again,
+    reposted or re-capitalised, is not sent to the model until its entry
+    expires after `ttl_seconds`; beyond `max_entries` the least recently
+    used entries are evicted. Misses are packed `batch_size` at a time
+    into one request, batches run concurrently up to `max_concurrency`,
+    and a narrative already being scored is awaited rather than sent
+    twice. The cache is saved to `cache_path` on `close()` and loaded
+    back on start.
+
+    The endpoint receives `{"narratives": [{"id", "text"}, ...]}` and
+    answers `{"scores": {id: strength}}` with strengths in [0, 1].
+    Without a `url` every narrative scores 0.0.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        batch_size: int = 16,
+        max_concurrency: int = 4,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 10_000,
+        cache_path: Optional[str] = None,
+        request_timeout: float = 30.0
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.cache_path = cache_path
+        self.request_timeout = request_timeout
+
+        # content key -> (score, expiry in epoch seconds), least recently used first
+        self._entries: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'requests': 0,
+            'errors': 0,
+            'evicted': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'NarrativeScorer':
+        """Build a scorer from the `narratives` section of config.yaml"""
+        scorer = cls(
+            url=config.get_setting('narratives', 'model_url', None) or None,
+            api_key=config.get('NARRATIVE_MODEL_API_KEY'),
+            batch_size=config.get_setting('narratives', 'batch_size', 16),
+            max_concurrency=config.get_setting('narratives', 'max_concurrent_requests', 4),
+            ttl_seconds=config.get_setting('narratives', 'cache_ttl_seconds', 3600.0),
+            max_entries=config.get_setting('narratives', 'cache_max_items', 10_000),
+            cache_path=config.get_setting('narratives', 'cache_path', None) or None,
+            request_timeout=config.get_setting('narratives', 'request_timeout', 30.0)
+        )
+        scorer.load()
+        return scorer
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def score(self, narrative: Dict) -> float:
+        return (await self.score_many([narrative]))[0]
+
+    async def score_many(self, narratives: Sequence[Dict]) -> List[float]:
+        """Strength of each narrative, in order"""
+        keys = [content_key(narrative_text(n)) for n in narratives]
+        now = time.time()
+
+        cached: Dict[str, float] = {}
+        pending: Dict[str, asyncio.Future] = {}
+        batch: List[Tuple[str, str]] = []
+        for key, narrative in zip(keys, narratives):
+            if key in cached or key in pending:
+                continue
+            score = self._cached(key, now)
+            if score is not None:
+                cached[key] = score
+                continue
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+            else:
+                self.stats['misses'] += 1
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = future
+                batch.append((key, narrative_text(narrative)))
+            pending[key] = future
+
+        batches = [batch[i:i + self.batch_size] for i in range(0, len(batch), self.batch_size)]
+        await asyncio.gather(*[self._score_batch(b) for b in batches])
+        for key, future in pending.items():
+            # Shielded: another caller's batch may own this future
+            cached[key] = await asyncio.shield(future)
+        return [cached[key] for key in keys]
+
+    def load(self):
+        """Read the persisted cache, dropping expired entries"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Narrative cache {self.cache_path} not loaded: {e}")
+            return
+        now = time.time()
+        for key, (score, expires) in entries.items():
+            if expires > now:
+                self._entries[key] = (score, expires)
+        self._evict()
+
+    def save(self):
+        """Write the cache to `cache_path` atomically"""
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp = self.cache_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.cache_path)
+
+    async def close(self):
+        try:
+            self.save()
+        except OSError as e:
+            logger.warning(f"Narrative cache not saved: {e}")
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _cached(self, key: str, now: float) -> Optional[float]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return entry[0]
+
+    def _store(self, key: str, score: float):
+        self._entries[key] = (score, time.time() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evicted'] += 1
+
+    async def _score_batch(self, batch: List[Tuple[str, str]]):
+        """Score one batch and settle its futures; failures score 0.0 and are not cached"""
+        scores = None
+        try:
+            scores = await self._request(batch) if self.url else {}
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Narrative scoring of {len(batch)} narrative(s) failed: {e}")
+        finally:
+            # Also runs on cancellation, so coalesced callers never hang
+            for key, _ in batch:
+                future = self._inflight.pop(key, None)
+                if future is None or future.done():
+                    continue
+                if scores is None:
+                    future.set_result(0.0)
+                    continue
+                score = min(1.0, max(0.0, float(scores.get(key, 0.0))))
+                if self.url:
+                    self._store(key, score)
+                future.set_result(score)
+
+    async def _request(self, batch: List[Tuple[str, str]]) -> Dict[str, float]:
+        if self._session is None or self._session.closed:
+            headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else None
+            self._session = aiohttp.ClientSession(
+                headers=headers, timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+        payload = {'narratives': [{'id': key, 'text': text} for key, text in batch]}
+        async with self._semaphore:
+            self.stats['requests'] += 1
+            async with self._session.post(self.url, json=payload) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        return data.get('scores', {})
+
+
+# Process-wide scorer, replaced from config by the TradingManager
+narrative_scorer = NarrativeScorer()
+
 
 async def get_trending_narratives(platforms: List[str]) -> List[Dict]:
     """
     Get trending narratives from social platforms
-    
+
     TODO: Implement with Twitter/Discord/Telegram APIs
     """
     logger.debug(f"Fetching narratives from {platforms}")
-    
+
     # Placeholder
     return []
 
 
 async def analyze_narrative_strength(narrative: Dict) -> float:
-    """
-    Analyze the strength of a narrative
-    
-    TODO: Implement with AI sentiment analysis
-    """
-    # Placeholder - use Claude/GPT for sentiment analysis
-    return 0.0
+    """Strength of a narrative in [0, 1], from the shared narrative scorer"""
+    return await narrative_scorer.score(narrative)
+
+
+async def analyze_narratives(narratives: Sequence[Dict]) -> List[float]:
+    """Strength of each narrative, scored in batches by the shared narrative scorer"""
+    return await narrative_scorer.score_many(narratives)
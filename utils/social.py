@@ -3,6 +3,8 @@
 import logging
 from typing import Dict, List
 
+from utils import mentions
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,11 +24,19 @@ async def scan_tiktok_viral(
     return []
 
 
+# Content fields that may carry token mentions
+TEXT_FIELDS = ('title', 'caption', 'text', 'description')
+
+
 async def extract_token_mentions(content: Dict) -> List[Dict]:
     """
     Extract token mentions from social content
     
-    TODO: Implement with NLP/AI
+    Matching runs locally against `mentions.mention_index`; only ambiguous
+    mentions go to its resolver (e.g. an LLM) when one is set.
     """
-    # Placeholder
-    return []
+    parts = [content[field] for field in TEXT_FIELDS if content.get(field)]
+    parts += ['#' + tag.lstrip('#') for tag in content.get('hashtags') or []]
+    if not parts:
+        return []
+    return await mentions.mention_index.extract_async('\n'.join(parts))
@@ -0,0 +1,396 @@
+"""Transaction pre-building: blockhash prefetch and reusable swap templates"""
+
+import asyncio
+import base64
+import logging
+import os
+import struct
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import base58
+from solders import compute_budget
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0, to_bytes_versioned
+from solders.pubkey import Pubkey
+
+logger = logging.getLogger(__name__)
+
+JUPITER_SWAP_INSTRUCTIONS_URL = 'https://quote-api.jup.ag/v6/swap-instructions'
+
+# Jupiter route instructions end with
+# amount u64 | quoted_amount u64 | slippage_bps u16 | platform_fee_bps u8
+# (in/quoted out for ExactIn routes, out/quoted in for ExactOut routes)
+ROUTE_AMOUNT_FROM_END = 19
+ROUTE_QUOTED_AMOUNT_FROM_END = 11
+
+# Address lookup table accounts carry a 56 byte header before the addresses
+LOOKUP_TABLE_HEADER_SIZE = 56
+
+# System program transfer: u32 instruction index 2 | lamports u64
+SYSTEM_PROGRAM_ID = Pubkey.from_string('11111111111111111111111111111111')
+SYSTEM_TRANSFER_INDEX = 2
+
+
+class BlockhashRefresher:
+    """Keeps a recent blockhash and priority fee ready off the hot path"""
+
+    def __init__(
+        self,
+        rpc,
+        interval_seconds: float = 2.0,
+        priority_fee_lamports: int = 10000,
+        on_slot=None
+    ):
+        self.rpc = rpc
+        self.interval_seconds = interval_seconds
+        self.priority_fee_lamports = priority_fee_lamports
+        self.on_slot = on_slot
+
+        self.blockhash: Optional[Hash] = None
+        self.last_valid_block_height = 0
+        self.slot = 0
+        self.refreshed_at = 0.0
+        self.ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Fetch once, then keep refreshing in the background"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Initial blockhash fetch failed: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self):
+        result = await self.rpc.call('getLatestBlockhash', [{'commitment': 'confirmed'}])
+        self.blockhash = Hash.from_string(result['value']['blockhash'])
+        self.last_valid_block_height = result['value']['lastValidBlockHeight']
+        self.slot = result['context']['slot']
+        self.refreshed_at = time.monotonic()
+        self.ready.set()
+        if self.on_slot:
+            self.on_slot(self.slot)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Blockhash refresh failed: {e}")
+
+
+class SwapTemplate:
+    """A compiled, signable swap message with patchable fields
+
+    The message is compiled once with random marker bytes in place of the
+    blockhash and of each patchable field. At submit time only those byte
+    ranges are overwritten and the payer signature is applied, so no
+    instruction assembly or message compilation happens on the hot path.
+    """
+
+    def __init__(
+        self,
+        payer: Keypair,
+        instructions: Sequence[Instruction],
+        patch_fields: Dict[str, Tuple[int, int, str]],
+        lookup_tables: Sequence[AddressLookupTableAccount] = (),
+        compute_unit_limit: int = 200_000
+    ):
+        """
+        `patch_fields` maps a name to (instruction index, data offset,
+        struct format) within `instructions`. A `cu_price` field for the
+        priority fee is always added.
+        """
+        self.payer = payer
+
+        budget = [
+            compute_budget.set_compute_unit_limit(compute_unit_limit),
+            compute_budget.set_compute_unit_price(0)
+        ]
+        fields = {name: (index + len(budget), offset, fmt)
+                  for name, (index, offset, fmt) in patch_fields.items()}
+        fields['cu_price'] = (1, 1, '<Q')
+        instructions = budget + list(instructions)
+
+        markers: Dict[str, bytes] = {}
+        marked = []
+        for index, ix in enumerate(instructions):
+            data = bytearray(ix.data)
+            for name, (field_index, offset, fmt) in fields.items():
+                if field_index == index:
+                    marker = os.urandom(struct.calcsize(fmt))
+                    data[offset:offset + len(marker)] = marker
+                    markers[name] = marker
+            marked.append(Instruction(ix.program_id, bytes(data), ix.accounts))
+
+        blockhash_marker = Hash(os.urandom(32))
+        message = MessageV0.try_compile(payer.pubkey(), marked, list(lookup_tables), blockhash_marker)
+        if message.header.num_required_signatures != 1:
+            raise ValueError("Swap templates support a single signer")
+
+        self._message = to_bytes_versioned(message)
+        self._blockhash_offset = self._locate(bytes(blockhash_marker))
+        self._fields = [
+            (name, self._locate(marker), fields[name][2])
+            for name, marker in markers.items()
+        ]
+
+    def _locate(self, marker: bytes) -> int:
+        offset = self._message.find(marker)
+        if offset < 0 or self._message.find(marker, offset + 1) >= 0:
+            raise ValueError("Could not locate a unique patch position")
+        return offset
+
+    def build(self, blockhash: Hash, **values: int) -> bytes:
+        """Patch blockhash and fields, sign, and return the wire transaction"""
+        message = bytearray(self._message)
+        message[self._blockhash_offset:self._blockhash_offset + 32] = bytes(blockhash)
+        for name, offset, fmt in self._fields:
+            struct.pack_into(fmt, message, offset, values[name])
+
+        signature = self.payer.sign_message(bytes(message))
+        return b'\x01' + bytes(signature) + bytes(message)
+
+
+class TransactionPipeline:
+    """Signal to signed transaction with pre-built per-route templates
+
+    Templates are cached per (wallet, route, slippage). Preparing a
+    transaction patches the amounts (including the SOL wrapped for the
+    input), the current blockhash and the priority fee into a template and
+    signs it; per-stage timings are kept in `timings`.
+    """
+
+    STAGES = ('patch_sign', 'serialize', 'total')
+
+    def __init__(
+        self,
+        rpc,
+        keypairs: Dict[str, Keypair],
+        refresher: BlockhashRefresher,
+        compute_unit_limit: int = 200_000,
+        swap_instructions_url: str = JUPITER_SWAP_INSTRUCTIONS_URL,
+        blockhash_timeout_seconds: float = 5.0,
+        confirm_poll_seconds: float = 0.4,
+        max_confirm_seconds: float = 90.0
+    ):
+        self.rpc = rpc
+        self.keypairs = keypairs
+        self.refresher = refresher
+        self.compute_unit_limit = compute_unit_limit
+        self.swap_instructions_url = swap_instructions_url
+        self.blockhash_timeout_seconds = blockhash_timeout_seconds
+        self.confirm_poll_seconds = confirm_poll_seconds
+        self.max_confirm_seconds = max_confirm_seconds
+
+        self.templates: Dict[Tuple, SwapTemplate] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.timings = {
+            stage: {'count': 0, 'last_us': 0.0, 'max_us': 0.0, 'total_us': 0.0}
+            for stage in self.STAGES + ('template_build',)
+        }
+
+    @classmethod
+    def from_config(cls, config, rpc, on_slot=None) -> 'TransactionPipeline':
+        """Load trader signing keys from env and settings from config.yaml"""
+        keypairs = {}
+        for name in config.config['traders']:
+            secret = config.get(f"{name.upper()}_PRIVATE_KEY")
+            if not secret:
+                continue
+            try:
+                keypair = Keypair.from_bytes(base58.b58decode(secret))
+            except ValueError:
+                logger.warning(f"⚠️  {name.upper()}_PRIVATE_KEY is not a valid keypair")
+                continue
+            keypairs[str(keypair.pubkey())] = keypair
+
+        refresher = BlockhashRefresher(
+            rpc,
+            interval_seconds=config.get_setting('dex', 'blockhash_refresh_seconds', 2.0),
+            priority_fee_lamports=config.get_setting('dex', 'priority_fee_lamports', 10000),
+            on_slot=on_slot
+        )
+        return cls(
+            rpc,
+            keypairs,
+            refresher,
+            compute_unit_limit=config.get_setting('dex', 'compute_unit_limit', 200_000),
+            blockhash_timeout_seconds=config.get_setting('dex', 'blockhash_timeout_seconds', 5.0),
+            confirm_poll_seconds=config.get_setting('dex', 'confirm_poll_seconds', 0.4),
+            max_confirm_seconds=config.get_setting('dex', 'max_confirm_seconds', 90.0)
+        )
+
+    async def start(self):
+        await self.refresher.start()
+
+    async def stop(self):
+        await self.refresher.stop()
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    @property
+    def cu_price(self) -> int:
+        """Priority fee as micro-lamports per compute unit"""
+        return self.refresher.priority_fee_lamports * 1_000_000 // self.compute_unit_limit
+
+    def route_key(self, wallet: str, quote: Dict) -> Tuple:
+        hops = tuple(
+            step.get('swapInfo', {}).get('ammKey', '')
+            for step in quote.get('routePlan', [])
+        )
+        # Slippage is compiled into the route instruction, so it is part of the route
+        return (
+            wallet, quote['inputMint'], quote['outputMint'], quote.get('swapMode'),
+            quote.get('slippageBps'), hops
+        )
+
+    def add_template(self, key: Tuple, template: SwapTemplate):
+        self.templates[key] = template
+
+    def prepare(self, key: Tuple, **values: int) -> bytes:
+        """Patch and sign a cached template; the hot path of a swap"""
+        start = time.perf_counter()
+        template = self.templates[key]
+        wire = template.build(self.refresher.blockhash, cu_price=self.cu_price, **values)
+        signed = time.perf_counter()
+        encoded = base64.b64encode(wire).decode()
+        done = time.perf_counter()
+
+        self._time('patch_sign', signed - start)
+        self._time('serialize', done - signed)
+        self._time('total', done - start)
+        return encoded
+
+    async def prepare_swap(self, wallet: str, quote: Dict) -> str:
+        """Return a signed, base64 transaction for a route quote"""
+        if wallet not in self.keypairs:
+            raise KeyError(f"No signing key for wallet {wallet[:8]}...")
+        if self.refresher.blockhash is None:
+            try:
+                await asyncio.wait_for(self.refresher.ready.wait(), self.blockhash_timeout_seconds)
+            except asyncio.TimeoutError:
+                raise RuntimeError(
+                    f"No recent blockhash after {self.blockhash_timeout_seconds}s"
+                ) from None
+
+        key = self.route_key(wallet, quote)
+        if key not in self.templates:
+            started = time.perf_counter()
+            self.templates[key] = await self._build_route_template(wallet, quote)
+            self._time('template_build', time.perf_counter() - started)
+
+        fixed, quoted = ('inAmount', 'outAmount')
+        if quote.get('swapMode') == 'ExactOut':
+            fixed, quoted = quoted, fixed
+        return self.prepare(
+            key,
+            amount=int(quote[fixed]),
+            quoted_amount=int(quote[quoted]),
+            wrap_lamports=wrap_lamports(quote)
+        )
+
+    async def _build_route_template(self, wallet: str, quote: Dict) -> SwapTemplate:
+        """Fetch route instructions from Jupiter once and compile a template"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+
+        payload = {
+            'userPublicKey': wallet,
+            'quoteResponse': quote,
+            'wrapAndUnwrapSol': True,
+            'dynamicComputeUnitLimit': False
+        }
+        async with self._session.post(self.swap_instructions_url, json=payload) as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+
+        setup = [instruction_from_json(ix) for ix in data.get('setupInstructions', [])]
+        swap = instruction_from_json(data['swapInstruction'])
+        cleanup = [instruction_from_json(data['cleanupInstruction'])] if data.get('cleanupInstruction') else []
+        tables = await self._lookup_tables(data.get('addressLookupTableAddresses', []))
+
+        swap_index = len(setup)
+        size = len(swap.data)
+        patch_fields = {
+            'amount': (swap_index, size - ROUTE_AMOUNT_FROM_END, '<Q'),
+            'quoted_amount': (swap_index, size - ROUTE_QUOTED_AMOUNT_FROM_END, '<Q')
+        }
+        # Wrapping SOL input transfers its lamports in a setup instruction
+        wrap_index = find_wrap_transfer(setup, self.keypairs[wallet].pubkey())
+        if wrap_index is not None:
+            patch_fields['wrap_lamports'] = (wrap_index, 4, '<Q')
+
+        return SwapTemplate(
+            self.keypairs[wallet],
+            setup + [swap] + cleanup,
+            patch_fields=patch_fields,
+            lookup_tables=tables,
+            compute_unit_limit=self.compute_unit_limit
+        )
+
+    async def _lookup_tables(self, addresses: List[str]) -> List[AddressLookupTableAccount]:
+        if not addresses:
+            return []
+        result = await self.rpc.call('getMultipleAccounts', [addresses, {'encoding': 'base64'}])
+        tables = []
+        for address, account in zip(addresses, result['value']):
+            if not account:
+                continue
+            raw = base64.b64decode(account['data'][0])[LOOKUP_TABLE_HEADER_SIZE:]
+            keys = [Pubkey.from_bytes(raw[i:i + 32]) for i in range(0, len(raw), 32)]
+            tables.append(AddressLookupTableAccount(Pubkey.from_string(address), keys))
+        return tables
+
+    def _time(self, stage: str, seconds: float):
+        micros = seconds * 1e6
+        timing = self.timings[stage]
+        timing['count'] += 1
+        timing['last_us'] = micros
+        timing['total_us'] += micros
+        timing['max_us'] = max(timing['max_us'], micros)
+
+
+def wrap_lamports(quote: Dict) -> int:
+    """Lamports wrapped for a SOL input: the exact input, or its maximum for ExactOut"""
+    if quote.get('swapMode') == 'ExactOut':
+        return int(quote.get('otherAmountThreshold') or quote['inAmount'])
+    return int(quote['inAmount'])
+
+
+def find_wrap_transfer(instructions: Sequence[Instruction], payer: Pubkey) -> Optional[int]:
+    """Index of the System transfer funding the payer's wrapped SOL account"""
+    for index, ix in enumerate(instructions):
+        if (
+            ix.program_id == SYSTEM_PROGRAM_ID
+            and len(ix.data) == 12
+            and struct.unpack_from('<I', bytes(ix.data))[0] == SYSTEM_TRANSFER_INDEX
+            and ix.accounts
+            and ix.accounts[0].pubkey == payer
+        ):
+            return index
+    return None
+
+
+def instruction_from_json(ix: Dict) -> Instruction:
+    """Convert a Jupiter JSON instruction into a solders Instruction"""
+    return Instruction(
+        Pubkey.from_string(ix['programId']),
+        base64.b64decode(ix['data']),
+        [
+            AccountMeta(Pubkey.from_string(a['pubkey']), a['isSigner'], a['isWritable'])
+            for a in ix['accounts']
+        ]
+    )
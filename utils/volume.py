@@ -0,0 +1,112 @@
+"""Columnar volume data and vectorized spike detection"""
+
+import logging
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VolumeTable:
+    """Per-mint volume columns updated in place every cycle
+
+    Each mint owns a fixed row in NumPy arrays (current volume, rolling
+    average, liquidity), so spike detection over the whole token universe
+    is a single vectorized mask instead of a Python loop over dicts.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.index: Dict[str, int] = {}
+        self.mints: List[str] = []
+        self.symbols: List[str] = []
+        self.size = 0
+        self.cycle = 0
+
+        self.current = np.zeros(capacity, dtype=np.float64)
+        self.average = np.zeros(capacity, dtype=np.float64)
+        self.liquidity = np.zeros(capacity, dtype=np.float64)
+        self.updated = np.full(capacity, -1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def update(self, volume_data: List[Dict]):
+        """Write a cycle of row dicts from get_volume_data into the columns"""
+        rows = self.rows_for([d['mint'] for d in volume_data], volume_data)
+        self.update_columns(
+            rows,
+            np.fromiter((d.get('current_volume', 0) for d in volume_data), np.float64, len(rows)),
+            np.fromiter((d.get('avg_volume', 0) for d in volume_data), np.float64, len(rows)),
+            np.fromiter((d.get('liquidity_usd', 0) for d in volume_data), np.float64, len(rows))
+        )
+
+    def update_columns(
+        self,
+        rows: np.ndarray,
+        current: np.ndarray,
+        average: np.ndarray,
+        liquidity: np.ndarray = None
+    ):
+        """Write column arrays for the given rows and start a new cycle"""
+        self.cycle += 1
+        self.current[rows] = current
+        self.average[rows] = average
+        if liquidity is not None:
+            self.liquidity[rows] = liquidity
+        self.updated[rows] = self.cycle
+
+    def rows_for(self, mints: Sequence[str], volume_data: Sequence[Dict] = ()) -> np.ndarray:
+        """Return row numbers for mints, registering unseen ones"""
+        rows = np.empty(len(mints), dtype=np.int64)
+        for i, mint in enumerate(mints):
+            row = self.index.get(mint)
+            if row is None:
+                symbol = volume_data[i].get('symbol', '') if volume_data else ''
+                row = self._add(mint, symbol)
+            rows[i] = row
+        return rows
+
+    def spikes(self, multiplier: float, min_volume: float) -> np.ndarray:
+        """Rows updated this cycle whose volume spiked above the average"""
+        n = self.size
+        current = self.current[:n]
+        mask = (
+            (current > self.average[:n] * multiplier)
+            & (current >= min_volume)
+            & (self.updated[:n] == self.cycle)
+        )
+        return np.flatnonzero(mask)
+
+    def records(self, rows: np.ndarray) -> List[Dict]:
+        """Materialize selected rows as the dicts traders expect"""
+        return [
+            {
+                'mint': self.mints[row],
+                'symbol': self.symbols[row],
+                'current_volume': float(self.current[row]),
+                'avg_volume': float(self.average[row]),
+                'liquidity_usd': float(self.liquidity[row])
+            }
+            for row in rows
+        ]
+
+    def _add(self, mint: str, symbol: str) -> int:
+        if self.size == len(self.current):
+            self._grow()
+        row = self.size
+        self.index[mint] = row
+        self.mints.append(mint)
+        self.symbols.append(symbol)
+        self.size += 1
+        return row
+
+    def _grow(self):
+        capacity = len(self.current) * 2
+        for name in ('current', 'average', 'liquidity'):
+            column = np.zeros(capacity, dtype=np.float64)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+        updated = np.full(capacity, -1, dtype=np.int64)
+        updated[:self.size] = self.updated[:self.size]
+        self.updated = updated
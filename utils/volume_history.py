@@ -0,0 +1,226 @@
+"""Memory-mapped per-mint volume history"""
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+logger = logging.getLogger(__name__)
+
+# Base58 mint addresses are at most 44 characters
+MINT_DTYPE = 'S48'
+
+
+class VolumeHistoryStore:
+    """On-disk ring buffers of per-mint volume buckets
+
+    Every mint owns one slot holding a ring of `buckets` volume values,
+    each covering `bucket_seconds`. Arrays live in `.npy` files opened with
+    `numpy.memmap`, so history survives restarts and is reopened without
+    being parsed. Appends and rolling means are O(1) per mint (a running
+    sum is kept next to the ring). The number of slots is fixed; when it
+    is full the least recently touched mint is evicted. History created
+    with other settings is moved aside and started afresh.
+    """
+
+    ARRAYS = ('mints', 'values', 'sums', 'counts', 'heads', 'last_bucket', 'touched')
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int = 20000,
+        buckets: int = 96,
+        bucket_seconds: int = 900
+    ):
+        self.path = path
+        self.capacity = capacity
+        self.buckets = buckets
+        self.bucket_seconds = bucket_seconds
+
+        meta = {'capacity': capacity, 'buckets': buckets, 'bucket_seconds': bucket_seconds}
+        meta_path = os.path.join(path, 'meta.json')
+
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                existing = json.load(f)
+            if existing != meta:
+                # The rings can't be reshaped; keep the old files for inspection
+                aside = f"{path.rstrip(os.sep)}.{time.strftime('%Y%m%d-%H%M%S')}"
+                os.replace(path, aside)
+                logger.warning(f"⚠️  Volume history was created with {existing}, moved to {aside}; starting afresh")
+
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(meta_path):
+            self._open('r+')
+            logger.info(f"📂 Reopened volume history for {int((self.mints != b'').sum())} mints")
+        else:
+            self._open('w+')
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+
+        self.index: Dict[str, int] = {
+            mint.decode(): slot
+            for slot, mint in enumerate(self.mints)
+            if mint
+        }
+        self._free = [int(slot) for slot in np.flatnonzero(self.mints == b'')[::-1]]
+
+        self.stats = {'evictions': 0}
+
+    def _open(self, mode: str):
+        shapes = {
+            'mints': ((self.capacity,), MINT_DTYPE),
+            'values': ((self.capacity, self.buckets), np.float64),
+            'sums': ((self.capacity,), np.float64),
+            'counts': ((self.capacity,), np.int32),
+            'heads': ((self.capacity,), np.int32),
+            'last_bucket': ((self.capacity,), np.int64),
+            'touched': ((self.capacity,), np.float64)
+        }
+        for name in self.ARRAYS:
+            shape, dtype = shapes[name]
+            file_path = os.path.join(self.path, f"{name}.npy")
+            if mode == 'w+':
+                array = open_memmap(file_path, mode='w+', dtype=dtype, shape=shape)
+            else:
+                array = open_memmap(file_path, mode='r+')
+            setattr(self, name, array)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def flush(self):
+        """Push dirty pages to disk"""
+        for name in self.ARRAYS:
+            getattr(self, name).flush()
+
+    def close(self):
+        self.flush()
+
+    def slots_for(self, mints: Sequence[str], now: Optional[float] = None) -> np.ndarray:
+        """Return slots for mints, allocating (and evicting) as needed"""
+        now = time.time() if now is None else now
+        slots = np.empty(len(mints), dtype=np.int64)
+        for i, mint in enumerate(mints):
+            slot = self.index.get(mint)
+            if slot is None:
+                slot = self._allocate(mint, now)
+            # Touch as we go, so a later allocation never evicts this batch
+            self.touched[slot] = now
+            slots[i] = slot
+        return slots
+
+    def record(self, mint: str, volume: float, now: Optional[float] = None):
+        """Record the latest volume observation for one mint"""
+        now = time.time() if now is None else now
+        self.record_many(self.slots_for([mint], now), np.array([volume]), now)
+
+    def record_many(self, slots: np.ndarray, volumes: np.ndarray, now: Optional[float] = None):
+        """Set the current bucket of each slot to its latest volume
+
+        An observation covers a whole bucket (e.g. the rolling 15 minute
+        volume), so repeated observations in one bucket overwrite it.
+        """
+        now = time.time() if now is None else now
+        bucket = int(now // self.bucket_seconds)
+        self._advance(slots, bucket)
+
+        heads = self.heads[slots]
+        previous = self.values[slots, heads]
+        self.values[slots, heads] = volumes
+        self.sums[slots] += volumes - previous
+
+    def means(self, slots: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """Rolling mean of completed buckets, excluding the current one"""
+        now = time.time() if now is None else now
+        self._advance(slots, int(now // self.bucket_seconds))
+
+        completed = self.counts[slots] - 1
+        current = self.values[slots, self.heads[slots]]
+        totals = self.sums[slots] - current
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(completed > 0, totals / np.maximum(completed, 1), 0.0)
+        return means
+
+    def mean(self, mint: str, now: Optional[float] = None) -> float:
+        """Rolling mean for one mint, 0.0 when it has no history"""
+        slot = self.index.get(mint)
+        if slot is None:
+            return 0.0
+        return float(self.means(np.array([slot]), now)[0])
+
+    def evict_idle(self, max_idle_seconds: float, now: Optional[float] = None) -> int:
+        """Free slots of mints not touched for `max_idle_seconds`"""
+        now = time.time() if now is None else now
+        used = self.mints != b''
+        idle = np.flatnonzero(used & (self.touched < now - max_idle_seconds))
+        for slot in idle:
+            self._clear(int(slot))
+            self._free.append(int(slot))
+        self.stats['evictions'] += len(idle)
+        return len(idle)
+
+    def _advance(self, slots: np.ndarray, bucket: int):
+        """Roll each slot's ring forward to `bucket`, zero-filling gaps"""
+        gaps = bucket - self.last_bucket[slots]
+        fresh = self.counts[slots] == 0
+        moving = gaps > 0
+        if not (moving.any() or fresh.any()):
+            return
+
+        # Fresh slots and slots idle for a whole window start over
+        reset = slots[fresh | (moving & (gaps >= self.buckets))]
+        if len(reset):
+            self.values[reset] = 0.0
+            self.sums[reset] = 0.0
+            self.heads[reset] = 0
+            self.counts[reset] = 1
+            self.last_bucket[reset] = bucket
+
+        # Common case: exactly one bucket later
+        step = slots[moving & (gaps == 1) & (self.counts[slots] > 0)]
+        step = step[self.last_bucket[step] == bucket - 1]
+        if len(step):
+            self._step(step)
+            self.last_bucket[step] = bucket
+
+        # Rare case: a few buckets were missed
+        for slot in slots[self.last_bucket[slots] < bucket]:
+            for _ in range(bucket - int(self.last_bucket[slot])):
+                self._step(np.array([slot]))
+            self.last_bucket[slot] = bucket
+
+    def _step(self, slots: np.ndarray):
+        heads = (self.heads[slots] + 1) % self.buckets
+        self.sums[slots] -= self.values[slots, heads]
+        self.values[slots, heads] = 0.0
+        self.heads[slots] = heads
+        self.counts[slots] = np.minimum(self.counts[slots] + 1, self.buckets)
+
+    def _allocate(self, mint: str, now: float) -> int:
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = int(np.argmin(self.touched))
+            self._clear(slot)
+            self.stats['evictions'] += 1
+
+        self.mints[slot] = mint.encode()
+        self.touched[slot] = now
+        self.index[mint] = slot
+        return slot
+
+    def _clear(self, slot: int):
+        mint = self.mints[slot].decode()
+        self.index.pop(mint, None)
+        self.mints[slot] = b''
+        self.values[slot] = 0.0
+        self.sums[slot] = 0.0
+        self.counts[slot] = 0
+        self.heads[slot] = 0
+        self.last_bucket[slot] = 0
+        self.touched[slot] = 0.0
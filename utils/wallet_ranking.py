@@ -0,0 +1,371 @@
+"""Incremental 30-day ROI ranking of candidate wallets"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.config import Config
+from utils.wallet_tracking import decode_activity
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 86400
+
+# Signatures remembered per wallet so an activity is never counted twice
+RECENT_SIGNATURES = 256
+
+
+@dataclass
+class WalletState:
+    """PnL state of one wallet
+
+    `holdings` maps a mint to [token quantity, SOL cost basis]; `trades`
+    holds (time, SOL invested, realized PnL) per trade inside the window,
+    with `invested` and `realized` their running sums.
+    """
+    holdings: Dict[str, List[float]] = field(default_factory=dict)
+    trades: Deque[Tuple[float, float, float]] = field(default_factory=deque)
+    invested: float = 0.0
+    realized: float = 0.0
+    newest_signature: Optional[str] = None
+    signatures: Deque[str] = field(default_factory=lambda: deque(maxlen=RECENT_SIGNATURES))
+    roi: Optional[float] = None
+    version: int = 0
+
+
+class WalletRanker:
+    """Keeps every candidate wallet's 30-day ROI current and ranked
+
+    Wallet histories are fetched once with `getSignaturesForAddress` (paged
+    back `history_limit` at a time through the window) and batched
+    `getTransaction` calls, at most `max_concurrency` wallets at a time;
+    later `refresh()` calls only ask for signatures newer than the last
+    one applied, and activity from the live wallet feed is folded in with
+    `apply()`. Each wallet keeps average-cost holdings, so a sell realizes
+    PnL against what the wallet paid, and open holdings are marked at the
+    last traded price of their mint (or `update_prices()`).
+
+    ROI over the window is (SOL invested + realized PnL + unrealized PnL)
+    divided by SOL invested, so 2.0 means the wallet doubled its money.
+    Every change re-pushes the wallet onto a max-heap with lazy deletion
+    and trades leaving the window are expired from a second heap, so
+    `top()` costs O(k log n) instead of a scan over all candidates. State
+    is saved to `cache_path` and loaded back on start.
+    """
+
+    def __init__(
+        self,
+        window_days: float = 30.0,
+        max_concurrency: int = 8,
+        history_limit: int = 200,
+        cache_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.window_seconds = window_days * DAY_SECONDS
+        self.max_concurrency = max_concurrency
+        self.history_limit = history_limit
+        self.cache_path = cache_path
+        self.clock = clock
+
+        self.candidates: Set[str] = set()
+        self.wallets: Dict[str, WalletState] = {}
+        self.marks: Dict[str, float] = {}
+        self._holders: Dict[str, Set[str]] = {}
+        self._ranking: List[Tuple[float, int, str]] = []
+        self._expiries: List[Tuple[float, str]] = []
+
+        self.stats = {
+            'activities': 0,
+            'duplicates': 0,
+            'fetched': 0,
+            'fetch_errors': 0,
+            'refreshes': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Config, clock: Callable[[], float] = time.time) -> 'WalletRanker':
+        """Build a ranker from the `wallet_ranking` section of config.yaml"""
+        ranker = cls(
+            window_days=config.get_setting('wallet_ranking', 'window_days', 30.0),
+            max_concurrency=config.get_setting('wallet_ranking', 'max_concurrent_fetches', 8),
+            history_limit=config.get_setting('wallet_ranking', 'history_limit', 200),
+            cache_path=config.get_setting('wallet_ranking', 'cache_path', None) or None,
+            clock=clock
+        )
+        ranker.load()
+        path = config.get_setting('wallet_ranking', 'candidates_path', None)
+        if path:
+            try:
+                with open(path) as f:
+                    ranker.track(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Candidate wallets {path} not loaded: {e}")
+        return ranker
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def track(self, addresses: Iterable[str]) -> int:
+        """Add candidate wallets; returns how many were new"""
+        before = len(self.candidates)
+        self.candidates.update(addresses)
+        return len(self.candidates) - before
+
+    def apply(self, activity: Dict) -> bool:
+        """Fold one decoded buy/sell into its wallet; False if already counted"""
+        wallet = activity['wallet']
+        mint = activity['token']['mint']
+        state = self.wallets.get(wallet)
+        if state is None:
+            state = self.wallets[wallet] = WalletState()
+        key = f"{activity.get('signature')}:{mint}"
+        if activity.get('signature') and key in state.signatures:
+            self.stats['duplicates'] += 1
+            return False
+        state.signatures.append(key)
+        self.stats['activities'] += 1
+
+        sol = activity.get('amount_sol') or 0.0
+        amount = activity.get('token_amount') or 0.0
+        if sol and amount:
+            self.marks[mint] = sol / amount
+
+        holding = state.holdings.setdefault(mint, [0.0, 0.0])
+        invested = realized = 0.0
+        if activity['side'] == 'buy':
+            holding[0] += amount
+            holding[1] += sol
+            invested = sol
+            self._holders.setdefault(mint, set()).add(wallet)
+        elif holding[0] > 0 and amount > 0:
+            # Only the part covered by known holdings has a cost basis
+            matched = min(amount, holding[0])
+            basis = holding[1] * matched / holding[0]
+            realized = sol * matched / amount - basis
+            holding[0] -= matched
+            holding[1] -= basis
+        if holding[0] <= 0:
+            del state.holdings[mint]
+            self._holders.get(mint, set()).discard(wallet)
+
+        at = activity.get('block_time') or self.clock()
+        if at > self.clock() - self.window_seconds:
+            if not state.trades:
+                heapq.heappush(self._expiries, (at + self.window_seconds, wallet))
+            state.trades.append((at, invested, realized))
+            state.invested += invested
+            state.realized += realized
+        self._rank(wallet, state)
+        return True
+
+    def update_prices(self, prices: Dict[str, float]):
+        """Mark mints at new prices (SOL per token) and re-rank their holders"""
+        self.marks.update(prices)
+        for wallet in {w for mint in prices for w in self._holders.get(mint, ())}:
+            self._rank(wallet, self.wallets[wallet])
+
+    def top(self, count: int, min_roi: float) -> List[Dict]:
+        """The `count` best wallets with ROI of at least `min_roi`, best first"""
+        self._expire()
+        chosen: List[str] = []
+        popped: List[Tuple[float, int, str]] = []
+        while self._ranking and len(chosen) < count:
+            entry = heapq.heappop(self._ranking)
+            state = self.wallets.get(entry[2])
+            if state is None or state.version != entry[1]:
+                continue
+            popped.append(entry)
+            if -entry[0] < min_roi:
+                break
+            if entry[2] in self.candidates:
+                chosen.append(entry[2])
+        for entry in popped:
+            heapq.heappush(self._ranking, entry)
+        return [self.summary(wallet) for wallet in chosen]
+
+    def score(self, wallet: str) -> float:
+        """The wallet's current ROI, 1.0 while it has none"""
+        state = self.wallets.get(wallet)
+        return state.roi if state is not None and state.roi is not None else 1.0
+
+    def summary(self, wallet: str) -> Dict:
+        state = self.wallets[wallet]
+        return {
+            'address': wallet,
+            'roi': state.roi,
+            'invested_sol': state.invested,
+            'realized_pnl_sol': state.realized,
+            'open_positions': len(state.holdings)
+        }
+
+    async def refresh(self, rpc, wallets: Optional[Iterable[str]] = None):
+        """Fetch what is new for each candidate, `max_concurrency` wallets at a time"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def sync(wallet: str):
+            async with semaphore:
+                try:
+                    await self._sync(rpc, wallet)
+                except Exception as e:
+                    self.stats['fetch_errors'] += 1
+                    logger.warning(f"History of {wallet[:8]}... not fetched: {e}")
+
+        await asyncio.gather(*[sync(w) for w in (self.candidates if wallets is None else wallets)])
+        self.stats['refreshes'] += 1
+
+    def load(self):
+        """Read the persisted wallet state"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Wallet ranking cache {self.cache_path} not loaded: {e}")
+            return
+
+        self.candidates.update(data.get('candidates', []))
+        self.marks.update(data.get('marks', {}))
+        for wallet, saved in data.get('wallets', {}).items():
+            state = WalletState(
+                holdings=saved['holdings'],
+                trades=deque(tuple(trade) for trade in saved['trades']),
+                newest_signature=saved.get('newest_signature'),
+                signatures=deque(saved.get('signatures', []), maxlen=RECENT_SIGNATURES)
+            )
+            state.invested = sum(trade[1] for trade in state.trades)
+            state.realized = sum(trade[2] for trade in state.trades)
+            self.wallets[wallet] = state
+            for mint in state.holdings:
+                self._holders.setdefault(mint, set()).add(wallet)
+            if state.trades:
+                heapq.heappush(self._expiries, (state.trades[0][0] + self.window_seconds, wallet))
+            self._rank(wallet, state)
+
+    def save(self):
+        """Write the wallet state to `cache_path` atomically"""
+        if not self.cache_path:
+            return
+        data = {
+            'candidates': sorted(self.candidates),
+            'marks': self.marks,
+            'wallets': {
+                wallet: {
+                    'holdings': state.holdings,
+                    'trades': list(state.trades),
+                    'newest_signature': state.newest_signature,
+                    'signatures': list(state.signatures)
+                }
+                for wallet, state in self.wallets.items()
+            }
+        }
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp = self.cache_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.cache_path)
+
+    async def _sync(self, rpc, wallet: str):
+        """Apply the wallet's transactions newer than the last one applied
+
+        A transaction that could not be fetched stops the wallet there, so
+        it and everything after it are fetched again on the next refresh.
+        """
+        state = self.wallets.get(wallet)
+        entries = await self._signatures(rpc, wallet, state.newest_signature if state else None)
+        if not entries:
+            return
+
+        wanted = [entry['signature'] for entry in entries if entry.get('err') is None]
+        transactions: Dict[str, object] = {}
+        for start in range(0, len(wanted), self.history_limit):
+            chunk = wanted[start:start + self.history_limit]
+            transactions.update(zip(chunk, await rpc.batch([
+                ('getTransaction', [signature, {
+                    'encoding': 'jsonParsed',
+                    'maxSupportedTransactionVersion': 0
+                }])
+                for signature in chunk
+            ])))
+        self.stats['fetched'] += len(wanted)
+
+        # Newest first on the wire; apply in chain order so cost basis is right
+        state = self.wallets.setdefault(wallet, WalletState())
+        for entry in reversed(entries):
+            signature = entry['signature']
+            if entry.get('err') is None:
+                tx = transactions[signature]
+                if tx is None or isinstance(tx, Exception):
+                    self.stats['fetch_errors'] += 1
+                    break
+                for activity in decode_activity(wallet, signature, tx):
+                    self.apply(activity)
+            state.newest_signature = signature
+
+    async def _signatures(self, rpc, wallet: str, until: Optional[str]) -> List[Dict]:
+        """Signature entries after `until`, newest first, paging back with `before`
+
+        Without `until` paging stops once a page reaches past the window.
+        """
+        cutoff = self.clock() - self.window_seconds
+        entries: List[Dict] = []
+        before = None
+        while True:
+            options = {'limit': self.history_limit}
+            if until:
+                options['until'] = until
+            if before:
+                options['before'] = before
+            page = await rpc.call('getSignaturesForAddress', [wallet, options])
+            entries.extend(page)
+            if len(page) < self.history_limit:
+                return entries
+            oldest = page[-1]
+            if oldest.get('blockTime') is not None and oldest['blockTime'] < cutoff:
+                return entries
+            before = oldest['signature']
+
+    def _rank(self, wallet: str, state: WalletState):
+        unrealized = sum(
+            quantity * self.marks.get(mint, 0.0) - cost
+            for mint, (quantity, cost) in state.holdings.items()
+            if mint in self.marks
+        )
+        state.version += 1
+        state.roi = None
+        if state.invested > 0:
+            state.roi = (state.invested + state.realized + unrealized) / state.invested
+            heapq.heappush(self._ranking, (-state.roi, state.version, wallet))
+
+        # Superseded entries only go away when popped; rebuild before they dominate
+        if len(self._ranking) > 2 * len(self.wallets) + 64:
+            self._ranking = [
+                (-s.roi, s.version, w) for w, s in self.wallets.items() if s.roi is not None
+            ]
+            heapq.heapify(self._ranking)
+
+    def _expire(self):
+        """Drop trades that left the window and re-rank their wallets"""
+        now = self.clock()
+        cutoff = now - self.window_seconds
+        while self._expiries and self._expiries[0][0] <= now:
+            _, wallet = heapq.heappop(self._expiries)
+            state = self.wallets.get(wallet)
+            if state is None:
+                continue
+            changed = False
+            while state.trades and state.trades[0][0] <= cutoff:
+                _, invested, realized = state.trades.popleft()
+                state.invested -= invested
+                state.realized -= realized
+                changed = True
+            if state.trades:
+                heapq.heappush(self._expiries, (state.trades[0][0] + self.window_seconds, wallet))
+            if changed:
+                self._rank(wallet, state)
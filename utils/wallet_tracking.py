@@ -1,30 +1,358 @@
 """Wallet tracking and analysis utilities"""
 
+import asyncio
+import itertools
+import json
 import logging
-from typing import Dict, List
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+import aiohttp
+
+if TYPE_CHECKING:
+    from utils.wallet_ranking import WalletRanker
 
 logger = logging.getLogger(__name__)
 
+LAMPORTS_PER_SOL = 1_000_000_000
+WRAPPED_SOL_MINT = 'So11111111111111111111111111111111111111112'
+
 
-async def get_top_wallets(count: int, min_roi: float) -> List[Dict]:
+async def get_top_wallets(count: int, min_roi: float, ranker: Optional['WalletRanker'] = None) -> List[Dict]:
     """
     Get top-performing wallets
-    
-    TODO: Implement with on-chain analysis
+
+    With a ranker (utils.wallet_ranking) the answer comes from its
+    continuously maintained ranking. Without one there is no wallet source.
+    """
+    if ranker is None:
+        logger.debug(f"No wallet ranker to find top {count} wallets with min ROI {min_roi}x")
+        return []
+
+    return ranker.top(count, min_roi)
+
+
+async def monitor_wallet_activity(
+    client,
+    wallet_addresses: List[str],
+    engine: Optional['WalletSubscriptionEngine'] = None
+) -> List[Dict]:
+    """
+    Return wallet activity seen since the last call
+
+    With a subscription engine the monitored set is kept in sync and the
+    activities it already decoded are drained from its queue without
+    waiting. Without one there is no activity source.
     """
-    logger.debug(f"Finding top {count} wallets with min ROI {min_roi}x")
-    
-    # Placeholder - integrate with wallet tracking service
-    return []
+    if engine is None:
+        logger.debug(f"No subscription engine for {len(wallet_addresses)} wallets")
+        return []
+
+    await engine.set_wallets(wallet_addresses)
+    return engine.drain()
+
 
+def decode_activity(wallet: str, signature: str, tx: Dict) -> List[Dict]:
+    """
+    Decode a jsonParsed transaction into buy/sell activities for `wallet`
 
-async def monitor_wallet_activity(client, wallet_addresses: List[str]) -> List[Dict]:
+    Token balance changes owned by the wallet give the side and mint, the
+    wallet's lamport change gives the SOL size of the trade.
     """
-    Monitor activity from specified wallets
-    
-    TODO: Implement with WebSocket monitoring
+    if not tx or not tx.get('meta') or tx['meta'].get('err'):
+        return []
+
+    meta = tx['meta']
+    keys = tx['transaction']['message']['accountKeys']
+    keys = [k['pubkey'] if isinstance(k, dict) else k for k in keys]
+
+    sol_delta = 0
+    if wallet in keys:
+        index = keys.index(wallet)
+        sol_delta = meta['postBalances'][index] - meta['preBalances'][index]
+
+    deltas: Dict[str, float] = {}
+    for sign, balances in ((-1, meta.get('preTokenBalances') or []),
+                           (1, meta.get('postTokenBalances') or [])):
+        for balance in balances:
+            if balance.get('owner') != wallet or balance['mint'] == WRAPPED_SOL_MINT:
+                continue
+            amount = float(balance['uiTokenAmount'].get('uiAmountString') or 0)
+            deltas[balance['mint']] = deltas.get(balance['mint'], 0.0) + sign * amount
+
+    activities = []
+    for mint, delta in deltas.items():
+        if delta == 0:
+            continue
+        activities.append({
+            'wallet': wallet,
+            'signature': signature,
+            'slot': tx.get('slot'),
+            'block_time': tx.get('blockTime'),
+            'side': 'buy' if delta > 0 else 'sell',
+            'token': {'mint': mint, 'symbol': mint[:6]},
+            'token_amount': abs(delta),
+            'amount_sol': abs(sol_delta) / LAMPORTS_PER_SOL
+        })
+    return activities
+
+
+class WalletSubscriptionEngine:
+    """Multiplexed WebSocket `logsSubscribe` feed for monitored wallets
+
+    One connection carries a subscription per wallet. Every notification is
+    resolved with `getTransaction`, decoded and pushed to `queue`; a null
+    transaction, common right after the notification, is retried up to
+    `fetch_retries` times with a doubling delay. After a reconnect all
+    wallets are resubscribed and signatures missed while the socket was
+    down are backfilled with `getSignaturesForAddress`.
     """
-    logger.debug(f"Monitoring {len(wallet_addresses)} wallets")
-    
-    # Placeholder - implement real-time wallet monitoring
-    return []
+
+    def __init__(
+        self,
+        wss_url: str,
+        rpc,
+        commitment: str = 'confirmed',
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        queue_size: int = 1000,
+        on_activity: Optional[Callable[[Dict], None]] = None,
+        fetch_retries: int = 3,
+        fetch_retry_delay: float = 0.2
+    ):
+        self.wss_url = wss_url
+        self.rpc = rpc
+        self.commitment = commitment
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.on_activity = on_activity
+        self.fetch_retries = fetch_retries
+        self.fetch_retry_delay = fetch_retry_delay
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.wallets: Set[str] = set()
+        self.last_signature: Dict[str, str] = {}
+
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, str] = {}
+        self._subscriptions: Dict[int, str] = {}
+        self._seen: Set[str] = set()
+        self._seen_order: Deque[str] = deque()
+        self._seen_limit = 10_000
+        self._fetches: Set[asyncio.Task] = set()
+        self.connected = asyncio.Event()
+
+        self.stats = {
+            'connects': 0,
+            'notifications': 0,
+            'backfilled': 0,
+            'activities': 0,
+            'dropped': 0,
+            'fetch_retries': 0,
+            'missing': 0
+        }
+
+    async def start(self):
+        """Start the connection loop in the background"""
+        if self._task is None:
+            self._session = aiohttp.ClientSession()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Close the socket and stop reconnecting"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for task in list(self._fetches):
+            task.cancel()
+        await asyncio.gather(*self._fetches, return_exceptions=True)
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def set_wallets(self, addresses: Iterable[str]):
+        """Subscribe to new wallets and drop the ones no longer monitored"""
+        addresses = set(addresses)
+        added = addresses - self.wallets
+        removed = self.wallets - addresses
+        self.wallets = addresses
+
+        if self._ws is None or self._ws.closed:
+            return
+
+        for wallet in added:
+            await self._subscribe(wallet)
+        for sub_id, wallet in list(self._subscriptions.items()):
+            if wallet in removed:
+                del self._subscriptions[sub_id]
+                await self._send('logsUnsubscribe', [sub_id])
+
+    def drain(self) -> List[Dict]:
+        """Return every queued activity without waiting"""
+        activities = []
+        while not self.queue.empty():
+            activities.append(self.queue.get_nowait())
+        return activities
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with self._session.ws_connect(self.wss_url, heartbeat=30) as ws:
+                    self._ws = ws
+                    self.stats['connects'] += 1
+                    delay = self.reconnect_delay
+                    await self._resubscribe()
+                    self.connected.set()
+                    await self._backfill()
+
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            self._handle(json.loads(message.data))
+                        elif message.type in (aiohttp.WSMsgType.CLOSED,
+                                              aiohttp.WSMsgType.ERROR):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Wallet feed error: {e}")
+            finally:
+                self._ws = None
+                self.connected.clear()
+
+            logger.info(f"🔌 Wallet feed disconnected, reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _send(self, method: str, params: List) -> int:
+        request_id = next(self._ids)
+        await self._ws.send_json({
+            'jsonrpc': '2.0',
+            'id': request_id,
+            'method': method,
+            'params': params
+        })
+        return request_id
+
+    async def _subscribe(self, wallet: str):
+        request_id = await self._send('logsSubscribe', [
+            {'mentions': [wallet]},
+            {'commitment': self.commitment}
+        ])
+        self._pending[request_id] = wallet
+
+    async def _resubscribe(self):
+        self._pending.clear()
+        self._subscriptions.clear()
+        for wallet in self.wallets:
+            await self._subscribe(wallet)
+
+    async def _backfill(self):
+        """Replay signatures missed since the last one seen per wallet"""
+        for wallet, until in list(self.last_signature.items()):
+            if wallet not in self.wallets:
+                continue
+            try:
+                signatures = await self.rpc.call('getSignaturesForAddress', [
+                    wallet,
+                    {'until': until, 'limit': 100, 'commitment': self.commitment}
+                ])
+            except Exception as e:
+                logger.warning(f"Backfill failed for {wallet[:8]}...: {e}")
+                continue
+
+            # Newest first on the wire; replay in chain order
+            detected = time.time()
+            for entry in reversed(signatures):
+                if entry.get('err') is None and self._mark_seen(entry['signature']):
+                    self.stats['backfilled'] += 1
+                    self._spawn_fetch(wallet, entry['signature'], detected)
+
+    def _handle(self, message: Dict):
+        if 'id' in message and message['id'] in self._pending:
+            wallet = self._pending.pop(message['id'])
+            if 'result' in message and wallet not in self.wallets:
+                # Removed while the subscribe was in flight
+                self._spawn(self._send('logsUnsubscribe', [message['result']]))
+            elif 'result' in message:
+                self._subscriptions[message['result']] = wallet
+            else:
+                logger.warning(f"Subscribe failed for {wallet[:8]}...: {message.get('error')}")
+            return
+
+        if message.get('method') != 'logsNotification':
+            return
+
+        params = message['params']
+        wallet = self._subscriptions.get(params['subscription'])
+        value = params['result']['value']
+        if wallet is None or value.get('err') is not None:
+            return
+
+        self.stats['notifications'] += 1
+        if self._mark_seen(value['signature']):
+            self._spawn_fetch(wallet, value['signature'], time.time())
+
+    def _mark_seen(self, signature: str) -> bool:
+        """Remember a signature; return False if it was already processed"""
+        if signature in self._seen:
+            return False
+        self._seen.add(signature)
+        self._seen_order.append(signature)
+        if len(self._seen_order) > self._seen_limit:
+            self._seen.discard(self._seen_order.popleft())
+        return True
+
+    def _spawn_fetch(self, wallet: str, signature: str, detected: float):
+        self.last_signature[wallet] = signature
+        self._spawn(self._fetch(wallet, signature, detected))
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._fetches.add(task)
+        task.add_done_callback(self._fetches.discard)
+
+    async def _fetch(self, wallet: str, signature: str, detected: float):
+        tx = None
+        for attempt in range(self.fetch_retries + 1):
+            if attempt:
+                # Not yet visible to the node at this commitment
+                self.stats['fetch_retries'] += 1
+                await asyncio.sleep(self.fetch_retry_delay * 2 ** (attempt - 1))
+            try:
+                tx = await self.rpc.call('getTransaction', [signature, {
+                    'encoding': 'jsonParsed',
+                    'commitment': self.commitment,
+                    'maxSupportedTransactionVersion': 0
+                }])
+            except Exception as e:
+                logger.warning(f"Could not fetch {signature[:8]}...: {e}")
+                return
+            if tx is not None:
+                break
+        if tx is None:
+            self.stats['missing'] += 1
+            logger.warning(f"Transaction {signature[:8]}... still unavailable after {self.fetch_retries} retries")
+            return
+
+        decoded = time.time()
+        for activity in decode_activity(wallet, signature, tx):
+            # Epoch seconds along the copy path; consumers add their own stages
+            activity['timestamps'] = {
+                'source': tx.get('blockTime'),
+                'detected': detected,
+                'decoded': decoded
+            }
+            try:
+                self.queue.put_nowait(activity)
+            except asyncio.QueueFull:
+                self.stats['dropped'] += 1
+                continue
+            self.stats['activities'] += 1
+            if self.on_activity:
+                self.on_activity(activity)